@@ -11,6 +11,7 @@ sys.path.insert(0, str(project_root))
 
 from backend.database import init_db
 from backend.routes.api import api_bp
+from backend.models.detector import preload_detector
 
 # Load environment variables
 load_dotenv()
@@ -36,6 +37,11 @@ def create_app():
     init_db()
     print("Database initialized successfully!")
     
+    # Load the detector eagerly when requested. Under gunicorn with
+    # preload_app this runs once in the master, and forked workers share it.
+    if os.getenv('PRELOAD_DETECTOR', '').lower() in ('1', 'true', 'yes'):
+        preload_detector()
+    
     # Root endpoint
     @app.route('/')
     def index():
@@ -44,9 +50,11 @@ def create_app():
             'version': '1.0.0',
             'endpoints': {
                 'analyze': '/api/analyze',
+                'analyze_batch': '/api/analyze/batch',
                 'users': '/api/users',
                 'violations': '/api/violations',
-                'statistics': '/api/statistics'
+                'statistics': '/api/statistics',
+                'health': '/api/health'
             }
         })
     
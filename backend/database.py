@@ -1,11 +1,64 @@
 from datetime import datetime
+import base64
+import binascii
+import json
 import os
-from pymongo import MongoClient, ASCENDING, DESCENDING, ReturnDocument
+import threading
+from pymongo import MongoClient, ASCENDING, DESCENDING, ReturnDocument, InsertOne, UpdateMany, UpdateOne
 from werkzeug.security import generate_password_hash, check_password_hash
 
+from backend.write_buffer import WriteBuffer
+
 _client = None
 _db = None
 
+# Ids reserved per counters round trip (see _get_next_sequence)
+try:
+    ID_BLOCK_SIZE = max(1, int(os.environ.get('ID_BLOCK_SIZE', '1000')))
+except Exception:
+    ID_BLOCK_SIZE = 1000
+
+_id_blocks = {}
+_id_blocks_lock = threading.Lock()
+
+# Write-behind for violation/post inserts and like counts (see backend/write_buffer.py)
+WRITE_BEHIND = os.environ.get('WRITE_BEHIND', 'true').lower() not in ('0', 'false', 'no', 'off')
+try:
+    WRITE_BATCH_SIZE = int(os.environ.get('WRITE_BATCH_SIZE', '500'))
+except Exception:
+    WRITE_BATCH_SIZE = 500
+try:
+    WRITE_FLUSH_INTERVAL = float(os.environ.get('WRITE_FLUSH_INTERVAL', '0.05'))
+except Exception:
+    WRITE_FLUSH_INTERVAL = 0.05
+try:
+    WRITE_QUEUE_SIZE = int(os.environ.get('WRITE_QUEUE_SIZE', '10000'))
+except Exception:
+    WRITE_QUEUE_SIZE = 10000
+
+_write_buffer = None
+
+
+def _reset_id_blocks():
+    # A forked worker must not hand out ids from the parent's reserved blocks
+    global _id_blocks_lock
+    _id_blocks.clear()
+    _id_blocks_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _client, _db, _write_buffer
+    _reset_id_blocks()
+    # PyMongo clients are not fork-safe: the child opens its own on first use
+    _client = None
+    _db = None
+    # The parent's writer thread does not exist in the child
+    _write_buffer = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
 
 def _get_db():
     """Return a singleton MongoDB client and database."""
@@ -23,6 +76,36 @@ def _get_db():
     return _client, _db
 
 
+def close_db():
+    """Close the MongoDB client (e.g. in the gunicorn master before workers fork)."""
+    global _client, _db
+    if _client is not None:
+        _client.close()
+    _client = None
+    _db = None
+
+
+def get_write_buffer():
+    """Return the process's write-behind buffer, creating it on first use."""
+    global _write_buffer
+    if _write_buffer is None:
+        _write_buffer = WriteBuffer(
+            lambda: _get_db()[1],
+            enabled=WRITE_BEHIND,
+            batch_size=WRITE_BATCH_SIZE,
+            flush_interval=WRITE_FLUSH_INTERVAL,
+            max_queue=WRITE_QUEUE_SIZE
+        )
+    return _write_buffer
+
+
+def flush_writes(timeout=None):
+    """Write all buffered operations now (shutdown, tests, read-after-write)."""
+    if _write_buffer is None:
+        return True
+    return _write_buffer.flush(timeout)
+
+
 def init_db():
     """Initialize collections, indexes, and counters."""
     _, db = _get_db()
@@ -33,6 +116,24 @@ def init_db():
     db.violations.create_index([('timestamp', DESCENDING)])
     db.violations.create_index([('category', ASCENDING)])
     db.users.create_index([('is_suspended', ASCENDING)])
+    # Lookups by numeric id and per-user violation counts (bulk serializers)
+    db.users.create_index([('id', ASCENDING)])
+    db.violations.create_index([('user_id', ASCENDING)])
+    # Buffered inserts and like updates by id; unique so a retried insert cannot duplicate
+    db.posts.create_index([('id', ASCENDING)], unique=True)
+    db.violations.create_index([('id', ASCENDING)], unique=True)
+    # Keyset pagination: newest first with id as the tie-breaker
+    db.posts.create_index([('created_at', DESCENDING), ('id', DESCENDING)])
+    # Public feed: one range scan over visible posts (see feed_query)
+    db.posts.create_index([
+        ('author_suspended', ASCENDING),
+        ('is_hate_speech', ASCENDING),
+        ('created_at', DESCENDING),
+        ('id', DESCENDING)
+    ])
+    db.posts.create_index([('user_id', ASCENDING)])
+    db.violations.create_index([('timestamp', DESCENDING), ('id', DESCENDING)])
+    db.violations.create_index([('category', ASCENDING), ('timestamp', DESCENDING), ('id', DESCENDING)])
 
     for name in ['users', 'posts', 'violations']:
         db.counters.update_one(
@@ -41,16 +142,113 @@ def init_db():
             upsert=True
         )
 
+    sync_author_suspended()
 
-def _get_next_sequence(name):
+
+def sync_author_suspended():
+    """Backfill posts.author_suspended from the users' suspension state.
+
+    Covers posts written before the field existed and posts whose insert
+    landed after their author's suspension update: the route checks the
+    author before creating the post, and another worker may suspend them
+    in between. Such posts stay in the feed until the next sync, which runs
+    in init_db and on POST /api/admin/posts/sync-suspended (schedule it to
+    bound the drift). Returns the number of posts changed.
+    """
+    # Include this process's buffered posts
+    flush_writes()
+    _, db = _get_db()
+    suspended_ids = [u['id'] for u in db.users.find({'is_suspended': True}, {'id': 1})]
+    changed = db.posts.update_many(
+        {'author_suspended': {'$exists': False}},
+        {'$set': {'author_suspended': False}}
+    ).modified_count
+    if suspended_ids:
+        changed += db.posts.update_many(
+            {'user_id': {'$in': suspended_ids}, 'author_suspended': {'$ne': True}},
+            {'$set': {'author_suspended': True}}
+        ).modified_count
+    return changed
+
+
+def _reserve_id_block(name, size):
+    """Reserve ids (seq+1 .. seq+size) with one $inc; returns [next, last]"""
     _, db = _get_db()
     counter = db.counters.find_one_and_update(
         {'_id': name},
-        {'$inc': {'seq': 1}},
+        {'$inc': {'seq': size}},
         upsert=True,
         return_document=ReturnDocument.AFTER
     )
-    return int(counter['seq'])
+    last = int(counter['seq'])
+    return [last - size + 1, last]
+
+
+def _get_next_sequence(name):
+    """Next id for a collection, from a block of ID_BLOCK_SIZE reserved per process.
+
+    Blocks come from an atomic $inc on counters, so ids stay unique across
+    workers and restarts. They are not gap-free or globally ordered by insert
+    time: ids left in a block when a process exits are skipped.
+    """
+    with _id_blocks_lock:
+        block = _id_blocks.get(name)
+        if block is None or block[0] > block[1]:
+            block = _id_blocks[name] = _reserve_id_block(name, ID_BLOCK_SIZE)
+        next_id = block[0]
+        block[0] += 1
+        return next_id
+
+
+def encode_cursor(sort_value, doc_id):
+    """Opaque pagination token for the position after (sort_value, doc_id)"""
+    raw = json.dumps([sort_value.isoformat() if sort_value else None, int(doc_id)])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (sort_value, doc_id) from encode_cursor(); ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        sort_value, doc_id = json.loads(raw)
+        return (datetime.fromisoformat(sort_value) if sort_value else None), int(doc_id)
+    except (binascii.Error, TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+
+
+def _keyset_page(collection, query, field, page, per_page, cursor=None):
+    """Return (docs, next_cursor) for one page ordered by (field, id) descending.
+
+    With a cursor the page starts right after it using the index, however
+    deep it is; otherwise page is applied as an offset (skip). One extra
+    document is fetched to tell whether there is a next page.
+    """
+    sort = [(field, DESCENDING), ('id', DESCENDING)]
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        after = {'$or': [{field: {'$lt': value}}, {field: value, 'id': {'$lt': last_id}}]}
+        docs = list(collection.find({'$and': [query, after]} if query else after).sort(sort).limit(per_page + 1))
+    else:
+        docs = list(collection.find(query).sort(sort).skip((page - 1) * per_page).limit(per_page + 1))
+
+    next_cursor = None
+    if len(docs) > per_page:
+        docs = docs[:per_page]
+        next_cursor = encode_cursor(docs[-1].get(field), docs[-1]['id'])
+    return docs, next_cursor
+
+
+def count_total(collection_name, query=None, mode='estimated'):
+    """Total for a paginated list: 'exact' counts the matching documents,
+    'estimated' returns the collection size from metadata (an upper bound
+    for a filtered list, without scanning), 'none' returns None.
+    """
+    if mode == 'none':
+        return None
+    _, db = _get_db()
+    if mode == 'exact':
+        return db[collection_name].count_documents(query or {})
+    return db[collection_name].estimated_document_count()
 
 
 def _user_to_dict(user_doc, violations_count=None):
@@ -133,16 +331,71 @@ def create_user_with_id(user_id, username, email, password=None):
     return user_doc
 
 
+def _set_author_suspended(user_id, suspended):
+    # Posts carry their author's suspension state so the feed needs no user lookup.
+    # Buffered like create_post, so it lands after this process's pending post inserts.
+    get_write_buffer().submit('posts', UpdateMany(
+        {'user_id': int(user_id)},
+        {'$set': {'author_suspended': bool(suspended)}}
+    ))
+
+
 def update_user(user_id, updates):
     _, db = _get_db()
-    db.users.update_one({'id': int(user_id)}, {'$set': updates})
-    return get_user_by_id(user_id)
+    user = db.users.find_one_and_update(
+        {'id': int(user_id)},
+        {'$set': updates},
+        return_document=ReturnDocument.AFTER
+    )
+    if 'is_suspended' in updates:
+        _set_author_suspended(user_id, updates['is_suspended'])
+    return user
 
 
 def increment_user_warning(user_id, count=1):
     _, db = _get_db()
-    db.users.update_one({'id': int(user_id)}, {'$inc': {'warning_count': count}})
-    return get_user_by_id(user_id)
+    return db.users.find_one_and_update(
+        {'id': int(user_id)},
+        {'$inc': {'warning_count': count}},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def record_warning(user_id, max_warnings, count=1):
+    """Add warnings and suspend at max_warnings in one atomic update.
+
+    Returns (updated user, suspended_now), or (None, False) for an unknown
+    user. suspended_now is True only for the warning that crossed the limit
+    on a user who was not suspended yet.
+    """
+    _, db = _get_db()
+    now = datetime.utcnow()
+    reached = {'$gte': ['$warning_count', max_warnings]}
+    suspend_now = {'$and': [reached, {'$ne': ['$is_suspended', True]}]}
+    # Update pipeline: the second stage sees the incremented warning_count
+    before = db.users.find_one_and_update(
+        {'id': int(user_id)},
+        [
+            {'$set': {'warning_count': {'$add': [{'$ifNull': ['$warning_count', 0]}, count]}}},
+            {'$set': {
+                'suspended_at': {'$cond': [suspend_now, now, '$suspended_at']},
+                'is_suspended': {'$or': [{'$eq': ['$is_suspended', True]}, reached]}
+            }}
+        ],
+        return_document=ReturnDocument.BEFORE
+    )
+    if before is None:
+        return None, False
+
+    # Apply the same update to the pre-image instead of re-reading the user
+    user = dict(before)
+    user['warning_count'] = int(before.get('warning_count') or 0) + count
+    suspended_now = user['warning_count'] >= max_warnings and not before.get('is_suspended')
+    if suspended_now:
+        user['is_suspended'] = True
+        user['suspended_at'] = now
+        _set_author_suspended(user_id, True)
+    return user, suspended_now
 
 
 def get_user_by_id(user_id):
@@ -181,7 +434,6 @@ def check_password(user_doc, password):
 
 
 def create_violation(data):
-    _, db = _get_db()
     violation_doc = {
         'id': _get_next_sequence('violations'),
         'user_id': int(data['user_id']),
@@ -192,18 +444,19 @@ def create_violation(data):
         'timestamp': data.get('timestamp', datetime.utcnow()),
         'action_taken': data.get('action_taken')
     }
-    db.violations.insert_one(violation_doc)
+    # Ids are allocated locally, so the document is complete before it is written
+    get_write_buffer().submit('violations', InsertOne(dict(violation_doc)))
     return violation_doc
 
 
-def list_violations(page=1, per_page=50, category=None):
+def violations_query(category=None):
+    return {'category': category} if category else {}
+
+
+def list_violations(page=1, per_page=50, category=None, cursor=None):
+    """Return (violations, next_cursor), newest first (see _keyset_page)"""
     _, db = _get_db()
-    query = {}
-    if category:
-        query['category'] = category
-    total = db.violations.count_documents(query)
-    cursor = db.violations.find(query).sort('timestamp', DESCENDING).skip((page - 1) * per_page).limit(per_page)
-    return list(cursor), total
+    return _keyset_page(db.violations, violations_query(category), 'timestamp', page, per_page, cursor)
 
 
 def list_violations_by_user(user_id):
@@ -221,6 +474,16 @@ def list_recent_violations(limit=10):
     return list(db.violations.find({}).sort('timestamp', DESCENDING).limit(limit))
 
 
+def clear_user_violations(user_id):
+    """Mark a user's violations as overturned by a moderator (labels them not-hate for online learning)"""
+    _, db = _get_db()
+    result = db.violations.update_many(
+        {'user_id': int(user_id), 'cleared': {'$ne': True}},
+        {'$set': {'cleared': True, 'cleared_at': datetime.utcnow()}}
+    )
+    return result.modified_count
+
+
 def get_violations_by_category():
     _, db = _get_db()
     pipeline = [{'$group': {'_id': '$category', 'count': {'$sum': 1}}}]
@@ -228,18 +491,18 @@ def get_violations_by_category():
 
 
 def create_post(data):
-    _, db = _get_db()
     post_doc = {
         'id': _get_next_sequence('posts'),
         'user_id': int(data['user_id']),
         'content': data['content'],
         'image_url': data.get('image_url'),
         'is_hate_speech': bool(data.get('is_hate_speech', False)),
+        'author_suspended': bool(data.get('author_suspended', False)),
         'confidence_score': float(data.get('confidence_score', 0.0)),
         'likes_count': int(data.get('likes_count', 0)),
         'created_at': data.get('created_at', datetime.utcnow())
     }
-    db.posts.insert_one(post_doc)
+    get_write_buffer().submit('posts', InsertOne(dict(post_doc)))
     return post_doc
 
 
@@ -255,22 +518,40 @@ def delete_post_by_id(post_id):
 
 def update_post(post_id, updates):
     _, db = _get_db()
-    db.posts.update_one({'id': int(post_id)}, {'$set': updates})
-    return get_post_by_id(post_id)
+    return db.posts.find_one_and_update(
+        {'id': int(post_id)},
+        {'$set': updates},
+        return_document=ReturnDocument.AFTER
+    )
 
 
-def list_posts(page=1, per_page=20, include_hate=False):
-    _, db = _get_db()
-    suspended_users = list(db.users.find({'is_suspended': True}, {'id': 1}))
-    suspended_ids = [u['id'] for u in suspended_users]
+def increment_post_likes(post_id, delta=1):
+    """Buffered $inc of likes_count (never below zero)"""
+    query = {'id': int(post_id)}
+    if delta < 0:
+        query['likes_count'] = {'$gte': -delta}
+    get_write_buffer().submit('posts', UpdateOne(query, {'$inc': {'likes_count': delta}}))
+
 
-    query = {'user_id': {'$nin': suspended_ids}}
+def feed_query(include_hate=False):
+    """Posts shown in the feed: not by suspended users, clean unless include_hate.
+
+    Equality on the denormalized author_suspended flag (kept in sync by
+    update_user) lets the feed use the (author_suspended, is_hate_speech,
+    created_at, id) index as a single range scan.
+    """
+    query = {'author_suspended': False}
     if not include_hate:
         query['is_hate_speech'] = False
+    return query
+
 
-    total = db.posts.count_documents(query)
-    cursor = db.posts.find(query).sort('created_at', DESCENDING).skip((page - 1) * per_page).limit(per_page)
-    return list(cursor), total
+def list_posts(page=1, per_page=20, include_hate=False, cursor=None, query=None):
+    """Return (posts, next_cursor) of the feed, newest first (see _keyset_page)"""
+    _, db = _get_db()
+    if query is None:
+        query = feed_query(include_hate)
+    return _keyset_page(db.posts, query, 'created_at', page, per_page, cursor)
 
 
 def list_posts_by_user(user_id):
@@ -283,8 +564,10 @@ def count_posts(filter_query=None):
     return db.posts.count_documents(filter_query or {})
 
 
-def to_user_dict(user_doc):
-    violations_count = count_violations({'user_id': user_doc['id']}) if user_doc else 0
+def to_user_dict(user_doc, violations_count=None):
+    """Serialize a user; violations_count is counted in Mongo unless given"""
+    if violations_count is None:
+        violations_count = count_violations({'user_id': user_doc['id']}) if user_doc else 0
     return _user_to_dict(user_doc, violations_count=violations_count)
 
 
@@ -296,3 +579,54 @@ def to_violation_dict(violation_doc):
 def to_post_dict(post_doc):
     user = get_user_by_id(post_doc['user_id']) if post_doc else None
     return _post_to_dict(post_doc, username=user['username'] if user else None)
+
+
+def get_usernames(user_ids):
+    """Map user id -> username for user_ids with one $in query"""
+    ids = list({int(user_id) for user_id in user_ids})
+    if not ids:
+        return {}
+    _, db = _get_db()
+    return {doc['id']: doc['username'] for doc in db.users.find({'id': {'$in': ids}}, {'id': 1, 'username': 1})}
+
+
+def count_violations_by_user(user_ids):
+    """Map user id -> violations count for user_ids with one $group aggregation"""
+    ids = list({int(user_id) for user_id in user_ids})
+    if not ids:
+        return {}
+    _, db = _get_db()
+    pipeline = [
+        {'$match': {'user_id': {'$in': ids}}},
+        {'$group': {'_id': '$user_id', 'count': {'$sum': 1}}}
+    ]
+    return {doc['_id']: doc['count'] for doc in db.violations.aggregate(pipeline)}
+
+
+def to_user_dicts(user_docs):
+    """Serialize a page of users with one query for all their violation counts"""
+    counts = count_violations_by_user(doc['id'] for doc in user_docs)
+    return [_user_to_dict(doc, violations_count=counts.get(doc['id'], 0)) for doc in user_docs]
+
+
+def _with_usernames(docs, usernames):
+    """Complete a known id -> username map with one query for the missing authors"""
+    usernames = dict(usernames or {})
+    missing = {doc['user_id'] for doc in docs} - set(usernames)
+    usernames.update(get_usernames(missing))
+    return usernames
+
+
+def to_violation_dicts(violation_docs, usernames=None):
+    """Serialize violations with one query for all usernames.
+
+    usernames is an optional id -> username map of authors already loaded.
+    """
+    usernames = _with_usernames(violation_docs, usernames)
+    return [_violation_to_dict(doc, username=usernames.get(doc['user_id'])) for doc in violation_docs]
+
+
+def to_post_dicts(post_docs, usernames=None):
+    """Serialize posts with one query for all usernames (see to_violation_dicts)"""
+    usernames = _with_usernames(post_docs, usernames)
+    return [_post_to_dict(doc, username=usernames.get(doc['user_id'])) for doc in post_docs]
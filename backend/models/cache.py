@@ -0,0 +1,83 @@
+"""
+Bounded LRU cache for detector results
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_for_cache(text):
+    """Normalize text so trivially different copies share a cache entry"""
+    return ' '.join(text.lower().split())
+
+
+class ResultCache:
+    """Thread-safe LRU cache with an optional time-to-live.
+
+    A max_size of 0 disables the cache: lookups always miss and nothing is
+    stored. A ttl of 0 or None means entries never expire.
+    """
+
+    def __init__(self, max_size=0, ttl=None):
+        self.max_size = max(0, int(max_size))
+        self.ttl = ttl if ttl else None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    @staticmethod
+    def make_key(text, *versions):
+        """Hash of the normalized text plus model/lexicon versions"""
+        digest = hashlib.sha256(normalize_for_cache(text).encode('utf-8'))
+        for version in versions:
+            digest.update(b'\0' + str(version).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached value or None, updating hit/miss counters"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -1,224 +1,439 @@
-try:
-    import joblib
-except Exception:
-    joblib = None
 import os
-import re
+import threading
+import time
 from backend.utils.preprocessing import TextPreprocessor, categorize_hate_speech
+from backend.models.rules import RuleEngine, MIN_HATE_CONFIDENCE
+from backend.models.lexicon import Lexicon, DEFAULT_LEXICON_PATH
+from backend.models.cache import ResultCache
+from backend.models.registry import ModelRegistry, load_bundle
+from backend.models.shadow import ShadowEvaluator
+from backend.models.metrics import DetectorMetrics
+
+# Multi-language support (script pre-filter + seeded langdetect fallback)
+from backend.models.language import detect_language as identify_language
+
+# Translation support (pluggable backends, see models/translation.py)
+from backend.models.translation import (
+    get_translation_backend,
+    TranslationCache,
+    DEFAULT_TRANSLATION_CACHE_PATH
+)
+
+# Opt-in analyze() result cache: ANALYZE_CACHE_SIZE=0 disables it,
+# ANALYZE_CACHE_TTL is in seconds (0 = entries never expire)
+try:
+    ANALYZE_CACHE_SIZE = int(os.environ.get('ANALYZE_CACHE_SIZE', '0'))
+except Exception:
+    ANALYZE_CACHE_SIZE = 0
+try:
+    ANALYZE_CACHE_TTL = float(os.environ.get('ANALYZE_CACHE_TTL', '300'))
+except Exception:
+    ANALYZE_CACHE_TTL = 300.0
+
+# Memory-map numpy arrays in joblib model files read-only ('' disables), so
+# gunicorn workers share the pages instead of each holding a private copy
+MODEL_MMAP_MODE = os.environ.get('MODEL_MMAP_MODE', 'r') or None
 
-# Multi-language support
+# Which trained model to serve: 'auto' prefers the compact linear export
+# (ml_model/linear_model.npz) when present, 'ensemble' forces the full
+# VotingClassifier
+MODEL_FORMAT = os.environ.get('MODEL_FORMAT', 'auto').lower()
+
+# Seconds between checks of the registry's ACTIVE pointer (0 disables the watch)
 try:
-    from langdetect import detect, LangDetectException
-    LANGDETECT_AVAILABLE = True
-except ImportError:
-    LANGDETECT_AVAILABLE = False
-    print("langdetect not available - multi-language detection disabled")
+    MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', '0'))
+except Exception:
+    MODEL_WATCH_INTERVAL = 0.0
 
-# Translation support (optional)
+# Directory of the unversioned model files used when the registry is empty
+LEGACY_MODEL_DIR = 'ml_model'
+
+# Minimum confidence required to block a post automatically (0.0-1.0)
+# Read from environment so it can be tuned without code changes
 try:
-    from googletrans import Translator
-    TRANSLATION_AVAILABLE = True
-except ImportError:
-    TRANSLATION_AVAILABLE = False
-    print("googletrans not available - translation disabled")
+    BLOCK_CONFIDENCE = float(os.environ.get('BLOCK_CONFIDENCE', '0.8'))
+except Exception:
+    BLOCK_CONFIDENCE = 0.8
+
+# Rule/lexicon confidence at which analyze() stops without running the ML
+# model. Fusion can only raise the confidence of a rule hit, so this is never
+# below BLOCK_CONFIDENCE: hits the model could still push over the block
+# threshold always reach the model.
+try:
+    DECISIVE_RULE_CONFIDENCE = max(
+        BLOCK_CONFIDENCE,
+        float(os.environ.get('DECISIVE_RULE_CONFIDENCE', BLOCK_CONFIDENCE))
+    )
+except Exception:
+    DECISIVE_RULE_CONFIDENCE = BLOCK_CONFIDENCE
 
 class HateSpeechDetector:
     """Hate speech detection model wrapper with multi-language support"""
     
-    def __init__(self):
+    def __init__(self, cache_size=None, cache_ttl=None):
         self.preprocessor = TextPreprocessor()
-        self.model = None
-        self.vectorizer = None
-        self.model_loaded = False
-        self.translator = Translator() if TRANSLATION_AVAILABLE else None
+        # The served model version; replaced as a whole on reload (see load_model)
+        self.bundle = None
+        self.registry = ModelRegistry()
+        self._model_lock = threading.Lock()
+        self._watcher = None
+        # Seconds between ACTIVE/SHADOW polls of the running watch (None: not watching)
+        self.watch_interval = None
+        # Candidate model scored in the background on live traffic (see start_shadow)
+        self.shadow = None
+        self._failed_shadow_run = None
+        # Per-stage latency histograms (see models/metrics.py)
+        self.metrics = DetectorMetrics()
+        self.result_cache = ResultCache(
+            max_size=ANALYZE_CACHE_SIZE if cache_size is None else cache_size,
+            ttl=ANALYZE_CACHE_TTL if cache_ttl is None else cache_ttl
+        )
+        self.translation_backend = get_translation_backend()
+        self.translation_cache = TranslationCache(
+            os.environ.get('TRANSLATION_CACHE_PATH', DEFAULT_TRANSLATION_CACHE_PATH)
+        )
+        self.rule_engine = RuleEngine()
+        self.lexicon = Lexicon.empty()
+        self._lexicon_lock = threading.Lock()
 
         # Try to load trained model
         self.load_model()
 
-    def load_model(self):
-        """Load pre-trained model if available"""
-        model_path = 'ml_model/hate_speech_model.pkl'
-        vectorizer_path = 'ml_model/vectorizer.pkl'
-        
+        # Load offensive lexicon if present
+        if os.path.exists(DEFAULT_LEXICON_PATH):
+            try:
+                self.load_offensive_lexicon(DEFAULT_LEXICON_PATH)
+            except Exception as e:
+                print(f"Error loading lexicon: {e}. Lexicon matching disabled.")
+
+        if MODEL_WATCH_INTERVAL > 0:
+            self.start_model_watch(MODEL_WATCH_INTERVAL)
+
+    @property
+    def model(self):
+        bundle = self.bundle
+        return bundle.model if bundle else None
+
+    @property
+    def vectorizer(self):
+        bundle = self.bundle
+        return bundle.vectorizer if bundle else None
+
+    @property
+    def model_loaded(self):
+        return self.bundle is not None
+
+    @property
+    def model_version(self):
+        bundle = self.bundle
+        return bundle.version if bundle else None
+
+    @property
+    def model_type(self):
+        bundle = self.bundle
+        return bundle.model_type if bundle else None
+
+    def load_model(self, version=None):
+        """Load a model version and swap it in atomically.
+
+        Loads version (default: the registry's active version), or the
+        unversioned files in ml_model/ when the registry is empty. The new
+        bundle is fully built before the swap, so requests in flight finish
+        on the previous model and none are dropped. Returns the new bundle,
+        or None if nothing was loaded (the current model is kept).
+        """
+        prefer_linear = MODEL_FORMAT != 'ensemble'
         try:
-            if joblib and os.path.exists(model_path) and os.path.exists(vectorizer_path):
-                self.model = joblib.load(model_path)
-                self.vectorizer = joblib.load(vectorizer_path)
-                self.model_loaded = True
-                print("ML Model loaded successfully!")
-            else:
-                print("ML Model not found or joblib missing. Using rule-based detection.")
+            with self._model_lock:
+                if version or self.registry.active_version():
+                    bundle = self.registry.load(version, prefer_linear=prefer_linear, mmap_mode=MODEL_MMAP_MODE)
+                else:
+                    bundle = load_bundle(LEGACY_MODEL_DIR, prefer_linear=prefer_linear, mmap_mode=MODEL_MMAP_MODE)
+                if bundle is None:
+                    print("ML Model not found. Using rule-based detection.")
+                    return None
+                self.bundle = bundle
+                self.result_cache.clear()
+            print(f"ML Model loaded successfully! (version {bundle.version}, {bundle.model_type})")
+            return bundle
         except Exception as e:
             print(f"Error loading model: {e}. Using rule-based detection.")
+            return None
+
+    def reload_model_async(self, version=None):
+        """Load a model version in a background thread and swap it in when ready"""
+        thread = threading.Thread(target=self.load_model, args=(version,), name='model-reload', daemon=True)
+        thread.start()
+        return thread
+
+    def start_model_watch(self, interval=MODEL_WATCH_INTERVAL):
+        """Poll the registry's ACTIVE pointer in a daemon thread and hot-swap on change.
+
+        Each poll also follows the registry's shadow run (see sync_shadow).
+
+        Threads do not survive fork: a detector preloaded before forking
+        workers starts the watch in each worker (gunicorn.conf.py post_fork).
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self.watch_interval = interval
+        self._watcher = threading.Thread(target=self._watch_active_version, args=(interval,),
+                                         name='model-watch', daemon=True)
+        self._watcher.start()
+
+    def _watch_active_version(self, interval):
+        attempted = self.model_version
+        while True:
+            time.sleep(interval)
+            active = self.registry.active_version()
+            # Try each newly activated version once; a broken one keeps the current model
+            if active and active != attempted and active != self.model_version:
+                attempted = active
+                print(f"Active model changed to {active}; reloading")
+                self.load_model(active)
+            try:
+                self.sync_shadow()
+            except Exception as e:
+                print(f"Shadow sync error: {e}")
     
-    def predict_with_model(self, text):
+    def start_shadow(self, version, sample_rate=1.0, run_id=None):
+        """Score live traffic with registry version in the background.
+
+        Responses keep coming from the served model; the candidate's
+        agreement, score deltas and latency are collected in
+        self.shadow.stats(). Replaces a running shadow. This process only:
+        sync_shadow() runs the registry's shared run in every worker.
+        """
+        bundle = self.registry.load(version, prefer_linear=MODEL_FORMAT != 'ensemble', mmap_mode=MODEL_MMAP_MODE)
+        if bundle is None:
+            raise ValueError(f"Model version {version} has no model files")
+        shadow = ShadowEvaluator(self, bundle, sample_rate=sample_rate, run_id=run_id)
+        previous, self.shadow = self.shadow, shadow
+        if previous is not None:
+            previous.stop()
+        print(f"Shadow evaluation of model {version} started")
+        return shadow
+
+    def stop_shadow(self):
+        """Stop the running shadow evaluation and return it (or None)"""
+        shadow, self.shadow = self.shadow, None
+        if shadow is not None:
+            shadow.stop()
+        return shadow
+
+    def sync_shadow(self):
+        """Follow the registry's shadow run and store this worker's stats snapshot.
+
+        Starts the run's shadow here if it is not running yet, stops a
+        shadow whose run ended, and saves the snapshot that the admin
+        endpoint merges across workers. Returns the running shadow or None.
+        """
+        config = self.registry.shadow_config()
+        shadow = self.shadow
+        if config is None:
+            if shadow is not None and shadow.run_id is not None:
+                self.stop_shadow()
+            return None
+        run_id = config['started_at']
+        if shadow is None or shadow.run_id != run_id:
+            if self._failed_shadow_run == run_id:
+                return None
+            try:
+                shadow = self.start_shadow(config['version'], config.get('sample_rate', 1.0), run_id=run_id)
+            except Exception:
+                # Try each run once; the admin endpoint reports the error
+                self._failed_shadow_run = run_id
+                raise
+        self.registry.save_shadow_snapshot(shadow.snapshot())
+        return shadow
+
+    def load_offensive_lexicon(self, path=DEFAULT_LEXICON_PATH):
+        """Build a new lexicon automaton from path and swap it in atomically.
+
+        The automaton is built before the swap, so in-flight requests keep
+        using the previous snapshot and are never blocked.
+        """
+        with self._lexicon_lock:
+            lexicon = Lexicon.from_file(path)
+            self.lexicon = lexicon
+            self.result_cache.clear()
+        print(f"Lexicon loaded: {len(lexicon.words)} words, {len(lexicon.phrases)} phrases")
+        return lexicon
+
+    @property
+    def offensive_keywords(self):
+        return self.lexicon.words
+
+    @property
+    def offensive_phrases(self):
+        return self.lexicon.phrases
+
+    def predict_with_model(self, text, bundle=None, timings=None):
         """Predict using trained ML model"""
         try:
-            # Preprocess text
-            processed_text = self.preprocessor.preprocess(text)
-            
-            # Vectorize
-            text_vectorized = self.vectorizer.transform([processed_text])
-            
-            # Predict
-            prediction = self.model.predict(text_vectorized)[0]
-            probability = self.model.predict_proba(text_vectorized)[0]
-            
-            # Get confidence score (probability of hate speech class)
-            confidence = probability[1] if len(probability) > 1 else probability[0]
-            
-            return bool(prediction), float(confidence)
+            return self.predict_batch_with_model([text], bundle, timings)[0]
         except Exception as e:
             print(f"Model prediction error: {e}")
             return self.rule_based_detection(text)
+
+    def predict_batch_with_model(self, texts, bundle=None, timings=None):
+        """Predict a list of texts with one vectorizer and one predict_proba call.
+
+        The label is taken from the probability matrix (argmax over
+        ``model.classes_``), which is what ``predict`` does for the soft-voting
+        ensemble, so the model is only evaluated once per batch. bundle
+        defaults to the currently served model version; stage durations are
+        added to the timings dict when one is given.
+        """
+        if not texts:
+            return []
+        bundle = bundle or self.bundle
+
+        # Preprocess and vectorize the whole batch into one sparse matrix
+        start = time.perf_counter_ns()
+        processed_texts = self.preprocessor.preprocess_many(texts)
+        preprocessed = time.perf_counter_ns()
+        texts_vectorized = bundle.vectorizer.transform(processed_texts)
+        vectorized = time.perf_counter_ns()
+
+        probabilities = bundle.model.predict_proba(texts_vectorized)
+        predictions = bundle.model.classes_[probabilities.argmax(axis=1)]
+        if timings is not None:
+            _add_timing(timings, 'preprocess', preprocessed - start)
+            _add_timing(timings, 'vectorize', vectorized - preprocessed)
+            _add_timing(timings, 'model', time.perf_counter_ns() - vectorized)
+
+        # Confidence is the probability of the hate speech class
+        hate_column = 1 if probabilities.shape[1] > 1 else 0
+        return [
+            (bool(prediction), float(probability[hate_column]))
+            for prediction, probability in zip(predictions, probabilities)
+        ]
     
     def rule_based_detection(self, text):
         """Sophisticated pattern-based hate speech detection.
         - Uses context and patterns to detect hate speech.
         - Detects hate speech targeting groups (stereotyping, generalizations).
-        - No simple keyword matching - focuses on context and harmful patterns.
+        - No simple keyword matching: offensive lexicon hits (data/hate_keywords.txt)
+          are reported as a weak signal, never as hate speech on their own.
+        - Patterns are precompiled once by the RuleEngine (see models/rules.py).
         """
         text_lower = text.lower()
 
-        # Context patterns that indicate non-hate speech (whitelist patterns)
-        safe_patterns = [
-            r'\bi love\b',
-            r'\blove\b.*\bnature\b',
-            r'\bnature\b.*\bbeautiful\b',
-            r'\bi like\b',
-            r'\bthank you\b',
-            r'\bgreat\b',
-            r'\bawesome\b',
-            r'\bwonderful\b',
-            r'\bamazing\b',
-            r'\bnever goes out of style\b',
-            r'\bis not allowed\b',
-            r'\bagainst hate\b',
-            r'\bstop hate\b',
-            r'\banti.?hate\b'
-        ]
-        
-        # Check if text matches safe patterns
-        is_safe_context = any(re.search(pattern, text_lower) for pattern in safe_patterns)
-        
-        if is_safe_context:
+        if self.rule_engine.is_safe_context(text_lower):
             # Don't flag as hate speech if it's clearly in a positive/neutral context
             return False, 0.0
 
-        # Hate speech patterns targeting groups (stereotyping, generalizations)
-        group_hate_patterns = [
-            # Generalizations about groups
-            (r'\ball\s+(members\s+of\s+)?(that|those|these)?\s*(people|members|folks)\s+(from|of|in)\s+\w+\s+(are|is)\s+(\w+)', 0.8),
-            (r'\ball\s+\w+\s+(people|women|men|members)\s+(are|is)\s+(\w+)', 0.8),
-            (r'\bevery\s+\w+\s+(person|member|individual)\s+(is|are)\s+(\w+)', 0.75),
-            # Religious/ethnic targeting
-            (r'\ball\s+(members\s+of\s+)?(that|those)?\s*religion\s+(are|is)\s+\w+', 0.85),
-            (r'\b(all|every)\s+\w+\s+(from|of)\s+(that|those|the)\s+(country|place|religion)\s+(are|is)\s+\w+', 0.8),
-            # Body shaming and appearance-based discrimination
-            (r'\b(fat|overweight|obese)\s+(people|person|women|men)\s+(are|is)\s+(lazy|slobs|disgusting|ugly|worthless)', 0.85),
-            (r'\b(skinny|thin)\s+(people|person)\s+(are|is)\s+(weak|anorexic|disgusting)', 0.80),
-            (r'\b(ugly|hideous)\s+(people|person)\s+', 0.70),
-            # Age discrimination
-            (r'\b(old|elderly)\s+(people|person)\s+(are|is)\s+(useless|worthless)', 0.85),
-            (r'\b(old|elderly)\s+people\s+should\s+(just\s+)?(die|leave)', 0.90),
-            (r'\byoung\s+people\s+are\s+(stupid|lazy|entitled)', 0.75),
-            # Disability discrimination  
-            (r'\b(disabled|handicapped)\s+(people|person)\s+(are|is)\s+(burden|useless|worthless)', 0.85),
-            (r'\b(disabled|handicapped)\s+(people|person)\s+(can\'t|cannot|dont|don\'t)\s+(contribute|work|help)', 0.85),
-            # Economic class discrimination
-            (r'\b(poor|homeless)\s+(people|person)\s+(are|is)\s+(lazy|worthless)', 0.80),
-            (r'\ball\s+(homeless|poor)\s+(are|is)\s+(drug addicts|criminals|lazy)', 0.85),
-            (r'\brich\s+people\s+are\s+(evil|parasites|greedy)', 0.75),
-            # Gender discrimination
-            (r'\b(women|men)\s+(are|is)\s+(too|all)\s+(emotional|weak|stupid|inferior)', 0.85),
-            (r'\b(women|girls)\s+belong\s+in\s+(kitchen|home)', 0.85),
-            # LGBTQ+ discrimination
-            (r'\b(gay|lesbian|trans|transgender)\s+(people|person)\s+(are|is)\s+\w+', 0.80),
-            # Specific hate speech indicators
-            (r'\b(terrorist|terrorists|criminals|inferior|subhuman|animals)\b', 0.7),
-            # "Your kind" type statements
-            (r'\byour\s+kind\s+(doesn\'t|dont|should|must|are|is)', 0.85),
-            (r'\bpeople\s+like\s+you\s+(are|should|must|dont|doesn\'t)', 0.75),
-            # Deportation/exclusion
-            (r'\bgo\s+back\s+(to|where)', 0.8),
-            (r'\bdon\'t\s+belong\s+here', 0.75),
-            (r'\bget\s+out\s+of\s+(our|this|my)', 0.75),
-        ]
-        
-        # Check for group hate patterns
-        max_group_confidence = 0.0
-        for pattern, confidence in group_hate_patterns:
-            if re.search(pattern, text_lower):
-                max_group_confidence = max(max_group_confidence, confidence)
-        
-        if max_group_confidence >= 0.7:
+        confidence = self.rule_engine.max_hate_weight(text_lower)
+        if confidence >= MIN_HATE_CONFIDENCE:
             # Strong hate speech pattern detected
-            return True, max_group_confidence
+            return True, confidence
+
+        # No hate speech pattern; a lexicon hit is left for the model to judge
+        return False, self.lexicon.max_confidence(text_lower)
 
-        # No hate speech pattern detected
-        return False, 0.0
+    def _rule_stages(self, text):
+        """Cheap cascade stages of analyze(): safe context, hate patterns, lexicon.
+
+        Returns (rule_result, decided_by). decided_by names the stage whose
+        result is final, or is None when the ML stage can still change it: a
+        rule hit below DECISIVE_RULE_CONFIDENCE, or a lexicon hit without a
+        rule hit. A lexicon hit is only a signal (False, hit strength); the
+        model alone decides whether such a text is hate speech. Texts without
+        any hit are not hate speech whatever the model says (see
+        _combine_results), so they never reach the model.
+        """
+        text_lower = text.lower()
+
+        if self.rule_engine.is_safe_context(text_lower):
+            return (False, 0.0), 'safe_context'
+
+        rule_confidence = self.rule_engine.max_hate_weight(text_lower)
+        lexicon_confidence = self.lexicon.max_confidence(text_lower)
+        if rule_confidence >= MIN_HATE_CONFIDENCE:
+            # A stronger lexicon match raises the confidence, never the verdict
+            confidence = max(rule_confidence, lexicon_confidence)
+            return (True, confidence), 'rules' if rule_confidence >= DECISIVE_RULE_CONFIDENCE else None
+        if lexicon_confidence > 0.0:
+            return (False, lexicon_confidence), None
+        return (False, 0.0), 'no_match'
     
     def detect_language(self, text):
-        """Detect the language of the text"""
-        if not LANGDETECT_AVAILABLE:
-            return 'en'  # Default to English
-        
-        try:
-            language = detect(text)
-            return language
-        except (LangDetectException, Exception):
-            return 'unknown'
+        """Detect the language of the text (see models/language.py)"""
+        return identify_language(text)
     
     def translate_to_english(self, text, source_lang):
         """Translate text to English for analysis"""
-        if not TRANSLATION_AVAILABLE or not self.translator:
-            return text, False  # Return original text if translation unavailable
-        
+        if source_lang == 'en' or source_lang == 'unknown':
+            return text, False
+
+        backend = self.translation_backend
+        if backend.cacheable:
+            cached = self.translation_cache.get(backend.name, source_lang, text)
+            if cached is not None:
+                return cached, True
+
         try:
-            if source_lang == 'en' or source_lang == 'unknown':
-                return text, False
-            
-            translated = self.translator.translate(text, src=source_lang, dest='en')
-            return translated.text, True
+            translated_text, was_translated = backend.translate(text, source_lang)
         except Exception as e:
             print(f"Translation error: {e}")
             return text, False  # Fallback to original text
+
+        if was_translated and backend.cacheable:
+            self.translation_cache.put(backend.name, source_lang, text, translated_text)
+        return translated_text, was_translated
     
-    def analyze(self, text):
-        """Analyze text for hate speech with multi-language support"""
-        if not text or len(text.strip()) == 0:
-            return {
-                'is_hate_speech': False,
-                'confidence': 0.0,
-                'category': 'none',
-                'language': 'unknown',
-                'translated': False
-            }
-        
-        # Detect language
+    def _empty_result(self):
+        """Result returned for empty or whitespace-only text"""
+        return {
+            'is_hate_speech': False,
+            'confidence': 0.0,
+            'category': 'none',
+            'language': 'unknown',
+            'translated': False,
+            'model_version': self.model_version,
+            'decided_by': 'empty'
+        }
+
+    def _prepare_text(self, text, translate=True, timings=None):
+        """Detect language and translate non-English text (unless translate=False).
+
+        Returns (language, analysis_text, was_translated).
+        """
+        start = time.perf_counter_ns()
         language = self.detect_language(text)
-        
-        # Translate non-English text
+        detected = time.perf_counter_ns()
+
         analysis_text = text
         was_translated = False
-        if language not in ['en', 'unknown']:
+        translating = translate and language not in ['en', 'unknown']
+        if translating:
             analysis_text, was_translated = self.translate_to_english(text, language)
-        
-        # Rule-based prediction (always run to catch lexicon hits and context)
-        rule_is_hate, rule_conf = self.rule_based_detection(analysis_text)
 
-        # ML prediction (if available)
-        ml_is_hate, ml_conf = (False, 0.0)
-        if self.model_loaded:
-            try:
-                ml_is_hate, ml_conf = self.predict_with_model(analysis_text)
-            except Exception as _:
-                ml_is_hate, ml_conf = (False, 0.0)
+        if timings is not None:
+            _add_timing(timings, 'language', detected - start)
+            if translating:
+                _add_timing(timings, 'translate', time.perf_counter_ns() - detected)
+        return language, analysis_text, was_translated
+
+    def _combine_results(self, text, language, analysis_text, was_translated,
+                         rule_result, ml_result, model_version=None, decided_by=None):
+        """Fuse rule-based and ML predictions into the analyze() result dict.
+
+        decided_by is the cascade stage that settled the result (see
+        _rule_stages); when it is None the ML result is fused in.
+        """
+        rule_is_hate, rule_conf = rule_result
+        ml_is_hate, ml_conf = ml_result
 
         # Improved combination logic:
         # If rule-based says NOT hate (including safe context detection), trust it
         # This prevents ML false positives on context-safe phrases
-        if not rule_is_hate and rule_conf == 0.0:
+        if decided_by is not None:
+            # A cheap stage was decisive; the ML model was not run
+            is_hate = rule_is_hate
+            confidence = rule_conf
+        elif not rule_is_hate and rule_conf == 0.0:
             # Rule-based explicitly cleared this (safe context)
             is_hate = False
             confidence = 0.0
@@ -231,7 +446,7 @@ class HateSpeechDetector:
             is_hate = rule_conf >= 0.7
             confidence = rule_conf
         elif ml_is_hate:
-            # ML says hate, rule-based says not - lower confidence, likely false positive
+            # ML says hate, rule-based only saw a lexicon hit - lower confidence, likely false positive
             is_hate = ml_conf >= 0.75  # Higher threshold for ML-only detection
             confidence = ml_conf * 0.8  # Reduce confidence
         else:
@@ -248,8 +463,228 @@ class HateSpeechDetector:
             'category': category,
             'language': language,
             'translated': was_translated,
-            'original_text': text if was_translated else None
+            'original_text': text if was_translated else None,
+            'model_version': model_version,
+            'decided_by': decided_by or 'ml'
         }
 
-# Global detector instance
-detector = HateSpeechDetector()
+    def _cache_key(self, text, translate=True, bundle=None):
+        """Result cache key: normalized text plus model and lexicon versions"""
+        model_version = bundle.version if bundle else None
+        return ResultCache.make_key(text, model_version, self.lexicon.version, translate)
+
+    def _cached_result(self, text, key):
+        """Return a copy of the cached result for text, or None on a miss"""
+        cached = self.result_cache.get(key)
+        if cached is None:
+            return None
+        result = dict(cached)
+        if result.get('translated'):
+            result['original_text'] = text
+        return result
+
+    def analyze(self, text, translate=True, timings=None):
+        """Analyze text for hate speech with multi-language support.
+
+        Pass translate=False to skip translation of non-English text. Pass a
+        dict as timings to receive the per-stage durations in nanoseconds
+        (they are also recorded in self.metrics).
+        """
+        collect = timings if timings is not None else ({} if self.metrics.enabled else None)
+        start = time.perf_counter_ns()
+        result = self._analyze(text, translate, collect)
+        if collect is not None:
+            collect['total'] = time.perf_counter_ns() - start
+            self.metrics.record('analyze', collect, 1, (result['decided_by'],))
+        return result
+
+    def _analyze(self, text, translate=True, timings=None):
+        if not text or len(text.strip()) == 0:
+            return self._empty_result()
+
+        # One model version for the whole request, even if a reload swaps it meanwhile
+        bundle = self.bundle
+        if not self.result_cache.enabled:
+            return self._analyze_uncached(text, translate, bundle, timings)
+
+        start = time.perf_counter_ns()
+        key = self._cache_key(text, translate, bundle)
+        result = self._cached_result(text, key)
+        if timings is not None:
+            _add_timing(timings, 'cache', time.perf_counter_ns() - start)
+        if result is None:
+            result = self._analyze_uncached(text, translate, bundle, timings)
+            self.result_cache.put(key, dict(result))
+        return result
+
+    def _analyze_uncached(self, text, translate=True, bundle=None, timings=None):
+        """Run the full detection pipeline on non-empty text"""
+        # Detect language and translate non-English text
+        language, analysis_text, was_translated = self._prepare_text(text, translate, timings)
+        
+        # Cheap stages first; the ML model only runs when it can change the result
+        start = time.perf_counter_ns()
+        rule_result, decided_by = self._rule_stages(analysis_text)
+        if decided_by is None and bundle is None:
+            decided_by = 'rules'
+        ruled = time.perf_counter_ns()
+
+        ml_result = (False, 0.0)
+        if decided_by is None:
+            try:
+                ml_result = self.predict_with_model(analysis_text, bundle, timings)
+            except Exception as _:
+                ml_result = (False, 0.0)
+        scored = time.perf_counter_ns()
+
+        model_version = bundle.version if bundle else None
+        result = self._combine_results(text, language, analysis_text, was_translated,
+                                       rule_result, ml_result, model_version, decided_by)
+        if timings is not None:
+            _add_timing(timings, 'rules', ruled - start)
+            _add_timing(timings, 'categorize', time.perf_counter_ns() - scored)
+
+        shadow = self.shadow
+        if shadow is not None and decided_by is None:
+            shadow.submit([(text, language, analysis_text, was_translated, rule_result, ml_result, dict(result))],
+                          model_version, (scored - ruled) / 1e6)
+        return result
+
+    def analyze_batch(self, texts, translate=True, timings=None):
+        """Analyze a list of texts, scoring the ML model once for the whole batch.
+
+        Returns one result per input text, in order, identical to what
+        ``analyze`` returns for that text. Cached results are reused and only
+        cache misses go through the pipeline. timings works as in analyze(),
+        with each stage summed over the batch.
+        """
+        collect = timings if timings is not None else ({} if self.metrics.enabled else None)
+        start = time.perf_counter_ns()
+        results = self._analyze_batch(texts, translate, collect)
+        if collect is not None:
+            collect['total'] = time.perf_counter_ns() - start
+            self.metrics.record('analyze_batch', collect, len(texts), [result['decided_by'] for result in results])
+        return results
+
+    def _analyze_batch(self, texts, translate=True, timings=None):
+        results = [None] * len(texts)
+        cache_keys = {}
+        prepared = []
+        bundle = self.bundle
+        model_version = bundle.version if bundle else None
+        clock = time.perf_counter_ns
+        cache_ns = rules_ns = 0
+        for index, text in enumerate(texts):
+            if not text or len(text.strip()) == 0:
+                results[index] = self._empty_result()
+                continue
+            if self.result_cache.enabled:
+                start = clock()
+                key = self._cache_key(text, translate, bundle)
+                cached = self._cached_result(text, key)
+                cache_ns += clock() - start
+                if cached is not None:
+                    results[index] = cached
+                    continue
+                cache_keys[index] = key
+            language, analysis_text, was_translated = self._prepare_text(text, translate, timings)
+            start = clock()
+            rule_result, decided_by = self._rule_stages(analysis_text)
+            rules_ns += clock() - start
+            if decided_by is None and bundle is None:
+                decided_by = 'rules'
+            prepared.append((index, text, language, analysis_text, was_translated, rule_result, decided_by))
+
+        # ML prediction in one vectorized pass, only for texts the cheap stages left open
+        undecided = [item for item in prepared if item[6] is None]
+        ml_results = {}
+        ml_ms = 0.0
+        if undecided:
+            start = clock()
+            try:
+                scores = self.predict_batch_with_model([item[3] for item in undecided], bundle, timings)
+            except Exception as e:
+                # Same fallback as predict_with_model, applied per item
+                print(f"Model prediction error: {e}")
+                scores = [item[5] for item in undecided]
+            ml_ms = (clock() - start) / 1e6 / len(undecided)
+            ml_results = {item[0]: score for item, score in zip(undecided, scores)}
+
+        start = clock()
+        for index, text, language, analysis_text, was_translated, rule_result, decided_by in prepared:
+            results[index] = self._combine_results(text, language, analysis_text, was_translated,
+                                                   rule_result, ml_results.get(index, (False, 0.0)),
+                                                   model_version, decided_by)
+            if index in cache_keys:
+                self.result_cache.put(cache_keys[index], dict(results[index]))
+        if timings is not None:
+            if self.result_cache.enabled:
+                _add_timing(timings, 'cache', cache_ns)
+            if prepared:
+                _add_timing(timings, 'rules', rules_ns)
+                _add_timing(timings, 'categorize', clock() - start)
+
+        shadow = self.shadow
+        if shadow is not None and undecided:
+            shadow.submit([item[1:6] + (ml_results[item[0]], dict(results[item[0]])) for item in undecided],
+                          model_version, ml_ms)
+        return results
+
+
+def _add_timing(timings, stage, ns):
+    timings[stage] = timings.get(stage, 0) + ns
+
+
+class LazyDetector:
+    """Process-wide detector that is built on first use or by initialize().
+
+    Importing this module does not load models, lexicons or translators;
+    attribute access (e.g. detector.analyze) triggers initialization.
+    state is one of 'uninitialized', 'loading', 'ready' or 'failed'.
+    """
+
+    def __init__(self, factory=HateSpeechDetector):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+        self.state = 'uninitialized'
+        self.error = None
+
+    @property
+    def is_ready(self):
+        return self.state == 'ready'
+
+    def initialize(self):
+        """Build the detector if needed and return it (thread-safe)"""
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                self.state = 'loading'
+                try:
+                    self._instance = self._factory()
+                except Exception as e:
+                    self.state = 'failed'
+                    self.error = str(e)
+                    raise
+                self.state = 'ready'
+                self.error = None
+            return self._instance
+
+    def __getattr__(self, name):
+        # Only called for attributes not defined on the proxy itself
+        return getattr(self.initialize(), name)
+
+# Global detector instance (initialized lazily)
+detector = LazyDetector()
+
+def get_detector():
+    """Return the initialized global detector"""
+    return detector.initialize()
+
+def preload_detector():
+    """Initialize the global detector now (e.g. in the gunicorn master before fork)"""
+    instance = detector.initialize()
+    print(f"Detector preloaded in process {os.getpid()}")
+    return instance
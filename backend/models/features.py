@@ -0,0 +1,145 @@
+"""
+Feature extraction artifacts shared by the trainer and the detector
+
+Two feature modes are supported:
+    - 'tfidf':   fitted sklearn TfidfVectorizer pickled to ml_model/vectorizer.pkl
+                 (ships its vocabulary dict)
+    - 'hashing': stateless HashingVectorizer plus a stored IDF vector in
+                 ml_model/hashing_vectorizer.npz (no vocabulary, no pickle)
+
+A model directory holds exactly one of the two files; load_vectorizer()
+returns whichever is present.
+"""
+import os
+
+import numpy as np
+
+TFIDF_VECTORIZER_FILE = 'vectorizer.pkl'
+HASHING_VECTORIZER_FILE = 'hashing_vectorizer.npz'
+
+# Size of the hashed feature space (2**18 keeps bigram collisions rare)
+HASHING_N_FEATURES = 2 ** 18
+
+# Texts per job when transform() runs in parallel
+PARALLEL_CHUNK_SIZE = 2000
+
+
+class HashingTfidfVectorizer:
+    """TF-IDF over a fixed hashed feature space.
+
+    Produces the same weighting as TfidfVectorizer(sublinear_tf=..., smooth
+    IDF, l2 norm), but only the IDF of features seen during fit is stored.
+    Transforming needs no fitted state besides that vector, so it can run in
+    any process.
+    """
+
+    def __init__(self, n_features=HASHING_N_FEATURES, ngram_range=(1, 2), sublinear_tf=True):
+        # sklearn is imported here so importing the detector stays cheap
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self.n_features = int(n_features)
+        self.ngram_range = tuple(int(n) for n in ngram_range)
+        self.sublinear_tf = bool(sublinear_tf)
+        self.idf_ = None
+        self.document_frequency_ = None
+        self.n_documents_ = 0
+        self._hasher = HashingVectorizer(
+            n_features=self.n_features,
+            ngram_range=self.ngram_range,
+            alternate_sign=False,
+            norm=None
+        )
+
+    def _counts(self, texts):
+        return self._hasher.transform(texts)
+
+    def _fit_counts(self, counts):
+        if self.document_frequency_ is None:
+            self.document_frequency_ = np.zeros(self.n_features, dtype=np.int64)
+            self.n_documents_ = 0
+        self.document_frequency_ += np.bincount(counts.tocsr().indices, minlength=self.n_features)
+        self.n_documents_ += counts.shape[0]
+        # Smoothed IDF, as in sklearn's TfidfTransformer
+        self.idf_ = np.log((1 + self.n_documents_) / (1 + self.document_frequency_)) + 1
+
+    def fit(self, texts):
+        self.document_frequency_ = None
+        self._fit_counts(self._counts(texts))
+        return self
+
+    def partial_fit(self, texts):
+        """Add a chunk of documents to the IDF statistics (streaming training)"""
+        self._fit_counts(self._counts(texts))
+        return self
+
+    def fit_transform(self, texts):
+        counts = self._counts(texts)
+        self.document_frequency_ = None
+        self._fit_counts(counts)
+        return self._weight(counts)
+
+    def _weight(self, counts):
+        from sklearn.preprocessing import normalize
+        counts = counts.tocsr().astype(np.float64)
+        if self.sublinear_tf:
+            np.log(counts.data, out=counts.data)
+            counts.data += 1
+        counts.data *= self.idf_[counts.indices]
+        return normalize(counts, norm='l2', copy=False)
+
+    def _transform_chunk(self, texts):
+        return self._weight(self._counts(texts))
+
+    def transform(self, texts, n_jobs=1):
+        """Vectorize texts; n_jobs > 1 (or -1) splits large inputs across processes"""
+        if self.idf_ is None:
+            raise ValueError("HashingTfidfVectorizer is not fitted")
+        texts = list(texts)
+        if n_jobs == 1 or len(texts) <= PARALLEL_CHUNK_SIZE:
+            return self._transform_chunk(texts)
+
+        from joblib import Parallel, delayed
+        from scipy import sparse
+        chunks = [texts[i:i + PARALLEL_CHUNK_SIZE] for i in range(0, len(texts), PARALLEL_CHUNK_SIZE)]
+        parts = Parallel(n_jobs=n_jobs)(delayed(self._transform_chunk)(chunk) for chunk in chunks)
+        return sparse.vstack(parts).tocsr()
+
+    def save(self, path):
+        """Store the configuration and the IDF of features seen during fit"""
+        # Unseen features have the maximum IDF; any seen feature is at least ln 2 lower
+        unseen_idf = np.log(1 + self.n_documents_) + 1
+        seen = np.flatnonzero(self.idf_ < unseen_idf - 0.5).astype(np.int32)
+        np.savez_compressed(
+            path,
+            n_features=np.int64(self.n_features),
+            ngram_range=np.asarray(self.ngram_range, dtype=np.int64),
+            sublinear_tf=np.bool_(self.sublinear_tf),
+            n_documents=np.int64(self.n_documents_),
+            indices=seen,
+            idf=self.idf_[seen]
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            vectorizer = cls(
+                n_features=int(data['n_features']),
+                ngram_range=tuple(data['ngram_range']),
+                sublinear_tf=bool(data['sublinear_tf'])
+            )
+            vectorizer.n_documents_ = int(data['n_documents'])
+            vectorizer.idf_ = np.full(vectorizer.n_features, np.log(1 + vectorizer.n_documents_) + 1)
+            vectorizer.idf_[data['indices']] = data['idf']
+        return vectorizer
+
+
+def load_vectorizer(model_dir='ml_model', mmap_mode=None):
+    """Return (vectorizer, path) for the feature file in model_dir, or (None, None)"""
+    hashing_path = os.path.join(model_dir, HASHING_VECTORIZER_FILE)
+    if os.path.exists(hashing_path):
+        return HashingTfidfVectorizer.load(hashing_path), hashing_path
+
+    tfidf_path = os.path.join(model_dir, TFIDF_VECTORIZER_FILE)
+    if os.path.exists(tfidf_path):
+        import joblib
+        return joblib.load(tfidf_path, mmap_mode=mmap_mode), tfidf_path
+    return None, None
@@ -0,0 +1,160 @@
+"""
+Language identification with a fast script-based pre-filter
+
+Most messages can be classified from their characters alone: ASCII text
+made largely of distinctly English words is English, and text written entirely in
+a script used by one language (Hangul, Kana, Thai, ...) needs no
+statistical model. Only ambiguous text falls through to langdetect, which is
+seeded for deterministic results and memoized per text.
+"""
+import re
+from functools import lru_cache
+
+try:
+    from langdetect import DetectorFactory, detect as _langdetect_detect, LangDetectException
+    # langdetect is randomized by default; a fixed seed makes results repeatable
+    DetectorFactory.seed = 0
+    LANGDETECT_AVAILABLE = True
+except ImportError:
+    LANGDETECT_AVAILABLE = False
+    print("langdetect not available - multi-language detection disabled")
+
+# ASCII text needs at least this many words before the English shortcut applies
+MIN_ENGLISH_WORDS = 3
+# Share of words that must be English hint words; weaker matches go to langdetect
+MIN_ENGLISH_RATIO = 0.4
+# Share of letters that must belong to one script for the script shortcut
+MIN_SCRIPT_RATIO = 0.9
+# Number of distinct texts whose langdetect result is memoized
+LANGDETECT_CACHE_SIZE = 4096
+
+# Common English words that are not also everyday words in other Latin-script
+# languages ('a', 'in', 'is', 'no', 'me', 'so', 'was', 'of', ... are left out:
+# they are articles, pronouns or verbs in Spanish, Italian, German, Dutch, ...)
+ENGLISH_HINT_WORDS = frozenset([
+    'about', 'all', 'always', 'and', 'any', 'are', 'back', 'be', 'because', 'been',
+    'but', 'came', 'can', "can't", 'children', 'could', 'day', 'did', "didn't", 'does',
+    "doesn't", "don't", 'every', 'everyone', 'everything', 'from', 'get', 'going',
+    'good', 'great', 'had', 'has', 'hate', 'have', 'here', 'him', 'his', 'how',
+    "i'll", "i'm", "i've", 'if', 'into', "isn't", 'it', "it's", 'its', 'just',
+    'kind', 'know', "let's", 'life', 'like', 'love', 'make', 'makes', 'many', 'men',
+    'more', 'much', 'need', 'never', 'new', 'nobody', 'not', 'nothing', 'only',
+    'other', 'our', 'out', 'people', 'really', 'right', 'said', 'she', 'should',
+    'some', 'someone', 'something', 'still', 'such', 'than', 'that', "that's", 'the',
+    'their', 'them', 'then', 'there', 'these', 'they', "they're", 'thing', 'things',
+    'think', 'this', 'those', 'time', 'today', 'up', 'us', 'very', 'way', 'well',
+    'were', "we're", 'what', 'when', 'where', 'which', 'who', 'why', "won't", 'with',
+    'women', 'work', 'world', 'would', 'you', "you'll", "you're", "you've", 'your',
+    'yourself'
+])
+
+_ASCII_WORD = re.compile(r"[a-z']+")
+
+# (first code point, last code point, script)
+_SCRIPT_RANGES = (
+    (0x0370, 0x03FF, 'greek'),
+    (0x0400, 0x052F, 'cyrillic'),
+    (0x0590, 0x05FF, 'hebrew'),
+    (0x0600, 0x06FF, 'arabic'),
+    (0x0750, 0x077F, 'arabic'),
+    (0x0900, 0x097F, 'devanagari'),
+    (0x0E00, 0x0E7F, 'thai'),
+    (0x1100, 0x11FF, 'hangul'),
+    (0x3040, 0x30FF, 'kana'),
+    (0x3400, 0x4DBF, 'han'),
+    (0x4E00, 0x9FFF, 'han'),
+    (0xAC00, 0xD7AF, 'hangul'),
+    (0xFB50, 0xFDFF, 'arabic'),
+    (0xFE70, 0xFEFF, 'arabic'),
+)
+
+# Scripts written by (effectively) a single langdetect language
+_SCRIPT_LANGUAGES = {
+    'greek': 'el',
+    'hebrew': 'he',
+    'devanagari': 'hi',
+    'thai': 'th',
+    'hangul': 'ko',
+}
+
+# Letters that distinguish languages sharing a script
+_UKRAINIAN_LETTERS = frozenset('іїєґ')
+_PERSIAN_LETTERS = frozenset('پچژگ')
+_URDU_LETTERS = frozenset('ٹڈڑںے')
+
+
+def _script_of(ch):
+    code = ord(ch)
+    if code < 0x0250:
+        return 'latin'
+    for start, end, script in _SCRIPT_RANGES:
+        if start <= code <= end:
+            return script
+    return 'other'
+
+
+def script_language(text):
+    """Classify text from its characters alone.
+
+    Returns a langdetect-style language code for obvious cases, or None when
+    the text is ambiguous and needs statistical detection.
+    """
+    if text.isascii():
+        words = _ASCII_WORD.findall(text.lower())
+        if len(words) < MIN_ENGLISH_WORDS:
+            return None
+        english = sum(1 for word in words if word in ENGLISH_HINT_WORDS)
+        return 'en' if english / len(words) >= MIN_ENGLISH_RATIO else None
+
+    counts = {}
+    letters = 0
+    for ch in text:
+        if ch.isalpha():
+            letters += 1
+            script = _script_of(ch)
+            counts[script] = counts.get(script, 0) + 1
+    if not letters:
+        return None
+
+    if counts.get('kana'):
+        # Japanese mixes kana with kanji
+        script, count = 'kana', counts['kana'] + counts.get('han', 0)
+    else:
+        script, count = max(counts.items(), key=lambda item: item[1])
+    if count / letters < MIN_SCRIPT_RATIO:
+        return None
+
+    if script in _SCRIPT_LANGUAGES:
+        return _SCRIPT_LANGUAGES[script]
+    if script == 'kana':
+        return 'ja'
+    if script == 'han':
+        return 'zh-cn'
+    if script == 'cyrillic':
+        return 'uk' if _UKRAINIAN_LETTERS.intersection(text.lower()) else 'ru'
+    if script == 'arabic':
+        if _URDU_LETTERS.intersection(text):
+            return 'ur'
+        if _PERSIAN_LETTERS.intersection(text):
+            return 'fa'
+        return 'ar'
+    # Accented Latin and other scripts are shared by many languages
+    return None
+
+
+@lru_cache(maxsize=LANGDETECT_CACHE_SIZE)
+def _langdetect_cached(text):
+    try:
+        return _langdetect_detect(text)
+    except (LangDetectException, Exception):
+        return 'unknown'
+
+
+def detect_language(text):
+    """Detect the language of text, using langdetect only for ambiguous text"""
+    language = script_language(text)
+    if language is not None:
+        return language
+    if not LANGDETECT_AVAILABLE:
+        return 'en'  # Default to English
+    return _langdetect_cached(text)
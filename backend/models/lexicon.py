@@ -0,0 +1,147 @@
+"""
+Offensive lexicon matching backed by data/hate_keywords.txt
+
+Words and multi-word phrases are compiled into an Aho-Corasick automaton, so
+every hit in a message is found in one linear pass regardless of lexicon size.
+"""
+import hashlib
+import os
+from collections import deque
+
+DEFAULT_LEXICON_PATH = 'data/hate_keywords.txt'
+
+# Signal strength of lexicon hits. Both stay below MIN_HATE_CONFIDENCE
+# (models/rules.py): a hit only sends the text to the ML model, which decides.
+# Phrases are more specific than single words, so they score higher.
+LEXICON_WORD_CONFIDENCE = 0.4
+LEXICON_PHRASE_CONFIDENCE = 0.5
+
+
+def normalize_text(text):
+    """Lowercase, unify apostrophes and collapse whitespace"""
+    return ' '.join(text.lower().replace('’', "'").split())
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+def read_lexicon_file(path):
+    """Read terms from a lexicon file (one per line, '#' starts a comment line)"""
+    terms = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            term = normalize_text(line)
+            if not term or term.startswith('#'):
+                continue
+            terms.append(term)
+    return terms
+
+
+class AhoCorasickMatcher:
+    """Aho-Corasick automaton over characters with whole-word hit filtering"""
+
+    def __init__(self, terms):
+        self.terms = list(dict.fromkeys(terms))
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        # Trie of all terms
+        for term_index, term in enumerate(self.terms):
+            state = 0
+            for ch in term:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][ch] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append(term_index)
+
+        # Failure links (breadth-first), merging outputs along them
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(ch, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find_all(self, text):
+        """Return (start, end, term) for every whole-word hit in normalized text"""
+        goto, fail, output, terms = self.goto, self.fail, self.output, self.terms
+        hits = []
+        state = 0
+        length = len(text)
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not output[state]:
+                continue
+            end = position + 1
+            if end < length and _is_word_char(text[end]):
+                continue
+            for term_index in output[state]:
+                term = terms[term_index]
+                start = end - len(term)
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    hits.append((start, end, term))
+        return hits
+
+
+class Lexicon:
+    """Immutable snapshot of the offensive lexicon and its compiled matcher.
+
+    The detector swaps whole snapshots on reload, so a request that already
+    holds a reference keeps using a consistent automaton.
+    """
+
+    def __init__(self, terms, path=None):
+        terms = list(dict.fromkeys(terms))
+        self.path = path
+        self.words = frozenset(term for term in terms if ' ' not in term)
+        self.phrases = frozenset(term for term in terms if ' ' in term)
+        self.matcher = AhoCorasickMatcher(terms)
+        self.version = hashlib.sha256('\n'.join(sorted(terms)).encode('utf-8')).hexdigest()[:12]
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_LEXICON_PATH):
+        """Build a lexicon from a keywords file"""
+        return cls(read_lexicon_file(path), path=path)
+
+    @classmethod
+    def empty(cls):
+        return cls([])
+
+    def __len__(self):
+        return len(self.words) + len(self.phrases)
+
+    def find_hits(self, text):
+        """Return the distinct lexicon terms found in text, in order of appearance"""
+        if not len(self):
+            return []
+        hits = self.matcher.find_all(normalize_text(text))
+        return list(dict.fromkeys(term for _, _, term in hits))
+
+    def max_confidence(self, text):
+        """Return the signal strength of lexicon hits (0.0 if none)"""
+        hits = self.find_hits(text)
+        if not hits:
+            return 0.0
+        if any(' ' in term for term in hits):
+            return LEXICON_PHRASE_CONFIDENCE
+        return LEXICON_WORD_CONFIDENCE
+
+
+def load_lexicon(path=DEFAULT_LEXICON_PATH):
+    """Load the lexicon at path, or an empty lexicon if the file is missing"""
+    if os.path.exists(path):
+        return Lexicon.from_file(path)
+    return Lexicon.empty()
@@ -0,0 +1,98 @@
+"""
+Compact serve-time linear model distilled from the training ensemble
+
+The artifact (ml_model/linear_model.npz) holds one sparse weight vector and
+a bias over the TF-IDF features of ml_model/vectorizer.pkl. It is produced
+by ml_model/export_linear_model.py and exposes the small part of the sklearn
+classifier interface the detector uses (classes_, predict_proba, predict).
+"""
+import numpy as np
+
+DEFAULT_LINEAR_MODEL_PATH = 'ml_model/linear_model.npz'
+
+
+class LinearModel:
+    """Binary logistic model: P(classes_[1]) = sigmoid(x . w + b)"""
+
+    def __init__(self, weights, bias, classes):
+        self.coef_ = np.asarray(weights, dtype=np.float64)
+        self.intercept_ = float(bias)
+        self.classes_ = np.asarray(classes)
+        if len(self.classes_) != 2:
+            raise ValueError("LinearModel supports exactly two classes")
+
+    @property
+    def n_features(self):
+        return self.coef_.shape[0]
+
+    @classmethod
+    def from_estimator(cls, estimator, prune_below=0.0):
+        """Build from a fitted binary sklearn linear classifier.
+
+        Weights with an absolute value below prune_below are dropped.
+        """
+        weights = np.asarray(estimator.coef_, dtype=np.float64).ravel().copy()
+        if prune_below:
+            weights[np.abs(weights) < prune_below] = 0.0
+        return cls(weights, np.ravel(estimator.intercept_)[0], estimator.classes_)
+
+    def save(self, path=DEFAULT_LINEAR_MODEL_PATH):
+        """Write the weights in sparse form (non-zero indices and values)"""
+        indices = np.flatnonzero(self.coef_).astype(np.int32)
+        np.savez_compressed(
+            path,
+            indices=indices,
+            weights=self.coef_[indices].astype(np.float32),
+            bias=np.float64(self.intercept_),
+            n_features=np.int64(self.n_features),
+            classes=self.classes_
+        )
+
+    @classmethod
+    def load(cls, path=DEFAULT_LINEAR_MODEL_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            weights = np.zeros(int(data['n_features']), dtype=np.float64)
+            weights[data['indices']] = data['weights']
+            return cls(weights, data['bias'], data['classes'])
+
+    def decision_function(self, X):
+        """Return x . w + b for each row of the (sparse) feature matrix X"""
+        return np.asarray(X @ self.coef_).ravel() + self.intercept_
+
+    def predict_proba(self, X):
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+    def partial_fit(self, X, y, learning_rate=2.0, alpha=1e-6, epochs=3, batch_size=256,
+                    class_weight='balanced', random_state=0):
+        """Update the weights in place with mini-batch SGD on the log loss.
+
+        Used for online updates from moderator labels, so the model keeps
+        what it learned offline and moves towards the new examples. With
+        class_weight='balanced' the rarer class (usually the new hate
+        speech examples) weighs as much as the common one.
+        """
+        targets = (np.asarray(y) == self.classes_[1]).astype(np.float64)
+        rows = X.shape[0]
+        weights = np.ones(rows)
+        if class_weight == 'balanced':
+            for value in (0.0, 1.0):
+                count = np.count_nonzero(targets == value)
+                if count:
+                    weights[targets == value] = rows / (2.0 * count)
+
+        rng = np.random.RandomState(random_state)
+        for _ in range(epochs):
+            order = rng.permutation(rows)
+            for start in range(0, rows, batch_size):
+                batch = order[start:start + batch_size]
+                X_batch = X[batch]
+                probability = 1.0 / (1.0 + np.exp(-self.decision_function(X_batch)))
+                error = (probability - targets[batch]) * weights[batch]
+                gradient = np.asarray(X_batch.T @ error).ravel() / len(batch) + alpha * self.coef_
+                self.coef_ -= learning_rate * gradient
+                self.intercept_ -= learning_rate * float(error.mean())
+        return self
@@ -0,0 +1,127 @@
+"""
+In-process latency metrics for the detector
+
+analyze() and analyze_batch() time their stages with time.perf_counter_ns()
+(monotonic nanoseconds) and add them to fixed-bucket histograms, one per
+(call, stage):
+
+    language    language detection
+    translate   translation of non-English text
+    cache       result cache lookups
+    rules       safe-context, hate pattern and lexicon stages
+    preprocess  text preprocessing for the model
+    vectorize   feature extraction
+    model       model scoring
+    categorize  fusion and hate speech categorization
+    total       the whole call
+
+render_prometheus() writes them in the Prometheus text exposition format
+for GET /api/metrics. Histograms are cumulative, as Prometheus expects;
+use rate()/histogram_quantile() over a window for recent latency. Values
+are per process, so under gunicorn each worker reports its own.
+"""
+import bisect
+import os
+import threading
+
+METRICS_ENABLED = os.environ.get('DETECTOR_METRICS', 'true').lower() not in ('0', 'false', 'no', 'off')
+
+# Histogram bucket upper bounds in seconds (10us .. 5s)
+STAGE_BUCKETS_SECONDS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+METRIC_PREFIX = 'hate_speech_detector'
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_label_value(value)}"' for key, value in labels.items()) + '}'
+
+
+class Histogram:
+    """Fixed-bucket histogram of nanosecond durations"""
+
+    __slots__ = ('bounds_ns', 'counts', 'count', 'sum_ns')
+
+    def __init__(self, bounds_ns):
+        self.bounds_ns = bounds_ns
+        self.counts = [0] * (len(bounds_ns) + 1)
+        self.count = 0
+        self.sum_ns = 0
+
+    def observe(self, ns):
+        self.counts[bisect.bisect_left(self.bounds_ns, ns)] += 1
+        self.count += 1
+        self.sum_ns += ns
+
+
+class DetectorMetrics:
+    """Per-stage latency histograms and message/decision counters"""
+
+    def __init__(self, enabled=METRICS_ENABLED, buckets=STAGE_BUCKETS_SECONDS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._bounds_ns = tuple(int(bound * 1e9) for bound in buckets)
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.messages = {}
+        self.decisions = {}
+
+    def record(self, call, timings, messages=1, decisions=()):
+        """Add one call's stage timings (ns) and the stages that decided its messages"""
+        if not self.enabled:
+            return
+        with self._lock:
+            for stage, ns in timings.items():
+                histogram = self.histograms.get((call, stage))
+                if histogram is None:
+                    histogram = self.histograms[(call, stage)] = Histogram(self._bounds_ns)
+                histogram.observe(ns)
+            self.messages[call] = self.messages.get(call, 0) + messages
+            for decided_by in decisions:
+                self.decisions[decided_by] = self.decisions.get(decided_by, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.messages.clear()
+            self.decisions.clear()
+
+    def render_prometheus(self, info=None):
+        """Return the metrics in Prometheus text format (info: labels of an info gauge)"""
+        with self._lock:
+            histograms = {key: (list(h.counts), h.count, h.sum_ns) for key, h in self.histograms.items()}
+            messages = dict(self.messages)
+            decisions = dict(self.decisions)
+
+        lines = []
+        if info is not None:
+            lines += [f'# HELP {METRIC_PREFIX}_info Served model and detector settings',
+                      f'# TYPE {METRIC_PREFIX}_info gauge',
+                      f'{METRIC_PREFIX}_info{_labels(**info)} 1']
+
+        name = f'{METRIC_PREFIX}_stage_duration_seconds'
+        lines += [f'# HELP {name} Time spent per detector call in each analysis stage',
+                  f'# TYPE {name} histogram']
+        for (call, stage), (counts, count, sum_ns) in sorted(histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_labels(call=call, stage=stage, le=repr(float(bound)))} {cumulative}')
+            lines.append(f'{name}_bucket{_labels(call=call, stage=stage, le="+Inf")} {count}')
+            lines.append(f'{name}_sum{_labels(call=call, stage=stage)} {sum_ns / 1e9:.9f}')
+            lines.append(f'{name}_count{_labels(call=call, stage=stage)} {count}')
+
+        name = f'{METRIC_PREFIX}_messages_total'
+        lines += [f'# HELP {name} Messages analyzed', f'# TYPE {name} counter']
+        lines += [f'{name}{_labels(call=call)} {value}' for call, value in sorted(messages.items())]
+
+        name = f'{METRIC_PREFIX}_decisions_total'
+        lines += [f'# HELP {name} Messages by the analysis stage that decided them', f'# TYPE {name} counter']
+        lines += [f'{name}{_labels(decided_by=stage)} {value}' for stage, value in sorted(decisions.items())]
+        return '\n'.join(lines) + '\n'
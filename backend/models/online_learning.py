@@ -0,0 +1,209 @@
+"""
+Online model updates from moderator decisions
+
+Labeled examples are pulled from Mongo in batches, oldest first:
+    - violations (hate speech, 1) - recorded by automatic blocking and by
+      moderators warning/suspending a user for a given content
+    - cleared violations (not hate, 0) - violations a moderator overturned
+      when unsuspending a user
+    - published posts (not hate, 0) - content with no detection signal at
+      all (confidence_score 0) by authors who are not suspended; posts
+      published with a warning-level detection are not used as negatives
+
+Each run applies partial-fit updates to the served linear model
+(ml_model/linear_model.npz), saves the result as a new versioned artifact
+in ml_model/online/ and, when promoted, atomically replaces the served
+file so the detector can hot-swap it. When the model registry has an
+active version, that version is updated instead and the result is
+published as a new registry version (see models/registry.py). A watermark
+per source is kept in ml_model/online/state.json, so every example is
+learned once. Only promoted updates advance it: an update that is not
+promoted is a trial, and its examples are learned again by the next run,
+so they reach the served model line.
+"""
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import numpy as np
+
+from backend.models.features import HASHING_VECTORIZER_FILE, TFIDF_VECTORIZER_FILE
+from backend.models.linear import LinearModel, DEFAULT_LINEAR_MODEL_PATH
+from backend.models.registry import LINEAR_MODEL_FILE
+
+ONLINE_DIR = 'ml_model/online'
+ONLINE_STATE_FILE = 'state.json'
+
+# Examples fetched per source for each update batch
+ONLINE_BATCH_SIZE = 500
+
+# Posts used as not-hate examples. create_post stores is_hate_speech False
+# for every published post, including warning-level detections (nonzero
+# confidence_score), so only posts the detector saw no signal in count.
+CLEAN_POST_QUERY = {'is_hate_speech': False, 'confidence_score': 0, 'author_suspended': False}
+
+
+def load_state(online_dir=ONLINE_DIR):
+    path = os.path.join(online_dir, ONLINE_STATE_FILE)
+    if not os.path.exists(path):
+        return {'violation_at': None, 'violation_id': 0, 'post_at': None, 'post_id': 0,
+                'cleared_at': None, 'cleared_id': 0, 'versions': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state, online_dir=ONLINE_DIR):
+    os.makedirs(online_dir, exist_ok=True)
+    path = os.path.join(online_dir, ONLINE_STATE_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _after(field, at, doc_id):
+    """Query for documents after the (field, id) position at, doc_id.
+
+    Ids come from per-process blocks (see database._get_next_sequence), so
+    they do not follow insert order across workers; the time field does,
+    with id breaking ties. Without a time position (state saved before it
+    was tracked) the id alone is used.
+    """
+    if not at:
+        return {'id': {'$gt': doc_id or 0}}
+    at = datetime.fromisoformat(at)
+    return {'$or': [
+        {field: {'$gt': at}},
+        {field: at, 'id': {'$gt': doc_id or 0}}
+    ]}
+
+
+def fetch_labeled_batches(db, state, batch_size=ONLINE_BATCH_SIZE, max_batches=None):
+    """Yield (texts, labels, watermark) batches of examples newer than state.
+
+    Each batch mixes up to batch_size new examples from every source, so a
+    partial-fit step never sees a single class only. The watermark is the
+    state after the batch; callers save it once the batch has been learned.
+    """
+    watermark = dict(state)
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        texts, labels = [], []
+
+        # Cleared violations are ones a moderator overturned, relabeled as not hate speech
+        for prefix, collection, field, query, label in (
+            ('violation', db.violations, 'timestamp', {'cleared': {'$ne': True}}, 1),
+            ('post', db.posts, 'created_at', CLEAN_POST_QUERY, 0),
+            ('cleared', db.violations, 'cleared_at', {'cleared': True}, 0),
+        ):
+            at_key, id_key = f'{prefix}_at', f'{prefix}_id'
+            position = _after(field, watermark.get(at_key), watermark.get(id_key))
+            docs = list(
+                collection.find({**query, **position}, {'id': 1, 'content': 1, field: 1})
+                .sort([(field, 1), ('id', 1)])
+                .limit(batch_size)
+            )
+            if docs:
+                last_at = docs[-1].get(field)
+                watermark = {**watermark, at_key: last_at.isoformat() if last_at else None,
+                             id_key: docs[-1]['id']}
+                texts.extend(doc.get('content') or '' for doc in docs)
+                labels.extend([label] * len(docs))
+
+        if not texts:
+            break
+        batches += 1
+        yield texts, np.array(labels, dtype=int), watermark
+
+
+def apply_updates(model, vectorizer, preprocessor, batches, **fit_params):
+    """Partial-fit model on each (texts, labels, watermark) batch.
+
+    Returns (examples, positives, watermark of the last batch or None).
+    """
+    examples = positives = 0
+    watermark = None
+    for texts, labels, watermark in batches:
+        features = vectorizer.transform(preprocessor.preprocess_many(texts))
+        model.partial_fit(features, labels, **fit_params)
+        examples += len(labels)
+        positives += int(np.sum(labels))
+    return examples, positives, watermark
+
+
+def run_online_update(db, vectorizer, preprocessor, model_path=DEFAULT_LINEAR_MODEL_PATH,
+                      online_dir=ONLINE_DIR, batch_size=ONLINE_BATCH_SIZE, max_batches=None,
+                      promote=True, registry=None, **fit_params):
+    """Update the served linear model with new moderator labels.
+
+    Writes ml_model/online/linear_model-<version>.npz and, if promote is
+    set, atomically replaces model_path with it. If registry has an active
+    version, that version's linear model is updated instead and published
+    as a new registry version (activated if promote is set). The watermark
+    only advances when promote is set. Returns a summary dict.
+    """
+    parent = registry.active_version() if registry is not None else None
+    if parent:
+        model_path = os.path.join(registry.version_dir(parent), LINEAR_MODEL_FILE)
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(
+            f"{model_path} not found - online updates need the linear export "
+            "(run ml_model/export_linear_model.py or train with --streaming)"
+        )
+
+    state = load_state(online_dir)
+    model = LinearModel.load(model_path)
+    vector_size = len(vectorizer.vocabulary_) if hasattr(vectorizer, 'vocabulary_') else vectorizer.n_features
+    if model.n_features != vector_size:
+        raise ValueError(f"{model_path} has {model.n_features} features, the vectorizer produces {vector_size}")
+
+    batches = fetch_labeled_batches(db, state, batch_size=batch_size, max_batches=max_batches)
+    examples, positives, watermark = apply_updates(model, vectorizer, preprocessor, batches, **fit_params)
+    summary = {'examples': examples, 'positives': positives, 'version': None, 'promoted': False}
+    if not examples:
+        return summary
+
+    version = 'online-' + time.strftime('%Y%m%d%H%M%S', time.gmtime())
+    os.makedirs(online_dir, exist_ok=True)
+    version_path = os.path.join(online_dir, f'linear_model-{version}.npz')
+    model.save(version_path)
+
+    if parent:
+        summary['registry_version'] = _publish_update(registry, parent, version_path, examples, positives, promote)
+    elif promote:
+        # Copy next to the served file, then rename over it (atomic on one filesystem)
+        tmp_path = model_path + '.tmp.npz'
+        shutil.copyfile(version_path, tmp_path)
+        os.replace(tmp_path, model_path)
+
+    # An unpromoted model is not what later runs build on: keep its examples pending
+    new_state = dict(watermark if promote else state)
+    new_state['versions'] = state.get('versions', []) + [
+        {'version': version, 'examples': examples, 'positives': positives, 'promoted': promote}
+    ]
+    save_state(new_state, online_dir)
+    summary.update({'version': version, 'path': version_path, 'promoted': promote})
+    print(f"Online update {version}: {examples} examples ({positives} hate speech)")
+    return summary
+
+
+def _publish_update(registry, parent, model_path, examples, positives, activate):
+    """Publish an updated linear model with its parent version's vectorizer"""
+    parent_dir = registry.version_dir(parent)
+    files = {LINEAR_MODEL_FILE: model_path}
+    for name in (HASHING_VECTORIZER_FILE, TFIDF_VECTORIZER_FILE):
+        if os.path.exists(os.path.join(parent_dir, name)):
+            files[name] = os.path.join(parent_dir, name)
+            break
+    parent_metadata = registry.metadata(parent)
+    metadata = {
+        'source': 'online',
+        'parent': parent,
+        'feature_mode': parent_metadata.get('feature_mode'),
+        'training_data_hash': parent_metadata.get('training_data_hash'),
+        'online_examples': examples,
+        'online_positives': positives
+    }
+    return registry.publish(files, metadata, activate=activate)
@@ -0,0 +1,256 @@
+"""
+Versioned model registry
+
+    ml_model/registry/
+        ACTIVE                      name of the version the detector serves
+        SHADOW                      candidate version scored in shadow, if any
+        shadow-stats/<worker>.json  each worker's latest shadow stats snapshot
+        versions/v0001/
+            linear_model.npz        and/or hate_speech_model.pkl
+            vectorizer.pkl          or hashing_vectorizer.npz
+            metadata.json           created_at, training data hash, metrics, ...
+
+Versions are immutable once published: publish() assembles a version in a
+temporary directory and renames it into place, and activate() replaces the
+ACTIVE pointer with an atomic rename. A detector holds one ModelBundle and
+swaps the whole bundle, so a request never mixes two versions.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+from backend.models.features import load_vectorizer
+from backend.models.linear import LinearModel
+
+REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR', 'ml_model/registry')
+
+ENSEMBLE_MODEL_FILE = 'hate_speech_model.pkl'
+LINEAR_MODEL_FILE = 'linear_model.npz'
+METADATA_FILE = 'metadata.json'
+ACTIVE_FILE = 'ACTIVE'
+SHADOW_FILE = 'SHADOW'
+SHADOW_STATS_DIR = 'shadow-stats'
+
+_VERSION_NAME = re.compile(r'^v(\d+)$')
+
+
+def files_version(*paths):
+    """Short fingerprint of files based on their size and modification time"""
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns};'.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def file_sha256(path):
+    """Content hash of a file (e.g. the training data), read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, text):
+    """Replace path with text through a rename, so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class ModelBundle:
+    """A loaded model version: classifier, matching vectorizer and metadata"""
+
+    __slots__ = ('model', 'vectorizer', 'version', 'model_type', 'metadata')
+
+    def __init__(self, model, vectorizer, version, model_type, metadata=None):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.version = version
+        self.model_type = model_type
+        self.metadata = metadata or {}
+
+
+def load_bundle(model_dir, version=None, prefer_linear=True, mmap_mode=None):
+    """Load the model files in model_dir, or return None if there are none.
+
+    The compact linear export is used when present (unless prefer_linear is
+    False). Without an explicit version the files' fingerprint is used.
+    """
+    linear_path = os.path.join(model_dir, LINEAR_MODEL_FILE)
+    ensemble_path = os.path.join(model_dir, ENSEMBLE_MODEL_FILE)
+    use_linear = prefer_linear and os.path.exists(linear_path)
+    if not use_linear and not os.path.exists(ensemble_path):
+        return None
+
+    vectorizer, vectorizer_path = load_vectorizer(model_dir, mmap_mode=mmap_mode)
+    if vectorizer is None:
+        return None
+
+    if use_linear:
+        model, model_path, model_type = LinearModel.load(linear_path), linear_path, 'linear'
+    else:
+        import joblib
+        model, model_path, model_type = joblib.load(ensemble_path, mmap_mode=mmap_mode), ensemble_path, 'ensemble'
+
+    metadata = {}
+    metadata_path = os.path.join(model_dir, METADATA_FILE)
+    if os.path.exists(metadata_path):
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    return ModelBundle(model, vectorizer, version or files_version(model_path, vectorizer_path), model_type, metadata)
+
+
+class ModelRegistry:
+    """Directory of immutable model versions plus an ACTIVE pointer"""
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+        self.versions_dir = os.path.join(root, 'versions')
+        self.active_path = os.path.join(root, ACTIVE_FILE)
+        self.shadow_path = os.path.join(root, SHADOW_FILE)
+        self.shadow_stats_dir = os.path.join(root, SHADOW_STATS_DIR)
+
+    def version_dir(self, version):
+        if not _VERSION_NAME.match(version or ''):
+            raise ValueError(f"Invalid model version: {version!r}")
+        return os.path.join(self.versions_dir, version)
+
+    def list_versions(self):
+        if not os.path.isdir(self.versions_dir):
+            return []
+        names = [name for name in os.listdir(self.versions_dir) if _VERSION_NAME.match(name)]
+        return sorted(names, key=lambda name: int(name[1:]))
+
+    def metadata(self, version):
+        path = os.path.join(self.version_dir(version), METADATA_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def active_version(self):
+        try:
+            with open(self.active_path, 'r', encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def activate(self, version):
+        """Point ACTIVE at version (atomic rename)"""
+        if not os.path.isdir(self.version_dir(version)):
+            raise ValueError(f"Unknown model version: {version}")
+        _write_atomic(self.active_path, version + '\n')
+        print(f"Model version {version} activated")
+
+    def shadow_config(self):
+        """The shadow evaluation every worker should run: {version, sample_rate, started_at} or None"""
+        try:
+            with open(self.shadow_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def set_shadow(self, version, sample_rate=1.0):
+        """Ask every worker to shadow-score version (atomic rename); returns the config.
+
+        started_at identifies the run: stats snapshots of earlier runs are
+        discarded.
+        """
+        if not os.path.isdir(self.version_dir(version)):
+            raise ValueError(f"Unknown model version: {version}")
+        config = {
+            'version': version,
+            'sample_rate': sample_rate,
+            'started_at': datetime.now(timezone.utc).isoformat()
+        }
+        shutil.rmtree(self.shadow_stats_dir, ignore_errors=True)
+        _write_atomic(self.shadow_path, json.dumps(config))
+        return config
+
+    def clear_shadow(self):
+        """Ask every worker to stop shadow scoring and drop the stats snapshots"""
+        try:
+            os.remove(self.shadow_path)
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(self.shadow_stats_dir, ignore_errors=True)
+
+    def save_shadow_snapshot(self, snapshot):
+        """Store one worker's shadow stats snapshot (see ShadowEvaluator.snapshot)"""
+        path = os.path.join(self.shadow_stats_dir, f"{snapshot['worker']}.json")
+        _write_atomic(path, json.dumps(snapshot))
+
+    def shadow_snapshots(self, run_id):
+        """Every worker's latest snapshot of the shadow run started at run_id"""
+        snapshots = []
+        if not os.path.isdir(self.shadow_stats_dir):
+            return snapshots
+        for name in sorted(os.listdir(self.shadow_stats_dir)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.shadow_stats_dir, name), 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if snapshot.get('run_id') == run_id:
+                snapshots.append(snapshot)
+        return snapshots
+
+    def publish(self, files, metadata=None, activate=False):
+        """Copy model files into a new version and return its name.
+
+        files is a list of paths (the model and its vectorizer) or a dict of
+        {file name in the version: source path}; metadata is stored with
+        created_at, the version name and the file names.
+        """
+        if not isinstance(files, dict):
+            files = {os.path.basename(path): path for path in files}
+        os.makedirs(self.versions_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.publish-', dir=self.root)
+        try:
+            for name, path in files.items():
+                shutil.copy2(path, os.path.join(staging, name))
+
+            while True:
+                existing = self.list_versions()
+                version = f'v{(int(existing[-1][1:]) if existing else 0) + 1:04d}'
+                record = dict(metadata or {})
+                record.update({
+                    'version': version,
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                    'files': sorted(files)
+                })
+                with open(os.path.join(staging, METADATA_FILE), 'w', encoding='utf-8') as f:
+                    json.dump(record, f, indent=2)
+                try:
+                    # Fails if another publisher took this name first; retry with the next one
+                    os.rename(staging, self.version_dir(version))
+                    break
+                except OSError:
+                    if not os.path.isdir(self.version_dir(version)):
+                        raise
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        print(f"Model version {version} published to {self.version_dir(version)}")
+        if activate:
+            self.activate(version)
+        return version
+
+    def load(self, version=None, prefer_linear=True, mmap_mode=None):
+        """Load version (default: the active one) as a ModelBundle, or None"""
+        version = version or self.active_version()
+        if not version:
+            return None
+        return load_bundle(self.version_dir(version), version=version,
+                           prefer_linear=prefer_linear, mmap_mode=mmap_mode)
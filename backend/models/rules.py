@@ -0,0 +1,143 @@
+"""
+Precompiled rule engine for context-based hate speech detection
+"""
+import re
+
+# Context patterns that indicate non-hate speech (whitelist patterns)
+SAFE_PATTERNS = [
+    r'\bi love\b',
+    r'\blove\b.*\bnature\b',
+    r'\bnature\b.*\bbeautiful\b',
+    r'\bi like\b',
+    r'\bthank you\b',
+    r'\bgreat\b',
+    r'\bawesome\b',
+    r'\bwonderful\b',
+    r'\bamazing\b',
+    r'\bnever goes out of style\b',
+    r'\bis not allowed\b',
+    r'\bagainst hate\b',
+    r'\bstop hate\b',
+    r'\banti.?hate\b'
+]
+
+# Hate speech patterns targeting groups (stereotyping, generalizations)
+GROUP_HATE_PATTERNS = [
+    # Generalizations about groups
+    (r'\ball\s+(members\s+of\s+)?(that|those|these)?\s*(people|members|folks)\s+(from|of|in)\s+\w+\s+(are|is)\s+(\w+)', 0.8),
+    (r'\ball\s+\w+\s+(people|women|men|members)\s+(are|is)\s+(\w+)', 0.8),
+    (r'\bevery\s+\w+\s+(person|member|individual)\s+(is|are)\s+(\w+)', 0.75),
+    # Religious/ethnic targeting
+    (r'\ball\s+(members\s+of\s+)?(that|those)?\s*religion\s+(are|is)\s+\w+', 0.85),
+    (r'\b(all|every)\s+\w+\s+(from|of)\s+(that|those|the)\s+(country|place|religion)\s+(are|is)\s+\w+', 0.8),
+    # Body shaming and appearance-based discrimination
+    (r'\b(fat|overweight|obese)\s+(people|person|women|men)\s+(are|is)\s+(lazy|slobs|disgusting|ugly|worthless)', 0.85),
+    (r'\b(skinny|thin)\s+(people|person)\s+(are|is)\s+(weak|anorexic|disgusting)', 0.80),
+    (r'\b(ugly|hideous)\s+(people|person)\s+', 0.70),
+    # Age discrimination
+    (r'\b(old|elderly)\s+(people|person)\s+(are|is)\s+(useless|worthless)', 0.85),
+    (r'\b(old|elderly)\s+people\s+should\s+(just\s+)?(die|leave)', 0.90),
+    (r'\byoung\s+people\s+are\s+(stupid|lazy|entitled)', 0.75),
+    # Disability discrimination
+    (r'\b(disabled|handicapped)\s+(people|person)\s+(are|is)\s+(burden|useless|worthless)', 0.85),
+    (r'\b(disabled|handicapped)\s+(people|person)\s+(can\'t|cannot|dont|don\'t)\s+(contribute|work|help)', 0.85),
+    # Economic class discrimination
+    (r'\b(poor|homeless)\s+(people|person)\s+(are|is)\s+(lazy|worthless)', 0.80),
+    (r'\ball\s+(homeless|poor)\s+(are|is)\s+(drug addicts|criminals|lazy)', 0.85),
+    (r'\brich\s+people\s+are\s+(evil|parasites|greedy)', 0.75),
+    # Gender discrimination
+    (r'\b(women|men)\s+(are|is)\s+(too|all)\s+(emotional|weak|stupid|inferior)', 0.85),
+    (r'\b(women|girls)\s+belong\s+in\s+(kitchen|home)', 0.85),
+    # LGBTQ+ discrimination
+    (r'\b(gay|lesbian|trans|transgender)\s+(people|person)\s+(are|is)\s+\w+', 0.80),
+    # Specific hate speech indicators
+    (r'\b(terrorist|terrorists|criminals|inferior|subhuman|animals)\b', 0.7),
+    # "Your kind" type statements
+    (r'\byour\s+kind\s+(doesn\'t|dont|should|must|are|is)', 0.85),
+    (r'\bpeople\s+like\s+you\s+(are|should|must|dont|doesn\'t)', 0.75),
+    # Deportation/exclusion
+    (r'\bgo\s+back\s+(to|where)', 0.8),
+    (r'\bdon\'t\s+belong\s+here', 0.75),
+    (r'\bget\s+out\s+of\s+(our|this|my)', 0.75),
+]
+
+# Minimum pattern weight that counts as a hate speech hit
+MIN_HATE_CONFIDENCE = 0.7
+
+# Unescaped "(" that opens a capturing group
+_CAPTURING_GROUP = re.compile(r'(?<!\\)\((?!\?)')
+
+
+class RuleEngine:
+    """Compiled safe-context and group-hate patterns.
+
+    All patterns are compiled once. Safe patterns are merged into a single
+    alternation. Hate patterns are merged into a named-group alternation
+    (one empty marker group per rule) ordered by descending weight, so a
+    single scan answers the common "no match" case and a hit only needs to
+    re-check strictly stronger rules.
+    """
+
+    def __init__(self, safe_patterns=None, hate_patterns=None):
+        safe_patterns = SAFE_PATTERNS if safe_patterns is None else safe_patterns
+        hate_patterns = GROUP_HATE_PATTERNS if hate_patterns is None else hate_patterns
+
+        self.safe_regex = re.compile('|'.join(f'(?:{pattern})' for pattern in safe_patterns))
+
+        # Stable sort keeps the original order within a weight tier
+        ranked = sorted(enumerate(hate_patterns), key=lambda item: -item[1][1])
+        self.rule_weights = {f'r{index}': weight for index, (_, weight) in ranked}
+        self.hate_regex = self._compile_alternation(ranked)
+
+        # For each weight, an alternation of only the strictly stronger rules
+        self.stronger_regex = {}
+        for weight in set(self.rule_weights.values()):
+            stronger = [item for item in ranked if item[1][1] > weight]
+            self.stronger_regex[weight] = self._compile_alternation(stronger) if stronger else None
+
+    @staticmethod
+    def _compile_alternation(ranked):
+        # Each alternative ends in an empty named group identifying the rule.
+        # Inner groups are made non-capturing so the marker is the only group
+        # that can match, and so every alternative starts with a plain op that
+        # the regex engine can reject on the first character.
+        return re.compile('|'.join(
+            f'{_CAPTURING_GROUP.sub("(?:", pattern)}(?P<r{index}>)'
+            for index, (pattern, _) in ranked
+        ))
+
+    def is_safe_context(self, text_lower):
+        """Return True if the text matches any whitelist pattern"""
+        return self.safe_regex.search(text_lower) is not None
+
+    def max_hate_weight(self, text_lower):
+        """Return the highest weight among matching hate patterns (0.0 if none)"""
+        match = self.hate_regex.search(text_lower)
+        if match is None:
+            return 0.0
+
+        weight = self.rule_weights[match.lastgroup]
+        stronger = self.stronger_regex[weight]
+        while stronger is not None:
+            match = stronger.search(text_lower)
+            if match is None:
+                break
+            weight = self.rule_weights[match.lastgroup]
+            stronger = self.stronger_regex[weight]
+        return weight
+
+    def detect(self, text):
+        """Return (is_hate, confidence) using context and group patterns"""
+        text_lower = text.lower()
+
+        if self.is_safe_context(text_lower):
+            # Don't flag as hate speech if it's clearly in a positive/neutral context
+            return False, 0.0
+
+        max_group_confidence = self.max_hate_weight(text_lower)
+        if max_group_confidence >= MIN_HATE_CONFIDENCE:
+            # Strong hate speech pattern detected
+            return True, max_group_confidence
+
+        # No hate speech pattern detected
+        return False, 0.0
@@ -0,0 +1,232 @@
+"""
+Shadow evaluation of a candidate model on live traffic
+
+While a shadow is running, analyze() hands every message that reached the
+ML stage (cache hits and messages settled by the cheap rule stages are the
+same for any model) to a ShadowEvaluator after the response has been
+computed. A background thread scores the same preprocessed text with
+the candidate bundle, fuses it with the same rule-based result, and stores
+one record per message in a ring buffer:
+
+    - whether the final decisions (and the ML-only decisions) agree
+    - the candidate's hate speech probability minus the served model's
+    - per-message ML latency of both models
+
+The queue to the thread is bounded and never blocks: when the candidate
+falls behind, messages are counted as dropped instead of slowing down
+requests.
+
+Each process (gunicorn worker) scores its own traffic. The run is shared
+through the model registry (SHADOW, see models/registry.py): workers
+start and stop their shadow and store a snapshot() of their stats there
+from the model watch (HateSpeechDetector.sync_shadow), and
+merge_snapshots() combines the snapshots into stats for all traffic.
+"""
+import bisect
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+try:
+    SHADOW_BUFFER_SIZE = int(os.environ.get('SHADOW_BUFFER_SIZE', '10000'))
+except Exception:
+    SHADOW_BUFFER_SIZE = 10000
+try:
+    SHADOW_QUEUE_SIZE = int(os.environ.get('SHADOW_QUEUE_SIZE', '1000'))
+except Exception:
+    SHADOW_QUEUE_SIZE = 1000
+
+# Upper bounds (ms) of the per-message latency histogram buckets
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+# Disagreeing messages kept (with their text) for inspection
+MAX_DISAGREEMENTS = 50
+
+
+def _histogram(values):
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for value in values:
+        counts[bisect.bisect_left(LATENCY_BUCKETS_MS, value)] += 1
+    buckets = [{'le': bound, 'count': count} for bound, count in zip(LATENCY_BUCKETS_MS, counts)]
+    buckets.append({'le': 'inf', 'count': counts[-1]})
+    return buckets
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def _latency_summary(values):
+    ordered = sorted(values)
+    return {
+        'p50': _percentile(ordered, 0.5),
+        'p95': _percentile(ordered, 0.95),
+        'p99': _percentile(ordered, 0.99),
+        'histogram': _histogram(ordered)
+    }
+
+
+class ShadowEvaluator:
+    """Scores analyzed messages with a candidate bundle in a background thread"""
+
+    def __init__(self, detector, bundle, sample_rate=1.0, max_records=SHADOW_BUFFER_SIZE,
+                 queue_size=SHADOW_QUEUE_SIZE, run_id=None):
+        self.detector = detector
+        self.bundle = bundle
+        self.sample_rate = sample_rate
+        self.started_at = time.time()
+        # The registry's started_at for a shared run; snapshots are filed by worker
+        self.run_id = run_id
+        self.worker = str(os.getpid())
+        # (primary version, primary hate, candidate hate, primary ML hate, candidate ML hate,
+        #  score delta, primary ms, candidate ms)
+        self.records = deque(maxlen=max_records)
+        self.disagreements = deque(maxlen=MAX_DISAGREEMENTS)
+        self.submitted = self.scored = self.dropped = self.errors = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='model-shadow', daemon=True)
+        self._thread.start()
+
+    @property
+    def version(self):
+        return self.bundle.version
+
+    def submit(self, items, primary_version, primary_ms):
+        """Queue analyzed messages for the candidate without blocking.
+
+        items are (text, language, analysis_text, was_translated, rule_result,
+        ml_result, result) tuples from one analyze call; primary_ms is the
+        served model's ML time per message.
+        """
+        if self._stopped.is_set() or not items:
+            return
+        if self.sample_rate < 1.0:
+            items = [item for item in items if random.random() < self.sample_rate]
+            if not items:
+                return
+        try:
+            self._queue.put_nowait((items, primary_version, primary_ms))
+            self.submitted += len(items)
+        except queue.Full:
+            self.dropped += len(items)
+
+    def stop(self):
+        self._stopped.set()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def _run(self):
+        while not self._stopped.is_set():
+            job = self._queue.get()
+            if job is None:
+                break
+            try:
+                self._score(*job)
+            except Exception as e:
+                self.errors += len(job[0])
+                print(f"Shadow model error: {e}")
+
+    def _score(self, items, primary_version, primary_ms):
+        start = time.perf_counter()
+        ml_results = self.detector.predict_batch_with_model([item[2] for item in items], self.bundle)
+        candidate_ms = (time.perf_counter() - start) * 1000 / len(items)
+
+        for (text, language, analysis_text, was_translated, rule_result, ml_result, result), candidate_ml in zip(items, ml_results):
+            candidate = self.detector._combine_results(text, language, analysis_text, was_translated,
+                                                       rule_result, candidate_ml, self.bundle.version)
+            self.records.append((
+                primary_version,
+                result['is_hate_speech'], candidate['is_hate_speech'],
+                ml_result[0], candidate_ml[0],
+                candidate_ml[1] - ml_result[1],
+                primary_ms, candidate_ms
+            ))
+            self.scored += 1
+            if result['is_hate_speech'] != candidate['is_hate_speech']:
+                self.disagreements.append({
+                    'at': time.time(),
+                    'text': text,
+                    'primary': {'is_hate_speech': result['is_hate_speech'], 'confidence': result['confidence'],
+                                'ml_confidence': round(ml_result[1], 4)},
+                    'candidate': {'is_hate_speech': candidate['is_hate_speech'], 'confidence': candidate['confidence'],
+                                  'ml_confidence': round(candidate_ml[1], 4)}
+                })
+
+    def stats(self, disagreements=10):
+        """Agreement, score deltas and latency histograms over the ring buffer"""
+        return _summarize([self.snapshot()], disagreements)
+
+    def snapshot(self):
+        """Counters, ring buffer and disagreements as JSON-serializable data"""
+        return {
+            'run_id': self.run_id,
+            'worker': self.worker,
+            'pid': os.getpid(),
+            'written_at': time.time(),
+            'candidate_version': self.bundle.version,
+            'sample_rate': self.sample_rate,
+            'started_at': self.started_at,
+            'submitted': self.submitted,
+            'scored': self.scored,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            # list() copies the deque in one step; the scoring thread keeps appending
+            'records': [list(record) for record in list(self.records)],
+            'disagreements': list(self.disagreements)
+        }
+
+
+def merge_snapshots(snapshots, disagreements=10):
+    """Stats over the snapshots of several workers (None if there are none)"""
+    if not snapshots:
+        return None
+    stats = _summarize(snapshots, disagreements)
+    stats['workers'] = [
+        {'pid': snapshot['pid'], 'scored': snapshot['scored'], 'records': len(snapshot['records']),
+         'age_seconds': round(time.time() - snapshot['written_at'], 1)}
+        for snapshot in snapshots
+    ]
+    return stats
+
+
+def _summarize(snapshots, disagreements):
+    records = [record for snapshot in snapshots for record in snapshot['records']]
+    count = len(records)
+    deltas = sorted(abs(record[5]) for record in records)
+    recent = sorted((item for snapshot in snapshots for item in snapshot['disagreements']),
+                    key=lambda item: item['at'])
+    first = snapshots[0]
+    return {
+        'candidate_version': first['candidate_version'],
+        'primary_versions': sorted({str(record[0]) for record in records}),
+        'sample_rate': first['sample_rate'],
+        'running_seconds': round(time.time() - min(snapshot['started_at'] for snapshot in snapshots), 1),
+        'submitted': sum(snapshot['submitted'] for snapshot in snapshots),
+        'scored': sum(snapshot['scored'] for snapshot in snapshots),
+        'records': count,
+        'dropped': sum(snapshot['dropped'] for snapshot in snapshots),
+        'errors': sum(snapshot['errors'] for snapshot in snapshots),
+        'agreement_rate': sum(record[1] == record[2] for record in records) / count if count else None,
+        'ml_agreement_rate': sum(record[3] == record[4] for record in records) / count if count else None,
+        'primary_positive_rate': sum(record[1] for record in records) / count if count else None,
+        'candidate_positive_rate': sum(record[2] for record in records) / count if count else None,
+        'score_delta': {
+            'mean': sum(record[5] for record in records) / count if count else None,
+            'mean_abs': sum(deltas) / count if count else None,
+            'p95_abs': _percentile(deltas, 0.95),
+            'max_abs': deltas[-1] if deltas else None
+        },
+        'latency_ms': {
+            'primary': _latency_summary(record[6] for record in records),
+            'candidate': _latency_summary(record[7] for record in records)
+        },
+        'disagreements': recent[-disagreements:] if disagreements else []
+    }
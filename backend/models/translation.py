@@ -0,0 +1,183 @@
+"""
+Pluggable translation backends with a persistent translation cache
+
+Backends translate text to English for analysis:
+    - 'google':      googletrans (network, optional dependency)
+    - 'phrase_table': local phrase table (data/phrase_table.tsv, no network)
+    - 'none':        never translate
+
+Select one with the TRANSLATION_BACKEND environment variable.
+"""
+import hashlib
+import importlib.util
+import os
+import re
+import sqlite3
+import threading
+
+# Translation support (optional); googletrans is imported when first used
+GOOGLETRANS_AVAILABLE = importlib.util.find_spec('googletrans') is not None
+if not GOOGLETRANS_AVAILABLE:
+    print("googletrans not available - using offline phrase table translation")
+
+DEFAULT_PHRASE_TABLE_PATH = 'data/phrase_table.tsv'
+DEFAULT_TRANSLATION_CACHE_PATH = 'instance/translation_cache.db'
+
+_WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?", re.UNICODE)
+
+
+class TranslationBackend:
+    """Base class: translate text from source_lang to English"""
+
+    name = 'base'
+    # Whether results are worth storing in the on-disk TranslationCache
+    cacheable = False
+
+    def translate(self, text, source_lang):
+        """Return (translated_text, was_translated)"""
+        raise NotImplementedError
+
+
+class NullBackend(TranslationBackend):
+    """Never translates (analysis runs on the original text)"""
+
+    name = 'none'
+
+    def translate(self, text, source_lang):
+        return text, False
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    """Online translation through googletrans"""
+
+    name = 'google'
+    cacheable = True
+
+    def __init__(self):
+        from googletrans import Translator
+        self.translator = Translator()
+
+    def translate(self, text, source_lang):
+        translated = self.translator.translate(text, src=source_lang, dest='en')
+        return translated.text, True
+
+
+class PhraseTableBackend(TranslationBackend):
+    """Offline word and phrase substitution from a tab-separated phrase table.
+
+    Each line is "<lang>\\t<source phrase>\\t<english phrase>". Text is
+    tokenized once and the longest matching phrase wins at each position;
+    unknown words are kept as-is, so names and loanwords survive.
+    """
+
+    name = 'phrase_table'
+
+    def __init__(self, path=DEFAULT_PHRASE_TABLE_PATH):
+        self.path = path
+        self.tables = {}
+        self.max_phrase_words = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip() or line.startswith('#'):
+                        continue
+                    lang, source, target = line.rstrip('\n').split('\t')
+                    key = tuple(source.lower().split())
+                    self.tables.setdefault(lang, {})[key] = target
+                    self.max_phrase_words[lang] = max(self.max_phrase_words.get(lang, 1), len(key))
+
+    def translate(self, text, source_lang):
+        table = self.tables.get(source_lang)
+        if not table:
+            return text, False
+
+        words = _WORD.findall(text.lower())
+        max_words = self.max_phrase_words[source_lang]
+        output = []
+        matched = False
+        position = 0
+        while position < len(words):
+            for size in range(min(max_words, len(words) - position), 0, -1):
+                target = table.get(tuple(words[position:position + size]))
+                if target is not None:
+                    output.append(target)
+                    matched = True
+                    position += size
+                    break
+            else:
+                output.append(words[position])
+                position += 1
+
+        if not matched:
+            return text, False
+        return ' '.join(output), True
+
+
+class TranslationCache:
+    """On-disk translation cache keyed by (backend, source language, text hash).
+
+    Backed by SQLite so gunicorn workers share entries. Cache errors are
+    reported and ignored: a broken cache never blocks analysis.
+    """
+
+    def __init__(self, path=DEFAULT_TRANSLATION_CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self.enabled = bool(path)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS translations ('
+                'backend TEXT, source_lang TEXT, text_hash TEXT, translation TEXT, '
+                'PRIMARY KEY (backend, source_lang, text_hash))'
+            )
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, backend, source_lang, text):
+        if not self.enabled:
+            return None
+        try:
+            row = self._connection().execute(
+                'SELECT translation FROM translations WHERE backend = ? AND source_lang = ? AND text_hash = ?',
+                (backend, source_lang, self.text_hash(text))
+            ).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            print(f"Translation cache error: {e}")
+            return None
+
+    def put(self, backend, source_lang, text, translation):
+        if not self.enabled:
+            return
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)',
+                    (backend, source_lang, self.text_hash(text), translation)
+                )
+        except sqlite3.Error as e:
+            print(f"Translation cache error: {e}")
+
+
+def get_translation_backend(name=None):
+    """Build the configured backend (TRANSLATION_BACKEND, default google if installed)"""
+    name = name or os.environ.get('TRANSLATION_BACKEND') or ('google' if GOOGLETRANS_AVAILABLE else 'phrase_table')
+    if name == 'google' and GOOGLETRANS_AVAILABLE:
+        return GoogleTranslateBackend()
+    if name == 'none':
+        return NullBackend()
+    if name != 'phrase_table':
+        print(f"Translation backend '{name}' unavailable - using offline phrase table")
+    return PhraseTableBackend(os.environ.get('PHRASE_TABLE_PATH', DEFAULT_PHRASE_TABLE_PATH))
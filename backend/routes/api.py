@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from backend.database import (
     create_user,
     create_user_with_id,
@@ -9,26 +9,39 @@ from backend.database import (
     to_user_dict,
     check_password,
     update_user,
-    increment_user_warning,
+    record_warning,
     create_violation,
     list_violations,
+    violations_query,
+    count_total,
     list_violations_by_user,
     count_violations,
+    clear_user_violations,
     list_recent_violations,
     get_violations_by_category,
     count_users,
     count_suspended_users,
     count_posts,
     list_posts,
+    feed_query,
     create_post as create_post_doc,
     get_post_by_id,
-    update_post,
+    increment_post_likes,
     delete_post_by_id,
     list_posts_by_user,
-    to_violation_dict,
-    to_post_dict
+    to_post_dict,
+    to_user_dicts,
+    to_violation_dicts,
+    to_post_dicts,
+    sync_author_suspended,
+    get_write_buffer,
+    _get_db
 )
-from backend.models.detector import detector
+from backend.models.detector import detector, BLOCK_CONFIDENCE
+from backend.models.metrics import DetectorMetrics
+from backend.models.shadow import merge_snapshots
+from backend.models.online_learning import run_online_update, ONLINE_BATCH_SIZE
+from backend.utils.preprocessing import categorize_hate_speech
 from backend.utils.email_service import email_service
 from backend.utils.api_keys import (
     create_api_key,
@@ -39,31 +52,43 @@ from backend.utils.api_keys import (
 )
 from datetime import datetime
 import os
+import json
 from functools import wraps
 
 api_bp = Blueprint('api', __name__)
 
+def _check_api_key(calls=1):
+    """Validate and track the optional X-API-Key header for `calls` items.
+
+    Returns an error response tuple, or None when the request may proceed.
+    """
+    api_key = request.headers.get('X-API-Key')
+    
+    if api_key:
+        # Validate and track if API key provided
+        is_valid, key_doc, error = validate_api_key(api_key, calls=calls)
+        if not is_valid:
+            return jsonify({'error': error}), 401
+        
+        # Track API usage (one call per analyzed item)
+        track_api_call(api_key, calls=calls)
+        
+        # Add key info to request context
+        request.api_key_tier = key_doc.get('tier')
+    else:
+        # No API key - allow for internal/frontend use
+        request.api_key_tier = None
+    
+    return None
+
 # API Key authentication decorator (optional - for external API access)
 def require_api_key_optional(f):
     """Optional API key check - tracks usage if key provided"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        api_key = request.headers.get('X-API-Key')
-        
-        if api_key:
-            # Validate and track if API key provided
-            is_valid, key_doc, error = validate_api_key(api_key)
-            if not is_valid:
-                return jsonify({'error': error}), 401
-            
-            # Track API call
-            track_api_call(api_key)
-            
-            # Add key info to request context
-            request.api_key_tier = key_doc.get('tier')
-        else:
-            # No API key - allow for internal/frontend use
-            request.api_key_tier = None
+        error_response = _check_api_key()
+        if error_response:
+            return error_response
         
         return f(*args, **kwargs)
     return decorated_function
@@ -130,12 +155,109 @@ def logout():
 
 # Configuration
 MAX_WARNINGS = 3
-# Minimum confidence required to block a post automatically (0.0-1.0)
-# Read from environment so it can be tuned without code changes
+# Minimum confidence required to block a post automatically is
+# BLOCK_CONFIDENCE (env, see models/detector.py)
+# Maximum number of texts accepted by /analyze/batch, and how many are
+# scored per detector call before results are flushed to the client
+try:
+    BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', '1000'))
+except Exception:
+    BATCH_MAX_ITEMS = 1000
 try:
-    BLOCK_CONFIDENCE = float(os.environ.get('BLOCK_CONFIDENCE', '0.8'))
+    BATCH_CHUNK_SIZE = max(1, int(os.environ.get('BATCH_CHUNK_SIZE', '256')))
 except Exception:
-    BLOCK_CONFIDENCE = 0.8
+    BATCH_CHUNK_SIZE = 256
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+# How list endpoints report totals: ?total=estimated (default), exact or none
+TOTAL_MODES = ('estimated', 'exact', 'none')
+
+# Request header that adds per-stage "timings" (nanoseconds) to /analyze results
+DEBUG_TIMINGS_HEADER = 'X-Debug-Timings'
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _translate_flag(data=None):
+    """Per-request translation switch: body "translate" or ?translate=false"""
+    if isinstance(data, dict) and 'translate' in data:
+        value = data['translate']
+    else:
+        value = request.args.get('translate', 'true')
+    if isinstance(value, str):
+        return value.strip().lower() not in ('false', '0', 'no', 'off')
+    return bool(value)
+
+def _debug_timings():
+    """Return a dict to collect stage timings in when the debug header is set"""
+    value = request.headers.get(DEBUG_TIMINGS_HEADER, '')
+    return {} if value.strip().lower() in ('1', 'true', 'yes', 'on') else None
+
+def _pagination_args(default_per_page, max_per_page=100):
+    """Read page/per_page/cursor/total query args of a list endpoint"""
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(max(1, request.args.get('per_page', default_per_page, type=int)), max_per_page)
+    cursor = request.args.get('cursor') or None
+    total_mode = request.args.get('total', 'estimated').lower()
+    if total_mode not in TOTAL_MODES:
+        raise ValueError(f"total must be one of {', '.join(TOTAL_MODES)}")
+    return page, per_page, cursor, total_mode
+
+def _page_info(page, per_page, cursor, next_cursor, total, total_mode):
+    """Pagination fields shared by the list endpoints"""
+    info = {
+        'next_cursor': next_cursor,
+        'total': total,
+        'total_estimated': total_mode == 'estimated'
+    }
+    if not cursor:
+        info['page'] = page
+        info['pages'] = (total + per_page - 1) // per_page if total is not None else None
+    return info
+
+def suggest_action(result):
+    """Suggest a moderation action for an analysis result (no side effects)"""
+    if result['is_hate_speech'] and result['confidence'] >= BLOCK_CONFIDENCE:
+        return 'block'
+    elif result['is_hate_speech']:
+        return 'warning'
+    return 'none'
+
+@api_bp.route('/health', methods=['GET'])
+def health():
+    """Liveness plus detector readiness (the detector loads lazily on first use)"""
+    return jsonify({
+        'success': True,
+        'status': 'ok',
+        'detector': {
+            'state': detector.state,
+            'ready': detector.is_ready,
+            'error': detector.error,
+            # Only reported once loaded, so health checks never trigger the model load
+            'model_version': detector.model_version if detector.is_ready else None,
+            'model_type': detector.model_type if detector.is_ready else None
+        }
+    }), 200
+
+@api_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Detector stage latency histograms, counters and write buffer counters in
+    Prometheus text format.
+    Per process: under gunicorn each worker reports its own values.
+    """
+    try:
+        if not detector.is_ready:
+            # Do not load the model just to report that nothing was measured yet
+            body = DetectorMetrics(enabled=False).render_prometheus(info={'state': detector.state})
+        else:
+            body = detector.metrics.render_prometheus(info={
+                'state': detector.state,
+                'model_version': detector.model_version or '',
+                'model_type': detector.model_type or 'rules'
+            })
+        body += get_write_buffer().render_prometheus()
+        return Response(body, mimetype=PROMETHEUS_MIMETYPE), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 @api_bp.route('/analyze', methods=['POST'])
 @require_api_key_optional
@@ -145,12 +267,14 @@ def analyze_text():
     
     Headers:
         X-API-Key: Optional API key for external access
+        X-Debug-Timings: Optional, "1" adds result.timings (stage -> nanoseconds)
     
     Body:
         {
             "text": "Text to analyze",
             "user_id": "optional_user_id",
-            "username": "optional_username"
+            "username": "optional_username",
+            "translate": true  // optional, false skips translation
         }
     
     Response:
@@ -178,7 +302,10 @@ def analyze_text():
         username = data.get('username', f'user_{user_id}')
         
         # Analyze text (now with multi-language support)
-        result = detector.analyze(text)
+        timings = _debug_timings()
+        result = detector.analyze(text, translate=_translate_flag(data), timings=timings)
+        if timings is not None:
+            result['timings'] = timings
         
         # Get or create user
         user = None
@@ -194,12 +321,7 @@ def analyze_text():
         # Analysis endpoint should be side-effect free: do not modify DB.
         # Only suggest an action based on detection. We consider a 'block' action
         # only when the detector reports hate speech with high confidence.
-        if result['is_hate_speech'] and result['confidence'] >= BLOCK_CONFIDENCE:
-            action_taken = 'block'
-        elif result['is_hate_speech']:
-            action_taken = 'warning'
-        else:
-            action_taken = 'none'
+        action_taken = suggest_action(result)
         
         return jsonify({
             'success': True,
@@ -213,6 +335,108 @@ def analyze_text():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _parse_batch_items():
+    """Parse /analyze/batch input into a list of {'id', 'text'} items.
+
+    Accepts a JSON array, a JSON object with a "texts" array, or an NDJSON
+    body (one JSON string or object per line). Each element may be a plain
+    string or an object with "text" and an optional "id".
+
+    Returns (items, options) where options is the JSON object body, if any.
+    """
+    options = None
+    if request.mimetype in NDJSON_MIMETYPES:
+        raw_items = [
+            json.loads(line)
+            for line in request.get_data(as_text=True).splitlines()
+            if line.strip()
+        ]
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            options = data
+            raw_items = data.get('texts')
+        else:
+            raw_items = data
+
+    if not isinstance(raw_items, list):
+        raise ValueError('Body must be a JSON array of texts or an NDJSON stream')
+
+    items = []
+    for raw in raw_items:
+        if isinstance(raw, str):
+            items.append({'id': None, 'text': raw})
+        elif isinstance(raw, dict) and isinstance(raw.get('text'), str):
+            items.append({'id': raw.get('id'), 'text': raw['text']})
+        else:
+            raise ValueError('Each item must be a string or an object with a "text" string')
+    return items, options
+
+@api_bp.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """
+    Analyze many texts in one request, streaming results as NDJSON
+    
+    Headers:
+        X-API-Key: Optional API key (usage is counted per item)
+        Content-Type: application/json or application/x-ndjson
+        X-Debug-Timings: Optional, "1" adds result.timings (stage -> nanoseconds).
+            The model scores a chunk of texts in one pass, so these are
+            per-message averages over the item's chunk
+    
+    Body (JSON):
+        ["text 1", "text 2"]  or  {"texts": ["text 1", {"id": "p2", "text": "text 2"}]}
+        Translation can be skipped with {"translate": false} or ?translate=false
+    
+    Body (NDJSON):
+        {"id": "p1", "text": "text 1"}
+        {"id": "p2", "text": "text 2"}
+    
+    Response (application/x-ndjson, one line per item, in input order):
+        {"index": 0, "id": "p1", "result": {...}, "action_taken": "none"}
+    """
+    try:
+        items, options = _parse_batch_items()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    translate = _translate_flag(options)
+    debug_timings = _debug_timings() is not None
+
+    if not items:
+        return jsonify({'error': 'At least one text is required'}), 400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({'error': f'Too many texts (max {BATCH_MAX_ITEMS} per request)'}), 413
+
+    error_response = _check_api_key(calls=len(items))
+    if error_response:
+        return error_response
+
+    def generate():
+        # Score in chunks so the first results reach the client while the
+        # rest of a large batch is still being processed
+        for start in range(0, len(items), BATCH_CHUNK_SIZE):
+            chunk = items[start:start + BATCH_CHUNK_SIZE]
+            timings = {} if debug_timings else None
+            try:
+                results = detector.analyze_batch([item['text'] for item in chunk], translate=translate,
+                                                 timings=timings)
+            except Exception as e:
+                yield json.dumps({'error': str(e)}) + '\n'
+                return
+            if timings is not None:
+                average = {stage: ns // len(chunk) for stage, ns in timings.items()}
+                for result in results:
+                    result['timings'] = dict(average)
+            for offset, (item, result) in enumerate(zip(chunk, results)):
+                yield json.dumps({
+                    'index': start + offset,
+                    'id': item['id'],
+                    'result': result,
+                    'action_taken': suggest_action(result)
+                }) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @api_bp.route('/users', methods=['GET'])
 def get_users():
     """Get all users"""
@@ -220,7 +444,7 @@ def get_users():
         users = list_users()
         return jsonify({
             'success': True,
-            'users': [to_user_dict(user) for user in users],
+            'users': to_user_dicts(users),
             'total': len(users)
         }), 200
     except Exception as e:
@@ -238,11 +462,22 @@ def get_user(user_id):
         return jsonify({
             'success': True,
             'user': to_user_dict(user),
-            'violations': [to_violation_dict(v) for v in violations]
+            'violations': to_violation_dicts(violations, usernames={user['id']: user['username']})
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _record_moderator_violation(user_id, content, action_taken):
+    """Store content a moderator acted on as a violation"""
+    create_violation({
+        'user_id': user_id,
+        'content': content,
+        'category': categorize_hate_speech(content),
+        'confidence_score': 1.0,
+        'language': detector.detect_language(content),
+        'action_taken': action_taken
+    })
+
 @api_bp.route('/users/<int:user_id>/warn', methods=['POST'])
 def warn_user(user_id):
     """Manually warn a user"""
@@ -251,20 +486,20 @@ def warn_user(user_id):
         reason = data.get('reason', 'Community guidelines violation')
         content = data.get('content', 'Manual warning by administrator')
 
-        user = get_user_by_id(user_id)
+        # Warn and, at MAX_WARNINGS, suspend in one atomic update
+        user, _ = record_warning(user_id, MAX_WARNINGS)
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
-        user = increment_user_warning(user_id, 1)
-
-        # Check for suspension
         should_suspend = user.get('warning_count', 0) >= MAX_WARNINGS
-        
-        if should_suspend:
-            user = update_user(user_id, {
-                'is_suspended': True,
-                'suspended_at': datetime.utcnow()
-            })
+
+        # Counted before the (buffered) insert of the new violation
+        violations_count = count_violations({'user_id': int(user_id)})
+
+        # Moderator-flagged content is a labeled example for online learning
+        if data.get('content'):
+            _record_moderator_violation(user_id, content, 'manual_suspension' if should_suspend else 'manual_warning')
+            violations_count += 1
 
         # Send email notification
         if should_suspend:
@@ -287,7 +522,7 @@ def warn_user(user_id):
 
         return jsonify({
             'success': True,
-            'user': to_user_dict(user),
+            'user': to_user_dict(user, violations_count=violations_count),
             'message': f"User {user.get('username')} has been warned. Email notification sent.",
             'suspended': should_suspend
         }), 200
@@ -311,10 +546,14 @@ def suspend_user(user_id):
             'suspended_at': datetime.utcnow()
         })
 
-        # Get violation count
-        violation_count = count_violations({'user_id': int(user_id)})
-        if violation_count == 0:
-            violation_count = user.get('warning_count', 0)
+        # Get violation count (before the buffered insert of the new one)
+        violations_count = count_violations({'user_id': int(user_id)})
+
+        if data.get('content'):
+            _record_moderator_violation(user_id, content, 'manual_suspension')
+            violations_count += 1
+
+        violation_count = violations_count or user.get('warning_count', 0)
         
         # Send suspension email
         email_service.send_suspension_email(
@@ -327,7 +566,7 @@ def suspend_user(user_id):
         
         return jsonify({
             'success': True,
-            'user': to_user_dict(user),
+            'user': to_user_dict(user, violations_count=violations_count),
             'message': f"User {user.get('username')} has been suspended. Email notification sent."
         }), 200
     except Exception as e:
@@ -335,8 +574,13 @@ def suspend_user(user_id):
 
 @api_bp.route('/users/<int:user_id>/unsuspend', methods=['POST'])
 def unsuspend_user(user_id):
-    """Unsuspend a user"""
+    """Unsuspend a user
+    
+    Body (optional): { clear_violations: true } marks the user's violations as
+    overturned, which online learning uses as not-hate-speech labels.
+    """
     try:
+        data = request.get_json(silent=True) or {}
         user = get_user_by_id(user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -346,10 +590,12 @@ def unsuspend_user(user_id):
             'suspended_at': None,
             'warning_count': 0
         })
+        cleared = clear_user_violations(user_id) if data.get('clear_violations') else 0
         
         return jsonify({
             'success': True,
             'user': to_user_dict(user),
+            'violations_cleared': cleared,
             'message': f"User {user.get('username')} has been unsuspended"
         }), 200
     except Exception as e:
@@ -357,23 +603,24 @@ def unsuspend_user(user_id):
 
 @api_bp.route('/violations', methods=['GET'])
 def get_violations():
-    """Get all violations"""
+    """Get violations, newest first.
+    Query: cursor=<next_cursor of the previous page> (or page=<n>), per_page,
+    category, total=estimated|exact|none
+    """
     try:
-        # Pagination
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
+        page, per_page, cursor, total_mode = _pagination_args(default_per_page=50)
         category = request.args.get('category', None)
 
-        violations, total = list_violations(page=page, per_page=per_page, category=category)
-        pages = (total + per_page - 1) // per_page
+        violations, next_cursor = list_violations(page=page, per_page=per_page, category=category, cursor=cursor)
+        total = count_total('violations', violations_query(category), total_mode)
 
         return jsonify({
             'success': True,
-            'violations': [to_violation_dict(v) for v in violations],
-            'total': total,
-            'page': page,
-            'pages': pages
+            'violations': to_violation_dicts(violations),
+            **_page_info(page, per_page, cursor, next_cursor, total, total_mode)
         }), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -406,7 +653,7 @@ def get_statistics():
                 'hate_speech_percentage': round((hate_speech_posts / total_posts * 100) if total_posts > 0 else 0, 2)
             },
             'violations_by_category': violations_by_category,
-            'recent_violations': [to_violation_dict(v) for v in recent_violations]
+            'recent_violations': to_violation_dicts(recent_violations)
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -430,24 +677,39 @@ def reload_lexicon():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Admin: Re-sync the feed's copy of each author's suspension state
+@api_bp.route('/admin/posts/sync-suspended', methods=['POST'])
+def sync_suspended_posts():
+    """Re-apply users' suspension state to their posts' author_suspended flag."""
+    try:
+        return jsonify({
+            'success': True,
+            'posts_updated': sync_author_suspended()
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Posts endpoints
 @api_bp.route('/posts', methods=['GET'])
 def get_posts():
-    """Get all posts (feed)"""
+    """Get the feed, newest first.
+    Query: cursor=<next_cursor of the previous page> (or page=<n>), per_page,
+    total=estimated|exact|none
+    """
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = 20
+        page, per_page, cursor, total_mode = _pagination_args(default_per_page=20)
 
-        posts, total = list_posts(page=page, per_page=per_page, include_hate=False)
-        pages = (total + per_page - 1) // per_page
+        query = feed_query(include_hate=False)
+        posts, next_cursor = list_posts(page=page, per_page=per_page, cursor=cursor, query=query)
+        total = count_total('posts', query, total_mode)
 
         return jsonify({
             'success': True,
-            'posts': [to_post_dict(post) for post in posts],
-            'total': total,
-            'page': page,
-            'pages': pages
+            'posts': to_post_dicts(posts),
+            **_page_info(page, per_page, cursor, next_cursor, total, total_mode)
         }), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -516,6 +778,181 @@ def update_lexicon():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Admin: analyze() result cache
+@api_bp.route('/admin/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Return analyze() result cache size and hit/miss counters."""
+    try:
+        return jsonify({
+            'success': True,
+            'cache': detector.result_cache.stats()
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Admin: online learning from moderator decisions
+@api_bp.route('/admin/model/online-update', methods=['POST'])
+def online_update_model():
+    """Partial-fit the served linear model on new moderator labels and hot-swap it.
+    Body JSON (all optional): { batch_size: int, max_batches: int, promote: bool }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        promote = bool(data.get('promote', True))
+        if not detector.model_loaded or detector.model_type != 'linear':
+            return jsonify({'error': 'Online updates need the linear model (ml_model/linear_model.npz)'}), 409
+
+        _, db = _get_db()
+        summary = run_online_update(
+            db,
+            detector.vectorizer,
+            detector.preprocessor,
+            batch_size=int(data.get('batch_size', ONLINE_BATCH_SIZE)),
+            max_batches=int(data['max_batches']) if data.get('max_batches') else None,
+            promote=promote,
+            registry=detector.registry
+        )
+        if summary['promoted']:
+            # Reload the promoted artifact (also invalidates the result cache)
+            detector.load_model()
+
+        return jsonify({
+            'success': True,
+            'update': summary,
+            'model_version': detector.model_version
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Admin: model registry and hot reload
+@api_bp.route('/admin/model/versions', methods=['GET'])
+def list_model_versions():
+    """List registry versions with their metadata, the active and the served one."""
+    try:
+        registry = detector.registry
+        return jsonify({
+            'success': True,
+            'active': registry.active_version(),
+            'served': detector.model_version,
+            'versions': [registry.metadata(version) for version in registry.list_versions()]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/admin/model/reload', methods=['POST'])
+def reload_model():
+    """Hot-swap the served model without a restart.
+    Body JSON (all optional): { version: "v0003", wait: bool }
+    A given version is activated in the registry first (so other workers
+    watching ACTIVE follow, see MODEL_WATCH_INTERVAL). With wait=false the
+    model loads in the background and 202 is returned right away.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        version = data.get('version')
+        if version:
+            try:
+                detector.registry.activate(version)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 404
+
+        if not data.get('wait', True):
+            detector.reload_model_async(version)
+            return jsonify({'success': True, 'status': 'loading', 'version': version}), 202
+
+        bundle = detector.load_model(version)
+        if bundle is None:
+            return jsonify({'error': 'Model could not be loaded; the previous model is still served',
+                            'model_version': detector.model_version}), 500
+        return jsonify({
+            'success': True,
+            'model_version': bundle.version,
+            'model_type': bundle.model_type
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Admin: shadow evaluation of a candidate model on live traffic
+@api_bp.route('/admin/model/shadow', methods=['POST'])
+def start_model_shadow():
+    """Score live traffic with a candidate registry version in the background.
+    Body JSON: { version: "v0004", sample_rate: float (optional, default 1.0) }
+    Responses keep coming from the served model. The run is stored in the
+    registry: every worker starts it on its next model watch poll
+    (MODEL_WATCH_INTERVAL) and this one right away.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        version = data.get('version')
+        if not version:
+            return jsonify({'error': 'version is required'}), 400
+        sample_rate = float(data.get('sample_rate', 1.0))
+        if not 0 < sample_rate <= 1:
+            return jsonify({'error': 'sample_rate must be in (0, 1]'}), 400
+        registry = detector.registry
+        try:
+            config = registry.set_shadow(version, sample_rate=sample_rate)
+            shadow = detector.sync_shadow()
+        except (ValueError, FileNotFoundError) as e:
+            registry.clear_shadow()
+            return jsonify({'error': str(e)}), 404
+        return jsonify({
+            'success': True,
+            'candidate_version': shadow.version,
+            'model_version': detector.model_version,
+            'sample_rate': sample_rate,
+            'started_at': config['started_at']
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _shadow_response(config, disagreements=10):
+    """Stats of the shared shadow run merged over the workers' snapshots"""
+    stats = merge_snapshots(detector.registry.shadow_snapshots(config['started_at']), disagreements)
+    return {
+        'success': True,
+        'model_version': detector.model_version,
+        'shadow': stats,
+        'started_at': config['started_at'],
+        # Other workers' snapshots are as old as their last model watch poll
+        'snapshot_interval_seconds': detector.watch_interval,
+        'pid': os.getpid()
+    }
+
+@api_bp.route('/admin/model/shadow', methods=['GET'])
+def get_model_shadow():
+    """Agreement rate, score deltas and latency histograms of the running shadow,
+    merged over every worker's latest snapshot (shadow.workers lists them).
+    Query: disagreements=<n> (recent disagreeing messages to include, default 10)
+    """
+    try:
+        config = detector.registry.shadow_config()
+        if config is None:
+            return jsonify({'success': True, 'shadow': None, 'pid': os.getpid()}), 200
+        detector.sync_shadow()
+        limit = request.args.get('disagreements', 10, type=int)
+        return jsonify(_shadow_response(config, limit)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/admin/model/shadow', methods=['DELETE'])
+def stop_model_shadow():
+    """Stop the shadow evaluation in every worker and return its final merged stats.
+    Workers stop on their next model watch poll.
+    """
+    try:
+        registry = detector.registry
+        config = registry.shadow_config()
+        if config is None:
+            return jsonify({'success': True, 'shadow': None, 'pid': os.getpid()}), 200
+        detector.sync_shadow()
+        response = _shadow_response(config)
+        registry.clear_shadow()
+        detector.sync_shadow()
+        return jsonify(response), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @api_bp.route('/posts', methods=['POST'])
 def create_post():
     """Create a new post"""
@@ -543,18 +980,12 @@ def create_post():
         # detections are treated as warnings: the post is created but the analysis
         # is returned for the UI to display (and moderators can take action).
         if analysis['is_hate_speech'] and analysis['confidence'] >= BLOCK_CONFIDENCE:
-            user = increment_user_warning(user_id, 1)
-
-            # Check for suspension
-            should_suspend = user.get('warning_count', 0) >= MAX_WARNINGS and not user.get('is_suspended')
+            # Warn and, at MAX_WARNINGS, suspend in one atomic update
+            user, should_suspend = record_warning(user_id, MAX_WARNINGS)
             action_taken = 'suspension' if should_suspend else 'warning'
 
-            if should_suspend:
-                user = update_user(user_id, {
-                    'is_suspended': True,
-                    'suspended_at': datetime.utcnow()
-                })
-
+            # Counted before the (buffered) insert of the new violation
+            violations_count = count_violations({'user_id': int(user_id)}) + 1
             create_violation({
                 'user_id': user_id,
                 'content': content,
@@ -587,7 +1018,7 @@ def create_post():
                 'success': False,
                 'error': 'Post contains high-confidence hate speech and was blocked',
                 'analysis': analysis,
-                'user_status': to_user_dict(user),
+                'user_status': to_user_dict(user, violations_count=violations_count),
                 'email_sent': True
             }), 400
 
@@ -647,11 +1078,11 @@ def like_post(post_id):
         if not post:
             return jsonify({'error': 'Post not found'}), 404
         likes_count = int(post.get('likes_count', 0)) + 1
-        post = update_post(post_id, {'likes_count': likes_count})
+        increment_post_likes(post_id, 1)
         
         return jsonify({
             'success': True,
-            'likes_count': post.get('likes_count', likes_count)
+            'likes_count': likes_count
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -664,11 +1095,11 @@ def unlike_post(post_id):
         if not post:
             return jsonify({'error': 'Post not found'}), 404
         likes_count = max(0, int(post.get('likes_count', 0)) - 1)
-        post = update_post(post_id, {'likes_count': likes_count})
+        increment_post_likes(post_id, -1)
         
         return jsonify({
             'success': True,
-            'likes_count': post.get('likes_count', likes_count)
+            'likes_count': likes_count
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -685,7 +1116,7 @@ def get_user_posts(user_id):
         return jsonify({
             'success': True,
             'user': to_user_dict(user),
-            'posts': [to_post_dict(post) for post in posts]
+            'posts': to_post_dicts(posts, usernames={user['id']: user['username']})
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -863,7 +1294,8 @@ def webhook_analyze():
             "text": "Content to analyze",
             "platform": "twitter",
             "post_id": "123456",
-            "user_id": "user123"
+            "user_id": "user123",
+            "translate": true
         }
     
     Response:
@@ -888,7 +1320,7 @@ def webhook_analyze():
             return jsonify({'error': 'text required'}), 400
         
         # Analyze
-        result = detector.analyze(text)
+        result = detector.analyze(text, translate=_translate_flag(data))
         
         # Determine if should block
         should_block = result['is_hate_speech'] and result['confidence'] >= 0.8
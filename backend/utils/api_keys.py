@@ -5,7 +5,7 @@ Handles API key generation, validation, and usage tracking
 import secrets
 import hashlib
 from datetime import datetime
-from backend.database import db
+from backend.database import _get_db
 
 # API Tier limits (calls per month)
 TIER_LIMITS = {
@@ -33,6 +33,7 @@ def create_api_key(user_id, tier='free'):
     Returns:
         dict: API key information (includes unhashed key - show once!)
     """
+    _, db = _get_db()
     api_key = generate_api_key()
     hashed_key = hash_api_key(api_key)
     
@@ -56,16 +57,21 @@ def create_api_key(user_id, tier='free'):
         'calls_limit': key_doc['calls_limit']
     }
 
-def validate_api_key(api_key):
+def validate_api_key(api_key, calls=1):
     """
     Validate API key and check usage limits
     
+    Args:
+        api_key: Unhashed API key
+        calls: Number of calls the request will consume (batch size)
+    
     Returns:
         tuple: (is_valid: bool, key_doc: dict or None, error_message: str or None)
     """
     if not api_key:
         return False, None, 'API key required'
     
+    _, db = _get_db()
     hashed_key = hash_api_key(api_key)
     key_doc = db.api_keys.find_one({'hashed_key': hashed_key})
     
@@ -79,21 +85,22 @@ def validate_api_key(api_key):
     calls_used = key_doc.get('calls_used', 0)
     calls_limit = key_doc.get('calls_limit', TIER_LIMITS['free'])
     
-    if calls_used >= calls_limit:
+    if calls_used + calls > calls_limit:
         return False, None, f'API usage limit exceeded ({calls_limit} calls/month)'
     
     return True, key_doc, None
 
-def track_api_call(api_key):
+def track_api_call(api_key, calls=1):
     """
-    Track an API call (increment counter)
+    Track an API call (increment counter by the number of items analyzed)
     """
+    _, db = _get_db()
     hashed_key = hash_api_key(api_key)
     
     db.api_keys.update_one(
         {'hashed_key': hashed_key},
         {
-            '$inc': {'calls_used': 1},
+            '$inc': {'calls_used': calls},
             '$set': {'last_used': datetime.utcnow()}
         }
     )
@@ -105,6 +112,7 @@ def get_api_usage(api_key):
     Returns:
         dict: Usage statistics
     """
+    _, db = _get_db()
     hashed_key = hash_api_key(api_key)
     key_doc = db.api_keys.find_one({'hashed_key': hashed_key})
     
@@ -124,6 +132,7 @@ def reset_monthly_usage():
     """
     Reset monthly usage counters (run via cron job monthly)
     """
+    _, db = _get_db()
     result = db.api_keys.update_many(
         {},
         {'$set': {'calls_used': 0}}
@@ -133,6 +142,7 @@ def reset_monthly_usage():
 
 def deactivate_api_key(api_key):
     """Deactivate an API key"""
+    _, db = _get_db()
     hashed_key = hash_api_key(api_key)
     
     result = db.api_keys.update_one(
@@ -144,6 +154,7 @@ def deactivate_api_key(api_key):
 
 def list_user_api_keys(user_id):
     """List all API keys for a user (hashed)"""
+    _, db = _get_db()
     keys = db.api_keys.find({'user_id': user_id})
     
     return [{
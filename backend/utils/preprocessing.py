@@ -1,28 +1,81 @@
 import re
 import string
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from langdetect import detect, LangDetectException
+import threading
+from functools import lru_cache
 
-# Download required NLTK data
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-    nltk.download('wordnet')
-    nltk.download('punkt')
+def ensure_nltk_data():
+    """Download required NLTK data if missing.
+
+    Called lazily the first time a TextPreprocessor needs NLTK, so importing
+    this module (e.g. for categorize_hate_speech) stays instant.
+    """
+    import nltk
+    try:
+        nltk.data.find('corpora/stopwords')
+    except LookupError:
+        nltk.download('stopwords')
+        nltk.download('wordnet')
+        nltk.download('punkt')
+
+# Precompiled cleaning patterns (applied in this order by clean_text)
+URL_PATTERN = re.compile(r'http\S+|www\S+|https\S+', flags=re.MULTILINE)
+MENTION_HASHTAG_PATTERN = re.compile(r'@\w+|#\w+')
+SPECIAL_CHAR_PATTERN = re.compile(r'[^\w\s]')
+DIGITS_PATTERN = re.compile(r'\d+')
+
+# Distinct words whose lemma is memoized (word frequencies are Zipfian, so a
+# modest memo covers almost every token)
+LEMMA_CACHE_SIZE = 50000
 
 class TextPreprocessor:
     """Text preprocessing utilities for hate speech detection"""
     
     def __init__(self):
-        self.lemmatizer = WordNetLemmatizer()
-        try:
-            self.stop_words = set(stopwords.words('english'))
-        except:
-            nltk.download('stopwords')
-            self.stop_words = set(stopwords.words('english'))
+        # NLTK resources are loaded on first use (see load_resources)
+        self._lemmatizer = None
+        self._lemmatize_word = None
+        self._stop_words = None
+        self._lock = threading.Lock()
+    
+    def load_resources(self):
+        """Import NLTK and load the stopword list and WordNet lemmatizer"""
+        with self._lock:
+            if self._stop_words is not None:
+                return
+            ensure_nltk_data()
+            import nltk
+            from nltk.corpus import stopwords
+            from nltk.stem import WordNetLemmatizer
+            
+            lemmatizer = WordNetLemmatizer()
+            try:
+                stop_words = set(stopwords.words('english'))
+            except:
+                nltk.download('stopwords')
+                stop_words = set(stopwords.words('english'))
+            
+            self._lemmatizer = lemmatizer
+            self._lemmatize_word = lru_cache(maxsize=LEMMA_CACHE_SIZE)(lemmatizer.lemmatize)
+            # Set last: a non-None stop list means all resources are ready
+            self._stop_words = stop_words
+    
+    @property
+    def stop_words(self):
+        if self._stop_words is None:
+            self.load_resources()
+        return self._stop_words
+    
+    @property
+    def lemmatizer(self):
+        if self._stop_words is None:
+            self.load_resources()
+        return self._lemmatizer
+    
+    @property
+    def lemmatize_word(self):
+        if self._stop_words is None:
+            self.load_resources()
+        return self._lemmatize_word
     
     def clean_text(self, text):
         """Clean and normalize text"""
@@ -30,14 +83,14 @@ class TextPreprocessor:
         text = text.lower()
         
         # Remove URLs
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+        text = URL_PATTERN.sub('', text)
         
         # Remove mentions and hashtags
-        text = re.sub(r'@\w+|#\w+', '', text)
+        text = MENTION_HASHTAG_PATTERN.sub('', text)
         
         # Remove special characters and digits
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\d+', '', text)
+        text = SPECIAL_CHAR_PATTERN.sub(' ', text)
+        text = DIGITS_PATTERN.sub('', text)
         
         # Remove extra whitespace
         text = ' '.join(text.split())
@@ -46,33 +99,43 @@ class TextPreprocessor:
     
     def remove_stopwords(self, text):
         """Remove stopwords from text"""
-        words = text.split()
-        filtered_words = [word for word in words if word not in self.stop_words]
-        return ' '.join(filtered_words)
+        stop_words = self.stop_words
+        return ' '.join([word for word in text.split() if word not in stop_words])
     
     def lemmatize_text(self, text):
         """Lemmatize words in text"""
-        words = text.split()
-        lemmatized_words = [self.lemmatizer.lemmatize(word) for word in words]
-        return ' '.join(lemmatized_words)
+        lemmatize_word = self.lemmatize_word
+        return ' '.join([lemmatize_word(word) for word in text.split()])
     
     def preprocess(self, text, remove_stop=True, lemmatize=True):
-        """Complete preprocessing pipeline"""
-        # Clean text
-        text = self.clean_text(text)
-        
-        # Remove stopwords
-        if remove_stop:
-            text = self.remove_stopwords(text)
+        """Complete preprocessing pipeline.
+
+        The cleaned text is tokenized once; stopword filtering and
+        lemmatization then run as a single pass over the tokens. The output
+        is identical to clean_text -> remove_stopwords -> lemmatize_text.
+        """
+        words = self.clean_text(text).split()
         
-        # Lemmatize
-        if lemmatize:
-            text = self.lemmatize_text(text)
+        if remove_stop and lemmatize:
+            stop_words = self.stop_words
+            lemmatize_word = self.lemmatize_word
+            words = [lemmatize_word(word) for word in words if word not in stop_words]
+        elif remove_stop:
+            stop_words = self.stop_words
+            words = [word for word in words if word not in stop_words]
+        elif lemmatize:
+            lemmatize_word = self.lemmatize_word
+            words = [lemmatize_word(word) for word in words]
         
-        return text
+        return ' '.join(words)
+    
+    def preprocess_many(self, texts, remove_stop=True, lemmatize=True):
+        """Apply preprocess() to every text in an iterable, returning a list"""
+        return [self.preprocess(text, remove_stop=remove_stop, lemmatize=lemmatize) for text in texts]
     
     def detect_language(self, text):
         """Detect language of text"""
+        from langdetect import detect, LangDetectException
         try:
             return detect(text)
         except LangDetectException:
@@ -0,0 +1,224 @@
+"""
+Write-behind buffer for MongoDB inserts and updates
+
+Request handlers submit pymongo write operations (InsertOne, UpdateOne, ...)
+and return without waiting for Mongo. A background thread groups them into
+ordered bulk_write() calls per collection, flushed when batch_size
+operations are pending or flush_interval seconds after the first one,
+whichever comes first. Writes are visible to readers after that delay.
+
+The queue is bounded: when it is full the caller blocks until there is
+room, so operations are always written in submission order. A batch that
+fails because MongoDB is unreachable is kept and retried with exponential
+backoff (capped at max_backoff seconds) until it is written; an operation
+MongoDB rejects (e.g. a duplicate key) is skipped and counted. Failures
+are logged and exported by render_prometheus(). Without the thread
+(enabled=False, or after close()) operations are written in the caller and
+errors are raised to it. flush() writes everything submitted so far;
+close() is registered with atexit (and called from the gunicorn
+worker_exit hook) so pending writes are not lost on shutdown.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+# MongoDB error code of a unique index violation
+DUPLICATE_KEY = 11000
+
+
+class _Flush:
+    """Queue marker: set once every operation queued before it is written"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class WriteBuffer:
+    """Batches write operations into bulk_write() calls on a background thread.
+
+    get_db returns the pymongo database. With enabled=False every submit()
+    is written immediately, in the caller.
+    """
+
+    def __init__(self, get_db, enabled=True, batch_size=500, flush_interval=0.05, max_queue=10000,
+                 retry_backoff=0.1, max_backoff=30.0):
+        self.get_db = get_db
+        self.enabled = enabled
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.max_queue = max(1, int(max_queue))
+        self.retry_backoff = max(0.0, float(retry_backoff))
+        self.max_backoff = max(self.retry_backoff, float(max_backoff))
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.overflows = 0
+        self.retries = 0
+        self.errors = 0
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def submit(self, collection, operation):
+        """Queue one write operation for the named collection"""
+        self.submitted += 1
+        if not self.enabled or self._closed:
+            self._write([(collection, operation)])
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((collection, operation))
+        except queue.Full:
+            # Wait for the writer: writing here would overtake the queued operations
+            self.overflows += 1
+            logger.warning("Write buffer full (%d operations); waiting for the writer", self.max_queue)
+            self._queue.put((collection, operation))
+
+    def flush(self, timeout=None):
+        """Write everything submitted so far; returns False on timeout"""
+        if self._thread is None or not self._thread.is_alive():
+            self._drain()
+            return True
+        marker = _Flush()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def close(self, timeout=10):
+        """Flush pending writes and stop accepting queued ones"""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'pending': self._queue.qsize(),
+            'submitted': self.submitted,
+            'written': self.written,
+            'batches': self.batches,
+            'overflows': self.overflows,
+            'retries': self.retries,
+            'errors': self.errors
+        }
+
+    def render_prometheus(self, prefix='hate_speech_write_buffer'):
+        """Return the counters in Prometheus text format"""
+        stats = self.stats()
+        lines = []
+        for key, kind, help_text in (
+            ('pending', 'gauge', 'Operations waiting to be written'),
+            ('written', 'counter', 'Operations written to MongoDB'),
+            ('errors', 'counter', 'Operations MongoDB rejected (or that failed in the caller)'),
+            ('retries', 'counter', 'Bulk writes retried after a connection error'),
+            ('overflows', 'counter', 'Submits that waited for room in a full queue'),
+        ):
+            name = f'{prefix}_{key}' if kind == 'gauge' else f'{prefix}_{key}_total'
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {stats[key]}']
+        return '\n'.join(lines) + '\n'
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None:
+                atexit.register(self.close)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='write-buffer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch, markers = [], []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if isinstance(item, _Flush):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size or markers:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            self._write(batch, retry=True)
+            for marker in markers:
+                marker.done.set()
+
+    def _drain(self):
+        # No writer thread (e.g. in a forked child): write what is queued here
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Flush):
+                item.done.set()
+            else:
+                batch.append(item)
+        self._write(batch)
+
+    def _write(self, batch, retry=False):
+        """bulk_write consecutive operations on the same collection, in order"""
+        start = 0
+        while start < len(batch):
+            collection = batch[start][0]
+            end = start
+            while end < len(batch) and batch[end][0] == collection:
+                end += 1
+            self._bulk_write(collection, [operation for _, operation in batch[start:end]], retry)
+            start = end
+
+    def _bulk_write(self, collection, operations, retry=False):
+        """Write operations in order, skipping rejected ones.
+
+        With retry (the writer thread) a connection error is retried with
+        backoff until the write succeeds; otherwise it is raised.
+        """
+        attempts = 0
+        while operations:
+            try:
+                self.get_db()[collection].bulk_write(operations, ordered=True)
+                self.written += len(operations)
+                self.batches += 1
+                return
+            except BulkWriteError as e:
+                # An ordered bulk stops at the first failing op: skip it, keep the rest
+                error = e.details['writeErrors'][0]
+                failed = error['index']
+                self.written += failed
+                if attempts and error.get('code') == DUPLICATE_KEY:
+                    # Inserted by the attempt that lost its connection
+                    self.written += 1
+                else:
+                    self.errors += 1
+                    logger.error("Write buffer: %s operation rejected: %s", collection, error.get('errmsg'))
+                operations = operations[failed + 1:]
+            except Exception as e:
+                if not retry:
+                    self.errors += len(operations)
+                    logger.error("Write buffer: %s bulk write of %d operations failed: %s",
+                                 collection, len(operations), e)
+                    raise
+                # Keep the operations; inserts that did land fail on the unique id index next time
+                delay = min(self.max_backoff, self.retry_backoff * 2 ** attempts)
+                attempts += 1
+                self.retries += 1
+                logger.warning("Write buffer: %s bulk write of %d operations failed (%s); retry %d in %.1fs",
+                               collection, len(operations), e, attempts, delay)
+                time.sleep(delay)
+
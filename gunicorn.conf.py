@@ -0,0 +1,64 @@
+"""
+Gunicorn configuration for production (Procfile / Render)
+
+The app is loaded once in the master (preload_app) with the detector
+preloaded, so workers are forked with the model already in memory and
+share its pages copy-on-write. Large numpy arrays are memory-mapped
+read-only from the joblib files (MODEL_MMAP_MODE), so those pages stay
+shared even after Python touches the surrounding objects.
+
+Each worker polls the model registry's ACTIVE pointer every
+MODEL_WATCH_INTERVAL seconds and hot-swaps to a newly activated version,
+since an admin reload request only reaches the worker that serves it.
+With preload_app the watch thread is started in post_fork, and the master
+closes its MongoDB client before forking: neither threads nor PyMongo
+clients survive fork, and the master serves no requests.
+
+Violation/post inserts are buffered per worker (backend/write_buffer.py);
+worker_exit flushes them before a worker stops.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '4'))
+preload_app = os.getenv('PRELOAD_APP', 'true').lower() in ('1', 'true', 'yes')
+
+if preload_app:
+    # create_app() reads this in the master and initializes the detector
+    os.environ.setdefault('PRELOAD_DETECTOR', 'true')
+
+# Workers follow registry activations (see backend/models/registry.py).
+# The detector starts the watch when it is built, which is in the worker
+# without preload; a preloaded one is built in the master, so post_fork starts it.
+try:
+    model_watch_interval = float(os.getenv('MODEL_WATCH_INTERVAL', '30'))
+except Exception:
+    model_watch_interval = 30.0
+os.environ['MODEL_WATCH_INTERVAL'] = '0' if preload_app else str(model_watch_interval)
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded and before workers fork"""
+    if preload_app:
+        # init_db() opened a MongoDB client here; each worker opens its own
+        from backend.database import close_db
+        close_db()
+        # Move everything allocated so far out of the GC's reach, so
+        # collections in workers don't write to (and copy) shared pages
+        gc.freeze()
+        server.log.info("Preloaded app; froze %d objects before fork", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    """Runs in each worker right after it is forked from the master"""
+    from backend.models.detector import detector
+    if preload_app and model_watch_interval > 0 and detector.is_ready:
+        detector.start_model_watch(model_watch_interval)
+
+
+def worker_exit(server, worker):
+    """Write the worker's buffered Mongo operations before it exits"""
+    from backend.database import flush_writes
+    if not flush_writes(timeout=10):
+        server.log.warning("Worker %s exited with buffered writes pending", worker.pid)
@@ -0,0 +1,130 @@
+"""
+Measure per-worker memory of the gunicorn deployment, with and without
+preloading the app (and detector) in the master before fork.
+
+For each mode the script starts gunicorn with gunicorn.conf.py, sends
+analyze requests so every worker has the detector loaded, then reads
+/proc/<pid>/smaps_rollup (Linux) for the master and each worker:
+    RSS - resident pages, shared pages counted in full
+    PSS - proportional share of shared pages (what the container pays)
+    USS - pages private to the process
+
+Usage: python measure_worker_memory.py [--workers 4] [--requests 200] [--app run_backend:app]
+The app needs the same environment as the server (e.g. DATABASE_URL).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def read_memory_kb(pid):
+    """Return {'rss', 'pss', 'uss'} in kB from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    }
+
+
+def child_pids(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def wait_for_health(port, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/health', timeout=2):
+                return True
+        except Exception:
+            time.sleep(0.5)
+    return False
+
+
+def send_analyze_requests(port, count):
+    body = json.dumps({'text': 'You people are all the same, go back where you came from'}).encode('utf-8')
+    for _ in range(count):
+        request = urllib.request.Request(
+            f'http://127.0.0.1:{port}/api/analyze',
+            data=body,
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+
+
+def measure(app, workers, requests_count, port, preload):
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers),
+               PRELOAD_APP='true' if preload else 'false')
+    if not preload:
+        env.pop('PRELOAD_DETECTOR', None)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', app],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        if not wait_for_health(port):
+            raise RuntimeError('gunicorn did not become healthy')
+        # Enough requests that every worker has served (and loaded) the detector
+        send_analyze_requests(port, requests_count)
+        time.sleep(1)
+
+        master = read_memory_kb(process.pid)
+        worker_stats = [read_memory_kb(pid) for pid in child_pids(process.pid)]
+        total_pss = master['pss'] + sum(stats['pss'] for stats in worker_stats)
+        return {
+            'preload': preload,
+            'master': master,
+            'workers': worker_stats,
+            'avg_worker_rss_kb': sum(s['rss'] for s in worker_stats) // max(len(worker_stats), 1),
+            'avg_worker_pss_kb': sum(s['pss'] for s in worker_stats) // max(len(worker_stats), 1),
+            'avg_worker_uss_kb': sum(s['uss'] for s in worker_stats) // max(len(worker_stats), 1),
+            'total_pss_kb': total_pss
+        }
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--app', default='run_backend:app')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--json', help='Also write the report to this file')
+    args = parser.parse_args()
+
+    report = [
+        measure(args.app, args.workers, args.requests, args.port, preload=False),
+        measure(args.app, args.workers, args.requests, args.port, preload=True),
+    ]
+
+    print("\n" + "="*70)
+    print(f"GUNICORN WORKER MEMORY ({args.workers} workers, kB)")
+    print("="*70)
+    print(f"{'mode':<12}{'avg RSS':>12}{'avg PSS':>12}{'avg USS':>12}{'total PSS':>14}")
+    for row in report:
+        mode = 'preload' if row['preload'] else 'per-worker'
+        print(f"{mode:<12}{row['avg_worker_rss_kb']:>12}{row['avg_worker_pss_kb']:>12}"
+              f"{row['avg_worker_uss_kb']:>12}{row['total_pss_kb']:>14}")
+    print("="*70 + "\n")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare the TF-IDF vocabulary and hashing feature pipelines
+
+Trains the ensemble once per feature mode on data/sample_data.csv and
+reports held-out accuracy, artifact sizes, feature-file load time (the part
+of detector startup that differs) and transform throughput.
+
+Usage: python ml_model/compare_vectorizers.py [--output comparison.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml_model.train_model import HateSpeechModelTrainer
+from backend.models.features import load_vectorizer
+
+LOAD_REPEATS = 5
+
+
+def evaluate_mode(feature_mode, df):
+    trainer = HateSpeechModelTrainer(feature_mode=feature_mode)
+    start = time.perf_counter()
+    accuracy = trainer.train(df.copy())
+    train_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        trainer.save_model(model_dir)
+        model_path = os.path.join(model_dir, 'hate_speech_model.pkl')
+
+        load_times = []
+        for _ in range(LOAD_REPEATS):
+            start = time.perf_counter()
+            vectorizer, vectorizer_path = load_vectorizer(model_dir)
+            load_times.append(time.perf_counter() - start)
+        vectorizer_size = os.path.getsize(vectorizer_path)
+        model_size = os.path.getsize(model_path)
+
+    texts = list(trainer.preprocessor.preprocess_many(df['text'].astype(str), remove_stop=False))
+    start = time.perf_counter()
+    vectorizer.transform(texts)
+    transform_seconds = time.perf_counter() - start
+
+    result = {
+        'feature_mode': feature_mode,
+        'accuracy': round(float(accuracy), 4),
+        'train_seconds': round(train_seconds, 2),
+        'feature_file_bytes': vectorizer_size,
+        'model_file_bytes': model_size,
+        'feature_load_ms': round(min(load_times) * 1000, 2),
+        'transform_docs_per_second': round(len(texts) / transform_seconds)
+    }
+    if feature_mode == 'hashing':
+        start = time.perf_counter()
+        vectorizer.transform(texts, n_jobs=-1)
+        result['parallel_transform_docs_per_second'] = round(len(texts) / (time.perf_counter() - start))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare TF-IDF and hashing feature pipelines")
+    parser.add_argument('--data', default='data/sample_data.csv')
+    parser.add_argument('--output', help='Also write the comparison to this JSON file')
+    args = parser.parse_args()
+
+    df = HateSpeechModelTrainer().load_or_create_data(args.data)
+    results = [evaluate_mode('tfidf', df), evaluate_mode('hashing', df)]
+
+    print("\n" + "="*78)
+    print("FEATURE PIPELINE COMPARISON")
+    print("="*78)
+    print(f"{'mode':<10}{'accuracy':>10}{'features (B)':>15}{'model (B)':>14}{'load (ms)':>12}{'docs/s':>12}")
+    for row in results:
+        print(f"{row['feature_mode']:<10}{row['accuracy']:>10.4f}{row['feature_file_bytes']:>15,}"
+              f"{row['model_file_bytes']:>14,}{row['feature_load_ms']:>12.2f}{row['transform_docs_per_second']:>12,}")
+    hashing = results[1]
+    print(f"hashing, parallel transform: {hashing['parallel_transform_docs_per_second']:,} docs/s")
+    print("="*78 + "\n")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Distill the trained soft-voting ensemble into a compact linear model
+
+The student is a logistic regression on the same TF-IDF features, fitted to
+the ensemble's predicted probabilities (soft targets) rather than the raw
+labels, so it reproduces the ensemble's decisions instead of re-learning the
+task. The result is one sparse weight vector plus a bias
+(ml_model/linear_model.npz), which the detector serves when present.
+
+A fidelity report compares student and ensemble on data/sample_data.csv:
+label agreement, probability error, accuracy against the true labels, model
+size and per-message latency. It is printed and written to
+ml_model/linear_model_report.json.
+
+Usage: python ml_model/export_linear_model.py [--C 10] [--prune 1e-4]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.preprocessing import TextPreprocessor
+from backend.models.linear import LinearModel
+from backend.models.features import load_vectorizer
+from ml_model.train_model import write_atomic
+
+# Latency is measured on this many single-message predictions per model
+LATENCY_SAMPLES = 500
+
+
+def distill(X, teacher_probabilities, C=10.0):
+    """Fit a logistic regression to soft targets.
+
+    Each row appears once per class, weighted by the teacher's probability
+    of that class, which minimizes cross-entropy against the teacher.
+    """
+    rows = X.shape[0]
+    X_doubled = sparse.vstack([X, X]).tocsr()
+    y_doubled = np.concatenate([np.ones(rows, dtype=int), np.zeros(rows, dtype=int)])
+    weights = np.concatenate([teacher_probabilities, 1.0 - teacher_probabilities])
+
+    student = LogisticRegression(C=C, max_iter=2000)
+    student.fit(X_doubled, y_doubled, sample_weight=weights)
+    return student
+
+
+def per_message_latency_ms(model, X, samples=LATENCY_SAMPLES):
+    rows = [X[i] for i in range(min(samples, X.shape[0]))]
+    start = time.perf_counter()
+    for row in rows:
+        model.predict_proba(row)
+    return (time.perf_counter() - start) * 1000 / len(rows)
+
+
+def fidelity(teacher_probabilities, student_probabilities, labels):
+    teacher_labels = (teacher_probabilities >= 0.5).astype(int)
+    student_labels = (student_probabilities >= 0.5).astype(int)
+    errors = np.abs(teacher_probabilities - student_probabilities)
+    return {
+        'samples': int(len(labels)),
+        'label_agreement': round(float((teacher_labels == student_labels).mean()), 4),
+        'mean_abs_probability_error': round(float(errors.mean()), 4),
+        'max_abs_probability_error': round(float(errors.max()), 4),
+        'ensemble_accuracy': round(float((teacher_labels == labels).mean()), 4),
+        'linear_accuracy': round(float((student_labels == labels).mean()), 4)
+    }
+
+
+def export_linear_model(model_dir='ml_model', data_path='data/sample_data.csv', C=10.0, prune_below=1e-4):
+    """Distill model_dir's ensemble, save linear_model.npz and return the report"""
+    model_path = os.path.join(model_dir, 'hate_speech_model.pkl')
+    linear_model_path = os.path.join(model_dir, 'linear_model.npz')
+    report_path = os.path.join(model_dir, 'linear_model_report.json')
+
+    print("\n" + "="*50)
+    print("EXPORTING COMPACT LINEAR MODEL")
+    print("="*50 + "\n")
+
+    ensemble = joblib.load(model_path)
+    vectorizer, vectorizer_path = load_vectorizer(model_dir)
+    if vectorizer is None:
+        raise FileNotFoundError(f"No feature file in {model_dir}")
+    if list(ensemble.classes_) != [0, 1]:
+        raise ValueError(f"Expected binary 0/1 labels, got {list(ensemble.classes_)}")
+
+    df = pd.read_csv(data_path, comment='#')
+    print(f"Preprocessing {len(df)} samples from {data_path}...")
+    preprocessor = TextPreprocessor()
+    processed = preprocessor.preprocess_many(df['text'].astype(str), remove_stop=False, lemmatize=True)
+    X = vectorizer.transform(processed)
+    labels = df['label'].to_numpy()
+
+    # Same split as train_model.py, so held-out rows were unseen by both models
+    train_index, test_index = train_test_split(
+        np.arange(len(df)), test_size=0.2, random_state=42, stratify=labels
+    )
+
+    print("Scoring with the ensemble...")
+    teacher = ensemble.predict_proba(X)[:, 1]
+
+    print("Distilling linear model...")
+    student = LinearModel.from_estimator(distill(X[train_index], teacher[train_index], C=C), prune_below)
+    write_atomic(linear_model_path, student.save)
+    student = LinearModel.load(linear_model_path)
+    predicted = student.predict_proba(X)[:, 1]
+
+    report = {
+        'C': C,
+        'prune_below': prune_below,
+        'non_zero_weights': int(np.count_nonzero(student.coef_)),
+        'n_features': int(student.n_features),
+        'held_out': fidelity(teacher[test_index], predicted[test_index], labels[test_index]),
+        'all': fidelity(teacher, predicted, labels),
+        'size_bytes': {
+            'ensemble': os.path.getsize(model_path),
+            'linear': os.path.getsize(linear_model_path),
+            'vectorizer': os.path.getsize(vectorizer_path)
+        },
+        'latency_ms_per_message': {
+            'ensemble': round(per_message_latency_ms(ensemble, X[test_index]), 4),
+            'linear': round(per_message_latency_ms(student, X[test_index]), 4)
+        }
+    }
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    held_out = report['held_out']
+    print(f"\nNon-zero weights: {report['non_zero_weights']} / {report['n_features']}")
+    print(f"Held-out agreement with ensemble: {held_out['label_agreement']:.4f}")
+    print(f"Held-out accuracy: ensemble {held_out['ensemble_accuracy']:.4f}, linear {held_out['linear_accuracy']:.4f}")
+    print(f"Mean |p_ensemble - p_linear|: {held_out['mean_abs_probability_error']:.4f}")
+    print(f"Size: ensemble {report['size_bytes']['ensemble']:,} B, linear {report['size_bytes']['linear']:,} B")
+    print(f"Latency per message: ensemble {report['latency_ms_per_message']['ensemble']:.3f} ms, "
+          f"linear {report['latency_ms_per_message']['linear']:.3f} ms")
+    print(f"\n✅ Linear model saved to: {linear_model_path}")
+    print(f"✅ Fidelity report saved to: {report_path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill the ensemble into a compact linear model")
+    parser.add_argument('--model-dir', default='ml_model')
+    parser.add_argument('--data', default='data/sample_data.csv')
+    parser.add_argument('--C', type=float, default=10.0, help='Inverse L2 regularization of the student')
+    parser.add_argument('--prune', type=float, default=1e-4, help='Drop weights with a smaller absolute value')
+    args = parser.parse_args()
+    export_linear_model(args.model_dir, args.data, C=args.C, prune_below=args.prune)
+
+
+if __name__ == '__main__':
+    main()
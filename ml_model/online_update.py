@@ -0,0 +1,65 @@
+"""
+Apply online updates from moderator decisions to the served linear model
+
+Pulls new violations, cleared violations and published posts from Mongo
+(DATABASE_URL) and partial-fits the active registry version (or
+ml_model/linear_model.npz without a registry) on them. See
+backend/models/online_learning.py. A running server picks the promoted
+model up through POST /api/admin/model/online-update or a restart.
+
+Usage: python ml_model/online_update.py [--batch-size 500] [--max-batches N] [--no-promote]
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+from backend.database import _get_db
+from backend.models.features import load_vectorizer
+from backend.models.online_learning import run_online_update, ONLINE_BATCH_SIZE
+from backend.models.registry import ModelRegistry
+from backend.utils.preprocessing import TextPreprocessor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online update of the linear model from moderator labels")
+    parser.add_argument('--batch-size', type=int, default=ONLINE_BATCH_SIZE,
+                        help='New examples fetched per source for each update step')
+    parser.add_argument('--max-batches', type=int, default=None)
+    parser.add_argument('--learning-rate', type=float, default=2.0)
+    parser.add_argument('--epochs', type=int, default=3, help='Passes over each batch')
+    parser.add_argument('--no-promote', action='store_true',
+                        help='Only write the versioned artifact; keep serving the current model. '
+                             'The examples stay pending for the next promoted update')
+    args = parser.parse_args()
+
+    load_dotenv()
+    registry = ModelRegistry()
+    active = registry.active_version()
+    model_dir = registry.version_dir(active) if active else 'ml_model'
+    vectorizer, _ = load_vectorizer(model_dir)
+    if vectorizer is None:
+        sys.exit(f"No vectorizer in {model_dir}/ - train a model first")
+
+    _, db = _get_db()
+    summary = run_online_update(
+        db,
+        vectorizer,
+        TextPreprocessor(),
+        batch_size=args.batch_size,
+        max_batches=args.max_batches,
+        promote=not args.no_promote,
+        registry=registry,
+        learning_rate=args.learning_rate,
+        epochs=args.epochs
+    )
+    if not summary['examples']:
+        print("No new labeled examples")
+
+
+if __name__ == '__main__':
+    main()
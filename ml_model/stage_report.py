@@ -0,0 +1,86 @@
+"""
+Per-stage timing and memory report for training runs
+
+    report = StageReport(config={'n_jobs': -1})
+    with report.stage('fit'):
+        model.fit(X, y)
+    report.save('ml_model/training_report.json')
+
+For each stage it records wall time, CPU time of the main process, and the
+peak resident set size reached so far (by this process and by its finished
+worker processes), as reported by getrusage. Peak RSS is a high-water mark,
+so the stage where it first jumps is the one that needed the memory.
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _peak_rss_mb(who):
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+class StageReport:
+    """Collects stage timings and writes them as JSON"""
+
+    def __init__(self, config=None):
+        self.config = dict(config or {})
+        self.config.setdefault('cpu_count', os.cpu_count())
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.stages = []
+        self.results = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one stage"""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        print(f"[{name}] started")
+        try:
+            yield
+        finally:
+            entry = {
+                'stage': name,
+                'seconds': round(time.perf_counter() - wall_start, 3),
+                'cpu_seconds': round(time.process_time() - cpu_start, 3),
+                'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+                'children_peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None
+            }
+            self.stages.append(entry)
+            print(f"[{name}] {entry['seconds']:.2f}s")
+
+    def to_dict(self):
+        return {
+            'started_at': self.started_at,
+            'config': self.config,
+            'results': self.results,
+            'total_seconds': round(time.perf_counter() - self._start, 3),
+            'stages': self.stages
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"✅ Training report saved to: {path}")
+
+    def summary(self):
+        """Return a printable table of the stages"""
+        lines = [f"{'stage':<16}{'seconds':>10}{'cpu s':>10}{'peak RSS MB':>14}"]
+        for entry in self.stages:
+            peak = entry['peak_rss_mb'] if entry['peak_rss_mb'] is not None else '-'
+            lines.append(f"{entry['stage']:<16}{entry['seconds']:>10.2f}{entry['cpu_seconds']:>10.2f}{peak:>14}")
+        return '\n'.join(lines)
@@ -2,32 +2,178 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.ensemble import RandomForestClassifier, VotingClassifier
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 import joblib
+import argparse
+import hashlib
+import importlib.util
 import sys
 import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.utils.preprocessing import TextPreprocessor
+from backend.models.features import (
+    HashingTfidfVectorizer,
+    HASHING_N_FEATURES,
+    HASHING_VECTORIZER_FILE,
+    TFIDF_VECTORIZER_FILE
+)
+from backend.models.linear import LinearModel, DEFAULT_LINEAR_MODEL_PATH
+from backend.models.registry import ModelRegistry, file_sha256
+import backend.utils.preprocessing as preprocessing_module
+from ml_model.stage_report import StageReport
+
+# On-disk cache of preprocessed text, keyed by dataset content and
+# preprocessor version (parquet when pyarrow is installed, pickle otherwise)
+PREPROCESS_CACHE_DIR = 'instance/preprocess_cache'
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Rows per task handed to a preprocessing worker process
+PREPROCESS_CHUNK_SIZE = 2000
+
+# Training-time preprocessing options (part of the cache key)
+PREPROCESS_OPTIONS = {'remove_stop': False, 'lemmatize': True}
+
+def preprocessor_version():
+    """Fingerprint of the preprocessing code, so edits invalidate cached output"""
+    with open(preprocessing_module.__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+def preprocess_cache_key(texts):
+    """Hash of the dataset texts, preprocessing code and options"""
+    digest = hashlib.sha256(preprocessor_version().encode('utf-8'))
+    digest.update(repr(sorted(PREPROCESS_OPTIONS.items())).encode('utf-8'))
+    for text in texts:
+        digest.update(b'\0' + str(text).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+_worker_preprocessor = None
+
+def _preprocess_chunk(texts):
+    """Worker task: preprocess one chunk with a per-process TextPreprocessor"""
+    global _worker_preprocessor
+    if _worker_preprocessor is None:
+        _worker_preprocessor = TextPreprocessor()
+    return _worker_preprocessor.preprocess_many(texts, **PREPROCESS_OPTIONS)
+
+def preprocess_texts(texts, n_jobs=None, chunk_size=PREPROCESS_CHUNK_SIZE):
+    """Preprocess texts in order, across n_jobs processes (default: all CPUs)"""
+    texts = [str(text) for text in texts]
+    n_jobs = n_jobs or os.cpu_count() or 1
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    if n_jobs == 1 or len(chunks) <= 1:
+        return [text for chunk in chunks for text in _preprocess_chunk(chunk)]
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        return [text for chunk in pool.map(_preprocess_chunk, chunks) for text in chunk]
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.{'parquet' if PARQUET_AVAILABLE else 'pkl'}")
+
+def load_preprocessed(cache_dir, key):
+    """Return the cached preprocessed texts for key, or None"""
+    path = _cache_path(cache_dir, key)
+    if not os.path.exists(path):
+        return None
+    try:
+        cached = pd.read_parquet(path) if PARQUET_AVAILABLE else pd.read_pickle(path)
+        return cached['processed_text'].tolist()
+    except Exception as e:
+        print(f"Ignoring unreadable preprocessing cache {path}: {e}")
+        return None
+
+def save_preprocessed(cache_dir, key, processed):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, key)
+    # Write then rename, so an interrupted run never leaves a partial cache file
+    tmp_path = path + '.tmp'
+    frame = pd.DataFrame({'processed_text': processed})
+    if PARQUET_AVAILABLE:
+        frame.to_parquet(tmp_path, index=False)
+    else:
+        frame.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+# Streaming mode reads the corpus this many rows at a time
+STREAM_CHUNK_SIZE = 50000
+# Rows whose text hashes to bucket 0 are held out for evaluation (20%); the
+# split depends only on the text, so it is the same on every pass and run
+HOLDOUT_BUCKETS = 5
+
+def write_atomic(path, write):
+    """Write a file via write(tmp_path), then rename it over path.
+
+    Serving workers memory-map the model files (MODEL_MMAP_MODE), so a file
+    must never be rewritten in place: truncating mapped pages crashes them
+    (SIGBUS) or corrupts their arrays. The rename swaps in a new inode and
+    leaves mapped copies intact. The temp file keeps the extension, which
+    np.savez would otherwise append.
+    """
+    root, ext = os.path.splitext(path)
+    tmp_path = f'{root}.{os.getpid()}.tmp{ext}'
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def iter_csv_chunks(data_path, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield (texts, labels) chunks of a CSV corpus without loading all of it"""
+    for chunk in pd.read_csv(data_path, comment='#', chunksize=chunk_size):
+        chunk = chunk.dropna(subset=['text', 'label'])
+        yield chunk['text'].astype(str).tolist(), chunk['label'].astype(int).to_numpy()
+
+def is_holdout(text):
+    return zlib.crc32(text.encode('utf-8')) % HOLDOUT_BUCKETS == 0
 
 class HateSpeechModelTrainer:
-    """Train hate speech detection model"""
+    """Train hate speech detection model
+    
+    feature_mode 'tfidf' fits a TfidfVectorizer (vocabulary pickled with the
+    model); 'hashing' uses a stateless hashed feature space and stores only
+    the IDF vector (see backend/models/features.py).
+    """
     
-    def __init__(self):
+    def __init__(self, feature_mode='tfidf', n_features=HASHING_N_FEATURES,
+                 preprocess_jobs=None, preprocess_cache_dir=PREPROCESS_CACHE_DIR, n_jobs=-1):
         self.preprocessor = TextPreprocessor()
-        # Increase capacity and use sublinear TF; keep word ngrams
-        self.vectorizer = TfidfVectorizer(
-            max_features=10000,
-            ngram_range=(1, 2),
-            analyzer='word',
-            sublinear_tf=True
-        )
+        self.feature_mode = feature_mode
+        # Parallelism for fitting: forest trees and ensemble members (-1 = all CPUs)
+        self.n_jobs = n_jobs
+        self.preprocess_jobs = preprocess_jobs
+        # None disables the preprocessing cache
+        self.preprocess_cache_dir = preprocess_cache_dir
+        if feature_mode == 'hashing':
+            self.vectorizer = HashingTfidfVectorizer(
+                n_features=n_features,
+                ngram_range=(1, 2),
+                sublinear_tf=True
+            )
+        elif feature_mode == 'tfidf':
+            # Increase capacity and use sublinear TF; keep word ngrams
+            self.vectorizer = TfidfVectorizer(
+                max_features=10000,
+                ngram_range=(1, 2),
+                analyzer='word',
+                sublinear_tf=True
+            )
+        else:
+            raise ValueError(f"Unknown feature mode: {feature_mode}")
         self.model = None
+        self.report = StageReport(config={
+            'feature_mode': feature_mode,
+            'n_features': n_features if feature_mode == 'hashing' else 10000,
+            'n_jobs': n_jobs,
+            'preprocess_jobs': preprocess_jobs or os.cpu_count()
+        })
     
     def create_sample_dataset(self):
         """Create a sample dataset for training"""
@@ -145,12 +291,24 @@ class HateSpeechModelTrainer:
             print("Creating sample dataset...")
             return self.create_sample_dataset()
     
+    def preprocess_cached(self, texts):
+        """Preprocess texts in parallel, reusing the on-disk cache when possible"""
+        key = preprocess_cache_key(texts) if self.preprocess_cache_dir else None
+        
+        processed = load_preprocessed(self.preprocess_cache_dir, key) if key else None
+        if processed is not None and len(processed) == len(texts):
+            print(f"Preprocessing cache hit ({key}) - skipping preprocessing")
+            return processed
+        
+        print(f"Preprocessing {len(texts)} texts ({self.preprocess_jobs or os.cpu_count()} processes)...")
+        processed = preprocess_texts(texts, n_jobs=self.preprocess_jobs)
+        if key:
+            save_preprocessed(self.preprocess_cache_dir, key, processed)
+        return processed
+    
     def preprocess_data(self, df):
-        """Preprocess text data"""
-        print("Preprocessing text data...")
-        df['processed_text'] = df['text'].apply(
-            lambda x: self.preprocessor.preprocess(x, remove_stop=False, lemmatize=True)
-        )
+        """Preprocess text data (parallel, reusing the on-disk cache when possible)"""
+        df['processed_text'] = self.preprocess_cached(df['text'].tolist())
         return df
     
     def train(self, df):
@@ -160,7 +318,8 @@ class HateSpeechModelTrainer:
         print("="*50 + "\n")
         
         # Preprocess
-        df = self.preprocess_data(df)
+        with self.report.stage('preprocess'):
+            df = self.preprocess_data(df)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
@@ -175,31 +334,40 @@ class HateSpeechModelTrainer:
         
         # Vectorize text
         print("\nVectorizing text...")
-        X_train_vectorized = self.vectorizer.fit_transform(X_train)
-        X_test_vectorized = self.vectorizer.transform(X_test)
+        with self.report.stage('vectorize'):
+            X_train_vectorized = self.vectorizer.fit_transform(X_train)
+            X_test_vectorized = self.vectorizer.transform(X_test)
         
         # Create ensemble model
         print("\nTraining ensemble model...")
         
         # Individual models
         lr = LogisticRegression(random_state=42, max_iter=1000)
-        rf = RandomForestClassifier(n_estimators=100, random_state=42)
+        rf = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=self.n_jobs)
         nb = MultinomialNB()
         
-        # Ensemble voting classifier
+        # Ensemble voting classifier (members are fitted in parallel)
         self.model = VotingClassifier(
             estimators=[('lr', lr), ('rf', rf), ('nb', nb)],
-            voting='soft'
+            voting='soft',
+            n_jobs=self.n_jobs
         )
         
         # Train
-        self.model.fit(X_train_vectorized, y_train)
+        with self.report.stage('fit'):
+            self.model.fit(X_train_vectorized, y_train)
         
         # Evaluate
         print("\nEvaluating model...")
-        y_pred = self.model.predict(X_test_vectorized)
+        with self.report.stage('evaluate'):
+            y_pred = self.model.predict(X_test_vectorized)
         
         accuracy = accuracy_score(y_test, y_pred)
+        self.report.results.update({
+            'accuracy': round(float(accuracy), 4),
+            'train_samples': len(X_train),
+            'test_samples': len(X_test)
+        })
         print(f"\n✅ Accuracy: {accuracy:.4f}")
         
         print("\nClassification Report:")
@@ -210,19 +378,135 @@ class HateSpeechModelTrainer:
         
         return accuracy
     
+    def _stream(self, data_path, chunk_size, holdout):
+        """Yield (processed_texts, labels) for the training or held-out rows of each chunk"""
+        for texts, labels in iter_csv_chunks(data_path, chunk_size):
+            keep = np.array([is_holdout(text) == holdout for text in texts], dtype=bool)
+            if not keep.any():
+                continue
+            processed = self.preprocess_cached(texts)
+            yield [text for text, kept in zip(processed, keep) if kept], labels[keep]
+    
+    def train_streaming(self, data_path, chunk_size=STREAM_CHUNK_SIZE, learner='sgd', epochs=1):
+        """Train an incremental model chunk by chunk with bounded memory.
+        
+        Pass 1 accumulates IDF statistics over the hashed feature space; the
+        next passes feed each chunk to the learner's partial_fit; a last pass
+        scores the held-out rows. Only one chunk is in memory at a time, so
+        peak memory depends on chunk_size, not on the corpus size. Preprocessed
+        chunks are cached on disk, so later passes and reruns reuse them.
+        """
+        if self.feature_mode != 'hashing':
+            raise ValueError("Streaming training needs feature_mode='hashing' (no vocabulary to fit)")
+        
+        print("\n" + "="*50)
+        print(f"STREAMING TRAINING ({learner}, chunks of {chunk_size} rows)")
+        print("="*50 + "\n")
+        
+        with self.report.stage('idf_pass'):
+            for texts, _ in self._stream(data_path, chunk_size, holdout=False):
+                self.vectorizer.partial_fit(texts)
+        
+        if learner == 'nb':
+            self.model = MultinomialNB()
+        elif learner == 'sgd':
+            self.model = SGDClassifier(loss='log_loss', alpha=1e-6, random_state=42)
+        else:
+            raise ValueError(f"Unknown streaming learner: {learner}")
+        
+        classes = np.array([0, 1])
+        rng = np.random.RandomState(42)
+        train_samples = 0
+        with self.report.stage('fit'):
+            for epoch in range(epochs):
+                for texts, labels in self._stream(data_path, chunk_size, holdout=False):
+                    X = self.vectorizer.transform(texts)
+                    # SGD is order-sensitive; shuffle within the chunk
+                    order = rng.permutation(len(labels))
+                    self.model.partial_fit(X[order], labels[order], classes=classes)
+                    if epoch == 0:
+                        train_samples += len(labels)
+                print(f"Epoch {epoch + 1}/{epochs} done")
+        
+        print("\nEvaluating model...")
+        matrix = np.zeros((2, 2), dtype=np.int64)
+        with self.report.stage('evaluate'):
+            for texts, labels in self._stream(data_path, chunk_size, holdout=True):
+                predictions = self.model.predict(self.vectorizer.transform(texts))
+                matrix += confusion_matrix(labels, predictions, labels=classes)
+        
+        test_samples = int(matrix.sum())
+        accuracy = np.trace(matrix) / test_samples if test_samples else 0.0
+        print(f"\n✅ Accuracy: {accuracy:.4f}")
+        print("\nConfusion Matrix:")
+        print(matrix)
+        
+        self.report.config.update({'streaming': True, 'learner': learner, 'epochs': epochs, 'chunk_size': chunk_size})
+        self.report.results.update({
+            'accuracy': round(float(accuracy), 4),
+            'train_samples': train_samples,
+            'test_samples': test_samples
+        })
+        return accuracy
+    
+    def linear_model(self):
+        """Return the trained streaming learner as a serve-time LinearModel"""
+        if isinstance(self.model, MultinomialNB):
+            # Binary NB log-odds are linear in the features
+            log_prob = self.model.feature_log_prob_
+            log_prior = self.model.class_log_prior_
+            return LinearModel(log_prob[1] - log_prob[0], log_prior[1] - log_prior[0], self.model.classes_)
+        return LinearModel.from_estimator(self.model)
+    
     def save_model(self, model_dir='ml_model'):
-        """Save trained model and vectorizer"""
+        """Save trained model and vectorizer and return their paths"""
         if not os.path.exists(model_dir):
             os.makedirs(model_dir)
         
         model_path = os.path.join(model_dir, 'hate_speech_model.pkl')
-        vectorizer_path = os.path.join(model_dir, 'vectorizer.pkl')
         
-        joblib.dump(self.model, model_path)
-        joblib.dump(self.vectorizer, vectorizer_path)
+        with self.report.stage('save'):
+            # Never in place: running workers may have these files memory-mapped
+            write_atomic(model_path, lambda path: joblib.dump(self.model, path))
+            if self.feature_mode == 'hashing':
+                vectorizer_path = os.path.join(model_dir, HASHING_VECTORIZER_FILE)
+                stale_path = os.path.join(model_dir, TFIDF_VECTORIZER_FILE)
+                write_atomic(vectorizer_path, self.vectorizer.save)
+            else:
+                vectorizer_path = os.path.join(model_dir, TFIDF_VECTORIZER_FILE)
+                stale_path = os.path.join(model_dir, HASHING_VECTORIZER_FILE)
+                write_atomic(vectorizer_path, lambda path: joblib.dump(self.vectorizer, path))
+            
+            # The detector loads whichever feature file exists, so drop the other mode's
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
         
         print(f"\n✅ Model saved to: {model_path}")
         print(f"✅ Vectorizer saved to: {vectorizer_path}")
+        return model_path, vectorizer_path
+    
+    def publish_model(self, files, data_path, registry=None, activate=True, metrics=None):
+        """Publish saved model files as a new registry version and return its name.
+        
+        The version records the training data hash, the feature mode and the
+        evaluation metrics, and becomes the served model if activate is set.
+        """
+        registry = registry or ModelRegistry()
+        metadata = {
+            'source': 'training',
+            'feature_mode': self.feature_mode,
+            'training_data': os.path.basename(data_path),
+            'training_data_hash': file_sha256(data_path),
+            'metrics': {**self.report.results, **(metrics or {})},
+            'config': self.report.config
+        }
+        with self.report.stage('publish'):
+            return registry.publish(files, metadata, activate=activate)
+    
+    def save_report(self, model_dir='ml_model'):
+        """Write the per-stage timing/memory report next to the model"""
+        print("\n" + self.report.summary())
+        self.report.save(os.path.join(model_dir, 'training_report.json'))
     
     def test_model(self, test_texts):
         """Test model with sample texts"""
@@ -243,15 +527,64 @@ class HateSpeechModelTrainer:
 
 def main():
     """Main training function"""
+    parser = argparse.ArgumentParser(description="Train the hate speech detection model")
+    parser.add_argument('--data', default=None,
+                        help='Training CSV (default: data/sample_data.csv)')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Train chunk by chunk with an incremental learner (bounded memory, implies --features hashing)')
+    parser.add_argument('--chunk-size', type=int, default=STREAM_CHUNK_SIZE,
+                        help='Rows per chunk in streaming mode')
+    parser.add_argument('--learner', choices=['sgd', 'nb'], default='sgd',
+                        help='Incremental learner in streaming mode')
+    parser.add_argument('--epochs', type=int, default=1,
+                        help='Passes over the corpus in streaming mode')
+    parser.add_argument('--features', choices=['tfidf', 'hashing'], default='tfidf',
+                        help='Feature pipeline: fitted TF-IDF vocabulary or hashed features with stored IDF')
+    parser.add_argument('--n-features', type=int, default=HASHING_N_FEATURES,
+                        help='Size of the hashed feature space (hashing mode only)')
+    parser.add_argument('--n-jobs', type=int, default=-1,
+                        help='Parallel jobs for fitting forest trees and ensemble members (-1 = all CPUs)')
+    parser.add_argument('--preprocess-jobs', type=int, default=None,
+                        help='Worker processes for preprocessing (default: all CPUs)')
+    parser.add_argument('--no-preprocess-cache', action='store_true',
+                        help='Always preprocess instead of reusing instance/preprocess_cache')
+    parser.add_argument('--no-publish', action='store_true',
+                        help='Only write the files in ml_model/, do not add a registry version')
+    parser.add_argument('--no-activate', action='store_true',
+                        help='Publish the registry version without making it the served model')
+    args = parser.parse_args()
+    
     print("\n🚀 Starting Hate Speech Detection Model Training...\n")
     
     # Create trainer
-    trainer = HateSpeechModelTrainer()
+    trainer = HateSpeechModelTrainer(
+        feature_mode='hashing' if args.streaming else args.features,
+        n_features=args.n_features,
+        preprocess_jobs=args.preprocess_jobs,
+        preprocess_cache_dir=None if args.no_preprocess_cache else PREPROCESS_CACHE_DIR,
+        n_jobs=args.n_jobs
+    )
     
     # Load data from sample_data.csv (use absolute path from script location)
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(os.path.dirname(script_dir), 'data', 'sample_data.csv')
-    df = trainer.load_or_create_data(data_path=data_path)
+    data_path = args.data or os.path.join(os.path.dirname(script_dir), 'data', 'sample_data.csv')
+    
+    if args.streaming:
+        trainer.train_streaming(data_path, chunk_size=args.chunk_size, learner=args.learner, epochs=args.epochs)
+        model_path, vectorizer_path = trainer.save_model()
+        # The incremental learner is already linear: export it directly
+        with trainer.report.stage('export_linear'):
+            write_atomic(DEFAULT_LINEAR_MODEL_PATH, trainer.linear_model().save)
+        print(f"✅ Linear model saved to: {DEFAULT_LINEAR_MODEL_PATH}")
+        if not args.no_publish:
+            trainer.publish_model([model_path, vectorizer_path, DEFAULT_LINEAR_MODEL_PATH], data_path,
+                                  activate=not args.no_activate)
+        trainer.save_report()
+        print("\n✅ Training completed successfully!\n")
+        return
+    
+    with trainer.report.stage('load'):
+        df = trainer.load_or_create_data(data_path=data_path)
     print(f"\nDataset shape: {df.shape}")
     print(f"Hate speech samples: {df['label'].sum()}")
     print(f"Normal speech samples: {(df['label'] == 0).sum()}")
@@ -260,7 +593,21 @@ def main():
     accuracy = trainer.train(df)
     
     # Save model
-    trainer.save_model()
+    model_path, vectorizer_path = trainer.save_model()
+    
+    # Export the compact linear model served by the backend
+    from ml_model.export_linear_model import export_linear_model
+    with trainer.report.stage('export_linear'):
+        linear_report = export_linear_model(model_dir='ml_model', data_path=data_path)
+    
+    # New registry version (ml_model/registry/), picked up by the backend on reload
+    if not args.no_publish:
+        trainer.publish_model([model_path, vectorizer_path, DEFAULT_LINEAR_MODEL_PATH], data_path,
+                              activate=not args.no_activate,
+                              metrics={'linear_held_out': linear_report['held_out']})
+    
+    # Per-stage timing and memory report (ml_model/training_report.json)
+    trainer.save_report()
     
     # Test with sample texts
     test_texts = [
@@ -0,0 +1,243 @@
+"""
+Shared test fixtures: an in-memory stand-in for the MongoDB collections
+
+FakeDb covers the pymongo calls backend/database.py and the online
+learning code make (find/sort/skip/limit, counts, $match/$group
+aggregation, updates including update pipelines, bulk_write), with the
+query operators they use. Every call is recorded in db.calls by method name.
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from pymongo import InsertOne, UpdateMany, UpdateOne
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import backend.database as database
+from backend.write_buffer import WriteBuffer
+
+
+def _compare(value, op, operand):
+    if op == '$in':
+        return value in operand
+    if op == '$nin':
+        return value not in operand
+    if op == '$ne':
+        return value != operand
+    if value is None:
+        return False
+    return {
+        '$gt': lambda: value > operand,
+        '$gte': lambda: value >= operand,
+        '$lt': lambda: value < operand,
+        '$lte': lambda: value <= operand,
+    }[op]()
+
+
+def matches(doc, query):
+    """True when doc satisfies a Mongo query (the operators used in the backend)"""
+    for key, condition in (query or {}).items():
+        if key == '$and':
+            if not all(matches(doc, part) for part in condition):
+                return False
+        elif key == '$or':
+            if not any(matches(doc, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == '$exists':
+                    if (key in doc) != operand:
+                        return False
+                elif not _compare(doc.get(key), op, operand):
+                    return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+def evaluate(expr, doc):
+    """Evaluate an aggregation expression against doc (update pipelines)"""
+    if isinstance(expr, str) and expr.startswith('$'):
+        return doc.get(expr[1:])
+    if isinstance(expr, dict) and len(expr) == 1 and next(iter(expr)).startswith('$'):
+        (op, args), = expr.items()
+        values = [evaluate(arg, doc) for arg in args]
+        return {
+            '$add': lambda: sum(values),
+            '$ifNull': lambda: values[0] if values[0] is not None else values[1],
+            '$gte': lambda: values[0] >= values[1],
+            '$eq': lambda: values[0] == values[1],
+            '$ne': lambda: values[0] != values[1],
+            '$and': lambda: all(values),
+            '$or': lambda: any(values),
+            '$cond': lambda: values[1] if values[0] else values[2],
+        }[op]()
+    return expr
+
+
+def apply_update(doc, update):
+    """Apply a $set/$inc/$setOnInsert document or an update pipeline to doc in place"""
+    if isinstance(update, list):
+        for stage in update:
+            doc.update({key: evaluate(value, doc) for key, value in stage['$set'].items()})
+        return
+    doc.update(update.get('$set', {}))
+    for key, amount in update.get('$inc', {}).items():
+        doc[key] = (doc.get(key) or 0) + amount
+
+
+class FakeCursor:
+    def __init__(self, docs, collection):
+        self.docs = docs
+        self.collection = collection
+
+    def sort(self, key, direction=1):
+        keys = [(key, direction)] if isinstance(key, str) else key
+        docs = self.docs
+        for field, field_direction in reversed(keys):
+            docs = sorted(docs, key=lambda doc: doc[field], reverse=field_direction < 0)
+        return FakeCursor(docs, self.collection)
+
+    def skip(self, count):
+        self.collection.skipped += count
+        return FakeCursor(self.docs[count:], self.collection)
+
+    def limit(self, count):
+        return FakeCursor(self.docs[:count] if count else self.docs, self.collection)
+
+    def __iter__(self):
+        return iter(self.docs)
+
+
+class FakeCollection:
+    def __init__(self, docs=None, calls=None):
+        self.docs = list(docs or [])
+        self.calls = calls if calls is not None else []
+        self.skipped = 0
+
+    def _select(self, query):
+        return [doc for doc in self.docs if matches(doc, query)]
+
+    def find(self, query=None, projection=None):
+        self.calls.append('find')
+        return FakeCursor(self._select(query), self)
+
+    def find_one(self, query=None, projection=None):
+        self.calls.append('find_one')
+        return next(iter(self._select(query)), None)
+
+    def count_documents(self, query):
+        self.calls.append('count_documents')
+        return len(self._select(query))
+
+    def estimated_document_count(self):
+        self.calls.append('estimated_document_count')
+        return len(self.docs)
+
+    def aggregate(self, pipeline):
+        """$match followed by a $group counting documents per '$field'"""
+        self.calls.append('aggregate')
+        docs = self._select(pipeline[0]['$match'])
+        field = pipeline[1]['$group']['_id'][1:]
+        counts = {}
+        for doc in docs:
+            counts[doc[field]] = counts.get(doc[field], 0) + 1
+        return [{'_id': key, 'count': value} for key, value in counts.items()]
+
+    def insert_one(self, doc):
+        self.calls.append('insert_one')
+        self.docs.append(dict(doc))
+
+    def update_one(self, query, update, upsert=False):
+        self.calls.append('update_one')
+        return self._update(query, update, upsert, many=False)
+
+    def update_many(self, query, update):
+        self.calls.append('update_many')
+        return self._update(query, update, False, many=True)
+
+    def _update(self, query, update, upsert, many):
+        docs = self._select(query)
+        if not many:
+            docs = docs[:1]
+        if not docs and upsert:
+            doc = {key: value for key, value in query.items() if not isinstance(value, dict)}
+            doc.update(update.get('$setOnInsert', {}))
+            self.docs.append(doc)
+            docs = [doc]
+        for doc in docs:
+            apply_update(doc, update)
+        return SimpleNamespace(matched_count=len(docs), modified_count=len(docs))
+
+    def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        self.calls.append('find_one_and_update')
+        doc = next(iter(self._select(query)), None)
+        if doc is None:
+            if not upsert:
+                return None
+            doc = {key: value for key, value in query.items() if not isinstance(value, dict)}
+            self.docs.append(doc)
+        before = dict(doc)
+        apply_update(doc, update)
+        # pymongo's ReturnDocument.BEFORE is False, AFTER is True
+        return dict(doc) if return_document else before
+
+    def bulk_write(self, operations, ordered=True):
+        self.calls.append('bulk_write')
+        for operation in operations:
+            if isinstance(operation, InsertOne):
+                self.docs.append(dict(operation._doc))
+            elif isinstance(operation, (UpdateOne, UpdateMany)):
+                self._update(operation._filter, operation._doc, operation._upsert,
+                             many=isinstance(operation, UpdateMany))
+            else:
+                raise NotImplementedError(type(operation).__name__)
+
+
+class FakeDb:
+    """Collections are created on first access and share one calls log"""
+
+    def __init__(self, **collections):
+        self.calls = []
+        for name, docs in collections.items():
+            setattr(self, name, FakeCollection(docs, self.calls))
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        collection = FakeCollection(calls=self.calls)
+        setattr(self, name, collection)
+        return collection
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """An empty FakeDb that backend.database uses instead of MongoDB.
+
+    Buffered writes go to it through a fresh WriteBuffer that only writes on
+    database.flush_writes() (or once 500 operations are pending).
+    """
+    db = FakeDb()
+    monkeypatch.setattr(database, '_get_db', lambda: (None, db))
+    monkeypatch.setattr(database, '_write_buffer', WriteBuffer(lambda: db, flush_interval=60))
+    yield db
+    database.flush_writes(timeout=5)
+
+
+@pytest.fixture
+def api_client():
+    """Flask test client for the API blueprint, mounted at /api as in backend/app.py"""
+    from flask import Flask
+    from backend.routes.api import api_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(api_bp, url_prefix='/api')
+    return app.test_client()
@@ -0,0 +1,84 @@
+import os
+import sys
+
+import pytest
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import backend.database as database
+
+
+@pytest.fixture
+def db(fake_db):
+    fake_db.users.docs = [
+        {'id': 1, 'username': 'alice', 'is_suspended': False},
+        {'id': 2, 'username': 'bob', 'is_suspended': True},
+    ]
+    # Legacy posts written before author_suspended existed
+    fake_db.posts.docs = [
+        {'id': 1, 'user_id': 1, 'is_hate_speech': False},
+        {'id': 2, 'user_id': 2, 'is_hate_speech': False},
+        {'id': 3, 'user_id': 1, 'is_hate_speech': True},
+    ]
+    return fake_db
+
+
+def _feed_ids(db, include_hate=False):
+    query = database.feed_query(include_hate)
+    return [post['id'] for post in db.posts.find(query)]
+
+
+def test_feed_query_is_a_single_equality_match(db):
+    assert database.feed_query() == {'author_suspended': False, 'is_hate_speech': False}
+    assert database.feed_query(include_hate=True) == {'author_suspended': False}
+
+
+def test_sync_backfills_legacy_posts(db):
+    assert database.sync_author_suspended() == 4
+    assert [post['author_suspended'] for post in db.posts.docs] == [False, True, False]
+    assert _feed_ids(db) == [1]
+    assert _feed_ids(db, include_hate=True) == [1, 3]
+    assert database.sync_author_suspended() == 0
+
+
+def test_suspend_and_unsuspend_update_posts_in_bulk(db):
+    database.sync_author_suspended()
+    db.calls.clear()
+
+    database.update_user(1, {'is_suspended': True})
+    database.flush_writes()
+    assert _feed_ids(db, include_hate=True) == []
+    database.update_user(2, {'is_suspended': False, 'warning_count': 0})
+    database.flush_writes()
+    assert _feed_ids(db, include_hate=True) == [2]
+    assert db.calls.count('bulk_write') == 2
+
+    database.update_user(2, {'warning_count': 1})
+    database.flush_writes()
+    assert db.calls.count('bulk_write') == 2
+
+
+def test_suspension_lands_after_buffered_posts(db):
+    database.sync_author_suspended()
+    database.create_post({'user_id': 1, 'content': 'still in the buffer', 'is_hate_speech': False})
+    database.update_user(1, {'is_suspended': True})
+    assert db.posts.find_one({'content': 'still in the buffer'}) is None
+
+    database.flush_writes()
+    assert db.posts.find_one({'content': 'still in the buffer'})['author_suspended'] is True
+    assert _feed_ids(db, include_hate=True) == []
+
+
+def test_admin_sync_fixes_posts_that_landed_after_a_suspension(db, api_client):
+    database.sync_author_suspended()
+    # Another worker suspended alice after this post passed the author check
+    db.users.docs[0]['is_suspended'] = True
+    database.create_post({'user_id': 1, 'content': 'raced the suspension', 'is_hate_speech': False})
+
+    response = api_client.post('/api/admin/posts/sync-suspended')
+    assert response.status_code == 200
+    assert response.get_json()['posts_updated'] == 3
+    assert _feed_ids(db, include_hate=True) == []
@@ -0,0 +1,24 @@
+import os
+import sys
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.detector import detector
+
+TEXTS = [
+    "I love walking in nature with my friends every weekend",
+    "All members of that religion are terrorists and criminals",
+    "",
+    "Go back to where you came from, you don't belong here",
+    "Thank you for sharing this information with the community",
+]
+
+def test_analyze_batch_matches_analyze():
+    expected = [detector.analyze(text) for text in TEXTS]
+    assert detector.analyze_batch(TEXTS) == expected
+
+def test_analyze_batch_empty_list():
+    assert detector.analyze_batch([]) == []
@@ -0,0 +1,122 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import backend.routes.api as api
+import backend.utils.api_keys as api_keys
+
+API_KEY = 'test-key'
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    """Replaces the detector's batch scoring; records the texts of each call"""
+    calls = []
+
+    def analyze_batch(texts, translate=True, timings=None):
+        calls.append(list(texts))
+        return [{'is_hate_speech': 'hate' in text, 'confidence': 0.9} for text in texts]
+
+    monkeypatch.setattr(api.detector, 'analyze_batch', analyze_batch)
+    return calls
+
+
+@pytest.fixture
+def api_key(fake_db, monkeypatch):
+    monkeypatch.setattr(api_keys, '_get_db', lambda: (None, fake_db))
+    fake_db.api_keys.docs = [{
+        'hashed_key': api_keys.hash_api_key(API_KEY),
+        'tier': 'free',
+        'is_active': True,
+        'calls_used': 0,
+        'calls_limit': 5
+    }]
+    return fake_db.api_keys.docs[0]
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+@pytest.mark.parametrize('body', [
+    {'texts': 'not a list'},
+    'just a string',
+    ['ok', 42],
+    ['ok', {'id': 'p2'}],
+    [],
+])
+def test_invalid_bodies_are_rejected(api_client, scored, body):
+    response = api_client.post('/api/analyze/batch', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+    assert scored == []
+
+
+def test_results_stream_in_input_order_across_chunks(api_client, scored, monkeypatch):
+    monkeypatch.setattr(api, 'BATCH_CHUNK_SIZE', 2)
+    response = api_client.post('/api/analyze/batch', json={'texts': ['hi', {'id': 'p2', 'text': 'hate'}, 'bye']})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = _lines(response)
+    assert [line['index'] for line in lines] == [0, 1, 2]
+    assert [line['id'] for line in lines] == [None, 'p2', None]
+    assert [line['action_taken'] for line in lines] == ['none', 'block', 'none']
+    assert scored == [['hi', 'hate'], ['bye']]
+
+
+def test_ndjson_body(api_client, scored):
+    body = '{"id": "p1", "text": "hello"}\n\n"world"\n'
+    response = api_client.post('/api/analyze/batch', data=body, content_type='application/x-ndjson')
+    assert [line['id'] for line in _lines(response)] == ['p1', None]
+
+
+def test_too_many_texts_is_413_before_scoring_or_charging(api_client, scored, api_key, monkeypatch):
+    monkeypatch.setattr(api, 'BATCH_MAX_ITEMS', 3)
+    response = api_client.post('/api/analyze/batch', json=['a', 'b', 'c', 'd'], headers={'X-API-Key': API_KEY})
+    assert response.status_code == 413
+    assert scored == [] and api_key['calls_used'] == 0
+
+
+def test_api_key_is_charged_per_item(api_client, scored, api_key):
+    headers = {'X-API-Key': API_KEY}
+    response = api_client.post('/api/analyze/batch', json=['a', 'b', 'c'], headers=headers)
+    assert response.status_code == 200 and len(_lines(response)) == 3
+    assert api_key['calls_used'] == 3
+
+    # 3 more would exceed the limit of 5: rejected whole, nothing charged or scored
+    response = api_client.post('/api/analyze/batch', json=['d', 'e', 'f'], headers=headers)
+    assert response.status_code == 401
+    assert 'limit' in response.get_json()['error']
+    assert api_key['calls_used'] == 3 and len(scored) == 1
+
+    response = api_client.post('/api/analyze/batch', json=['d', 'e'], headers=headers)
+    assert response.status_code == 200 and api_key['calls_used'] == 5
+
+
+def test_unknown_api_key_is_rejected(api_client, scored, api_key):
+    response = api_client.post('/api/analyze/batch', json=['a'], headers={'X-API-Key': 'wrong'})
+    assert response.status_code == 401
+    assert scored == []
+
+
+def test_debug_timings_header_adds_per_message_timings(api_client, monkeypatch):
+    def analyze_batch(texts, translate=True, timings=None):
+        if timings is not None:
+            timings.update({'rules': 300 * len(texts), 'total': 900 * len(texts)})
+        return [{'is_hate_speech': False, 'confidence': 0.0} for _ in texts]
+
+    monkeypatch.setattr(api.detector, 'analyze_batch', analyze_batch)
+    monkeypatch.setattr(api, 'BATCH_CHUNK_SIZE', 2)
+    lines = _lines(api_client.post('/api/analyze/batch', json=['a', 'b', 'c'],
+                                   headers={'X-Debug-Timings': '1'}))
+    assert [line['result']['timings'] for line in lines] == [{'rules': 300, 'total': 900}] * 3
+
+    lines = _lines(api_client.post('/api/analyze/batch', json=['a']))
+    assert 'timings' not in lines[0]['result']
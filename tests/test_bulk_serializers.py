@@ -0,0 +1,47 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import backend.database as database
+
+
+@pytest.fixture
+def db(fake_db):
+    now = datetime(2026, 1, 1)
+    fake_db.users.docs = [{'id': i, 'username': f'user{i}', 'email': f'u{i}@example.com', 'created_at': now}
+                          for i in range(1, 51)]
+    fake_db.violations.docs = [{'id': i, 'user_id': i % 5 + 1, 'content': 'x', 'timestamp': now}
+                               for i in range(1, 31)]
+    fake_db.posts.docs = [{'id': i, 'user_id': i % 7 + 1, 'content': 'hello', 'created_at': now}
+                          for i in range(1, 21)]
+    return fake_db
+
+
+def test_bulk_serializers_match_per_row_serializers(db):
+    assert database.to_user_dicts(db.users.docs) == [database.to_user_dict(doc) for doc in db.users.docs]
+    assert database.to_violation_dicts(db.violations.docs) == [database.to_violation_dict(doc) for doc in db.violations.docs]
+    assert database.to_post_dicts(db.posts.docs) == [database.to_post_dict(doc) for doc in db.posts.docs]
+
+
+def test_bulk_serializers_issue_one_query_per_page(db):
+    users = database.to_user_dicts(db.users.docs)
+    assert db.calls == ['aggregate']
+    assert users[0]['violations_count'] == 6 and users[-1]['violations_count'] == 0
+
+    db.calls.clear()
+    database.to_violation_dicts(db.violations.docs)
+    database.to_post_dicts(db.posts.docs)
+    assert db.calls == ['find', 'find']
+
+    # Known authors need no query at all
+    db.calls.clear()
+    own = [doc for doc in db.posts.docs if doc['user_id'] == 2]
+    assert database.to_post_dicts(own, usernames={2: 'user2'})[0]['username'] == 'user2'
+    assert database.to_post_dicts([]) == [] and db.calls == []
@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.detector import HateSpeechDetector
+from backend.models.registry import ModelBundle
+
+
+class CountingModel:
+    """Says hate speech with probability 0.95 and counts scored rows"""
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self):
+        self.rows = 0
+
+    def predict_proba(self, X):
+        self.rows += len(X)
+        return np.tile([0.05, 0.95], (len(X), 1))
+
+
+class IdentityVectorizer:
+    def transform(self, texts):
+        return list(texts)
+
+
+def _detector():
+    detector = HateSpeechDetector()
+    model = CountingModel()
+    detector.bundle = ModelBundle(model, IdentityVectorizer(), 'test', 'linear')
+    return detector, model
+
+
+def test_decisive_stages_skip_the_model():
+    detector, model = _detector()
+    cases = {
+        "I love walking in nature with my friends": 'safe_context',
+        "The train leaves at noon": 'no_match',
+        "Go back to where you came from": 'rules',
+        "All members of that religion are terrorists and criminals": 'rules',
+        "": 'empty',
+    }
+    for text, stage in cases.items():
+        result = detector.analyze(text, translate=False)
+        assert result['decided_by'] == stage, text
+    assert model.rows == 0
+
+    assert detector.analyze("I love walking in nature", translate=False)['is_hate_speech'] is False
+    assert detector.analyze("Go back to where you came from", translate=False)['is_hate_speech'] is True
+
+
+def test_weak_rule_hit_is_fused_with_the_model():
+    detector, model = _detector()
+    result = detector.analyze("they are criminals", translate=False)
+    assert model.rows == 1
+    assert result['decided_by'] == 'ml'
+    assert result['is_hate_speech'] and result['confidence'] == 0.95
+
+
+def test_batch_scores_only_undecided_texts():
+    detector, model = _detector()
+    texts = ["they are criminals", "The train leaves at noon", "Go back to where you came from", "those animals"]
+    results = detector.analyze_batch(texts, translate=False)
+    assert model.rows == 2
+    assert [result['decided_by'] for result in results] == ['ml', 'no_match', 'rules', 'ml']
+    assert results == [detector.analyze(text, translate=False) for text in texts]
+
+
+class FixedLexicon:
+    def __init__(self, confidence):
+        self.confidence = confidence
+
+    def max_confidence(self, text):
+        return self.confidence
+
+
+def test_stronger_lexicon_match_raises_a_decisive_rule_hit():
+    detector, model = _detector()
+    detector.lexicon = FixedLexicon(0.99)
+    result = detector.analyze("Go back to where you came from", translate=False)
+    assert result['decided_by'] == 'rules' and result['confidence'] == 0.99
+    assert model.rows == 0
+
+
+def test_decisive_threshold_is_never_below_block_confidence():
+    code = (
+        "from backend.models import detector\n"
+        "print(detector.BLOCK_CONFIDENCE, detector.DECISIVE_RULE_CONFIDENCE)\n"
+    )
+    for env, expected in (({'BLOCK_CONFIDENCE': '0.9'}, '0.9 0.9'),
+                          ({'BLOCK_CONFIDENCE': '0.9', 'DECISIVE_RULE_CONFIDENCE': '0.5'}, '0.9 0.9'),
+                          ({'DECISIVE_RULE_CONFIDENCE': '0.95'}, '0.8 0.95')):
+        base = {key: value for key, value in os.environ.items()
+                if key not in ('BLOCK_CONFIDENCE', 'DECISIVE_RULE_CONFIDENCE')}
+        env = {**base, **env}
+        output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        assert output.split()[-2:] == expected.split()
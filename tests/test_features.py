@@ -0,0 +1,58 @@
+import os
+import sys
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.features import (
+    HashingTfidfVectorizer,
+    load_vectorizer,
+    HASHING_VECTORIZER_FILE,
+    TFIDF_VECTORIZER_FILE
+)
+
+DOCS = [
+    "you are stupid and worthless",
+    "have a great day",
+    "great day you idiot idiot",
+    "thanks for sharing this great post",
+] * 5
+
+
+def test_hashing_weights_match_tfidf_vectorizer():
+    hashed = HashingTfidfVectorizer().fit_transform(DOCS).toarray()
+    fitted = TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True).fit_transform(DOCS).toarray()
+    # Same weights, different column order (no collisions in such a small vocabulary)
+    for hashed_row, fitted_row in zip(hashed, fitted):
+        assert np.allclose(np.sort(hashed_row[hashed_row > 0]), np.sort(fitted_row[fitted_row > 0]))
+
+
+def test_hashing_vectorizer_round_trip(tmp_path):
+    vectorizer = HashingTfidfVectorizer(n_features=2 ** 12).fit(DOCS)
+    path = str(tmp_path / HASHING_VECTORIZER_FILE)
+    vectorizer.save(path)
+    loaded = HashingTfidfVectorizer.load(path)
+
+    texts = DOCS + ["completely unseen words here"]
+    assert loaded.n_features == 2 ** 12
+    assert abs(loaded.transform(texts) - vectorizer.transform(texts)).max() < 1e-12
+
+
+def test_load_vectorizer_prefers_file_present(tmp_path):
+    model_dir = str(tmp_path)
+    assert load_vectorizer(model_dir) == (None, None)
+
+    joblib.dump(TfidfVectorizer().fit(DOCS), os.path.join(model_dir, TFIDF_VECTORIZER_FILE))
+    vectorizer, path = load_vectorizer(model_dir)
+    assert isinstance(vectorizer, TfidfVectorizer)
+    assert path.endswith(TFIDF_VECTORIZER_FILE)
+
+    HashingTfidfVectorizer(n_features=2 ** 10).fit(DOCS).save(os.path.join(model_dir, HASHING_VECTORIZER_FILE))
+    vectorizer, path = load_vectorizer(model_dir)
+    assert isinstance(vectorizer, HashingTfidfVectorizer)
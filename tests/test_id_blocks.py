@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import backend.database as database
+
+
+@pytest.fixture
+def db(fake_db, monkeypatch):
+    monkeypatch.setattr(database, 'ID_BLOCK_SIZE', 4)
+    database._reset_id_blocks()
+    yield fake_db
+    database._reset_id_blocks()
+
+
+def test_one_round_trip_per_block(db):
+    ids = [database._get_next_sequence('posts') for _ in range(10)]
+    assert ids == list(range(1, 11))
+    assert db.calls.count('find_one_and_update') == 3
+    assert database._get_next_sequence('users') == 1
+
+
+def test_ids_stay_unique_across_processes(db):
+    # A restarted (or forked) process drops its block and reserves a new one
+    first = [database._get_next_sequence('posts') for _ in range(2)]
+    database._reset_id_blocks()
+    second = [database._get_next_sequence('posts') for _ in range(2)]
+    assert first == [1, 2] and second == [5, 6]
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_child_drops_the_parents_client_and_buffer(monkeypatch):
+    monkeypatch.setattr(database, '_client', object())
+    monkeypatch.setattr(database, '_db', object())
+    monkeypatch.setattr(database, '_write_buffer', object())
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        state = (database._client, database._db, database._write_buffer)
+        os.write(write, b'1' if state == (None, None, None) else b'0')
+        os._exit(0)
+    os.close(write)
+    os.waitpid(pid, 0)
+    assert os.read(read, 1) == b'1'
+    os.close(read)
+    assert database._client is not None
@@ -1,19 +1,76 @@
 import os
 import sys
-import importlib
+
+import numpy as np
 
 # Ensure project root is on path
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-from backend.models.detector import detector
+from backend.models.detector import HateSpeechDetector, BLOCK_CONFIDENCE
+from backend.models.registry import ModelBundle
+
+# Lexicon hits with no hate speech pattern: profanity, single keywords, insults
+LEXICON_ONLY = [
+    "fuck",
+    "you are useless",
+    "I feel so dumb today",
+    "kill the lights please",
+    "This traffic is stupid",
+]
+
+
+class FixedModel:
+    """Gives every text the same hate speech probability"""
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, probability):
+        self.probability = probability
+
+    def predict_proba(self, X):
+        return np.tile([1 - self.probability, self.probability], (len(X), 1))
+
+
+class IdentityVectorizer:
+    def transform(self, texts):
+        return list(texts)
+
+
+def _detector(probability=None):
+    detector = HateSpeechDetector()
+    detector.bundle = None
+    if probability is not None:
+        detector.bundle = ModelBundle(FixedModel(probability), IdentityVectorizer(), 'test', 'linear')
+    return detector
+
+
+def detector_result(probability, text):
+    return _detector(probability).analyze(text, translate=False)
+
+
+def _blocked(result):
+    return result['is_hate_speech'] and result['confidence'] >= BLOCK_CONFIDENCE
+
+
+def test_lexicon_hits_alone_are_not_hate_speech():
+    detector = _detector()
+    for text in LEXICON_ONLY:
+        assert detector.lexicon.find_hits(text), text
+        result = detector.analyze(text, translate=False)
+        assert result['is_hate_speech'] is False, text
+        assert detector.rule_based_detection(text)[0] is False, text
+
 
-def test_profane_word_flagged():
-    res = detector.analyze("fuck")
-    assert res['is_hate_speech'] is True, "'fuck' should be flagged as hate/offensive"
+def test_lexicon_hits_are_left_to_the_model_and_never_blocked():
+    for text in LEXICON_ONLY:
+        assert detector_result(0.3, text)['is_hate_speech'] is False, text
+        result = detector_result(0.95, text)
+        assert result['decided_by'] == 'ml' and result['is_hate_speech'], text
+        assert not _blocked(result), text
 
-def test_targeted_insult_useless_flagged():
-    res = detector.analyze("you are useless")
-    assert res['is_hate_speech'] is True, "'you are useless' should be flagged as hate/offensive"
 
+def test_hate_speech_patterns_still_block():
+    result = _detector().analyze("All members of that religion are terrorists and criminals", translate=False)
+    assert _blocked(result) and result['decided_by'] == 'rules'
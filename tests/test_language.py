@@ -0,0 +1,38 @@
+import os
+import sys
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.language import script_language
+
+def test_ascii_english_takes_fast_path():
+    assert script_language("You should go back to where you came from") == 'en'
+
+def test_short_or_non_english_ascii_is_ambiguous():
+    assert script_language("ok") is None
+    assert script_language("que pasa amigo como estas") is None
+
+def test_non_english_ascii_sentences_are_not_english():
+    # Built from words ('no', 'me', 'in', 'a', 'so', 'was', 'is') English shares with these languages
+    for text in ("no me gusta nada",              # es
+                 "io sono in casa a Roma",        # it
+                 "ich bin so muede was ist das",  # de
+                 "het is in orde zo"):            # nl
+        assert script_language(text) is None, text
+
+def test_weak_english_match_falls_through():
+    assert script_language("This is a test message") is None
+
+def test_single_script_text():
+    assert script_language("Привет, как дела?") == 'ru'
+    assert script_language("Привіт, як справи? Їжак") == 'uk'
+    assert script_language("こんにちは、元気ですか") == 'ja'
+    assert script_language("你好，你今天怎么样") == 'zh-cn'
+    assert script_language("안녕하세요 잘 지내세요") == 'ko'
+    assert script_language("مرحبا كيف حالك") == 'ar'
+
+def test_accented_latin_is_ambiguous():
+    assert script_language("Hola, ¿qué tal estás hoy?") is None
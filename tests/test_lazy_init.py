@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.detector import LazyDetector
+
+def test_importing_helpers_does_not_load_nltk_or_models():
+    code = (
+        "import sys\n"
+        "import backend.utils.preprocessing, backend.models.detector\n"
+        "from backend.models.detector import detector\n"
+        "assert 'nltk' not in sys.modules\n"
+        "assert 'sklearn' not in sys.modules\n"
+        "assert detector.state == 'uninitialized'\n"
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+
+class FakeDetector:
+    def analyze(self, text):
+        return {'text': text}
+
+def test_lazy_detector_initializes_on_first_use():
+    lazy = LazyDetector(factory=FakeDetector)
+    assert lazy.state == 'uninitialized' and not lazy.is_ready
+    assert lazy.analyze('hi') == {'text': 'hi'}
+    assert lazy.is_ready
+    assert lazy.initialize() is lazy.initialize()
+
+def test_lazy_detector_reports_failure_and_retries():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError('model missing')
+        return FakeDetector()
+
+    lazy = LazyDetector(factory=factory)
+    with pytest.raises(RuntimeError):
+        lazy.initialize()
+    assert lazy.state == 'failed' and lazy.error == 'model missing'
+    assert lazy.analyze('x') == {'text': 'x'}
+    assert lazy.state == 'ready' and lazy.error is None
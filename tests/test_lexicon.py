@@ -0,0 +1,37 @@
+import os
+import sys
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.lexicon import (
+    Lexicon,
+    LEXICON_WORD_CONFIDENCE,
+    LEXICON_PHRASE_CONFIDENCE
+)
+
+def test_hits_are_whole_words_only():
+    lexicon = Lexicon(['ass', 'idiot'])
+    assert lexicon.find_hits("classic passage") == []
+    assert lexicon.find_hits("You IDIOT, what an ass!") == ['idiot', 'ass']
+
+def test_overlapping_words_and_phrases():
+    lexicon = Lexicon(['loser', "you're a loser", 'shut the fuck up', 'fuck'])
+    hits = lexicon.find_hits("Shut  the FUCK up, you’re a loser")
+    assert set(hits) == {'shut the fuck up', 'fuck', "you're a loser", 'loser'}
+    assert lexicon.max_confidence("total loser") == LEXICON_WORD_CONFIDENCE
+    assert lexicon.max_confidence("you're a loser") == LEXICON_PHRASE_CONFIDENCE
+
+def test_from_file_skips_comments_and_splits_phrases(tmp_path):
+    path = tmp_path / 'keywords.txt'
+    path.write_text("# comment\n\nJerk\ngo kill yourself\njerk\n", encoding='utf-8')
+    lexicon = Lexicon.from_file(str(path))
+    assert lexicon.words == {'jerk'}
+    assert lexicon.phrases == {'go kill yourself'}
+    assert lexicon.version != Lexicon.empty().version
+
+def test_empty_lexicon_has_no_hits():
+    assert Lexicon.empty().find_hits("anything at all") == []
+    assert Lexicon.empty().max_confidence("anything at all") == 0.0
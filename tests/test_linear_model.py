@@ -0,0 +1,54 @@
+import os
+import sys
+
+import numpy as np
+from scipy import sparse
+from sklearn.linear_model import LogisticRegression
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.linear import LinearModel
+from ml_model.export_linear_model import distill
+
+
+def _toy_data(rows=400, features=50, seed=0):
+    rng = np.random.RandomState(seed)
+    X = sparse.random(rows, features, density=0.2, random_state=rng, format='csr')
+    true_weights = rng.normal(size=features)
+    y = (X @ true_weights > 0).astype(int)
+    return X, y
+
+
+def test_linear_model_matches_sklearn_and_round_trips(tmp_path):
+    X, y = _toy_data()
+    estimator = LogisticRegression().fit(X, y)
+    model = LinearModel.from_estimator(estimator)
+
+    assert np.allclose(model.predict_proba(X), estimator.predict_proba(X))
+    assert (model.predict(X) == estimator.predict(X)).all()
+
+    path = str(tmp_path / 'linear_model.npz')
+    model.save(path)
+    loaded = LinearModel.load(path)
+    assert list(loaded.classes_) == [0, 1]
+    # Weights are stored as float32
+    assert np.allclose(loaded.predict_proba(X), model.predict_proba(X), atol=1e-5)
+
+
+def test_pruning_drops_small_weights():
+    X, y = _toy_data()
+    estimator = LogisticRegression().fit(X, y)
+    model = LinearModel.from_estimator(estimator, prune_below=0.5)
+    assert np.count_nonzero(model.coef_) < np.count_nonzero(estimator.coef_)
+    assert np.all((model.coef_ == 0) | (np.abs(model.coef_) >= 0.5))
+
+
+def test_distill_reproduces_teacher():
+    X, y = _toy_data(seed=1)
+    teacher = LogisticRegression(C=100).fit(X, y)
+    student = LinearModel.from_estimator(distill(X, teacher.predict_proba(X)[:, 1], C=100))
+    agreement = (student.predict(X) == teacher.predict(X)).mean()
+    assert agreement >= 0.97
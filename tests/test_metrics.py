@@ -0,0 +1,52 @@
+import os
+import sys
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.detector import HateSpeechDetector
+from backend.models.metrics import DetectorMetrics
+
+
+def test_histogram_buckets_are_cumulative_in_prometheus_output():
+    metrics = DetectorMetrics(enabled=True, buckets=(0.001, 0.01))
+    metrics.record('analyze', {'rules': 500_000, 'total': 5_000_000}, decisions=['rules'])
+    metrics.record('analyze', {'rules': 50_000_000, 'total': 60_000_000}, decisions=['ml'])
+    text = metrics.render_prometheus(info={'model_version': 'v0001'})
+
+    assert 'hate_speech_detector_info{model_version="v0001"} 1' in text
+    assert '# TYPE hate_speech_detector_stage_duration_seconds histogram' in text
+    prefix = 'hate_speech_detector_stage_duration_seconds'
+    assert f'{prefix}_bucket{{call="analyze",stage="rules",le="0.001"}} 1' in text
+    assert f'{prefix}_bucket{{call="analyze",stage="rules",le="0.01"}} 1' in text
+    assert f'{prefix}_bucket{{call="analyze",stage="rules",le="+Inf"}} 2' in text
+    assert f'{prefix}_sum{{call="analyze",stage="rules"}} 0.050500000' in text
+    assert 'hate_speech_detector_messages_total{call="analyze"} 2' in text
+    assert 'hate_speech_detector_decisions_total{decided_by="ml"} 1' in text
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = DetectorMetrics(enabled=False)
+    metrics.record('analyze', {'total': 1000})
+    assert metrics.histograms == {} and metrics.messages == {}
+
+
+def test_analyze_reports_stage_timings():
+    detector = HateSpeechDetector()
+    detector.metrics = DetectorMetrics(enabled=True)
+
+    timings = {}
+    result = detector.analyze("Go back to where you came from", translate=False, timings=timings)
+    assert 'timings' not in result
+    assert {'language', 'rules', 'categorize', 'total'} <= set(timings)
+    assert all(isinstance(ns, int) and ns >= 0 for ns in timings.values())
+    assert timings['total'] >= timings['rules']
+
+    batch_timings = {}
+    detector.analyze_batch(["hello there", "", "Go back to where you came from"], translate=False,
+                           timings=batch_timings)
+    assert detector.metrics.messages == {'analyze': 1, 'analyze_batch': 3}
+    assert detector.metrics.decisions['empty'] == 1
+    assert detector.metrics.histograms[('analyze_batch', 'total')].count == 1
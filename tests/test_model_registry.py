@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.detector import HateSpeechDetector
+from backend.models.features import HashingTfidfVectorizer, HASHING_VECTORIZER_FILE
+from backend.models.linear import LinearModel
+from backend.models.registry import ModelRegistry, LINEAR_MODEL_FILE
+
+N_FEATURES = 2 ** 10
+
+
+def _model_files(tmp_path, name, hate_word):
+    """Write a vectorizer and a linear model that flags hate_word"""
+    directory = tmp_path / name
+    directory.mkdir()
+    vectorizer = HashingTfidfVectorizer(n_features=N_FEATURES).fit(['zorblax', 'quux', 'weather'])
+    weights = np.zeros(N_FEATURES)
+    weights[vectorizer.transform([hate_word]).indices] = 20.0
+    vectorizer_path = str(directory / HASHING_VECTORIZER_FILE)
+    model_path = str(directory / LINEAR_MODEL_FILE)
+    vectorizer.save(vectorizer_path)
+    LinearModel(weights, -5.0, [0, 1]).save(model_path)
+    return [model_path, vectorizer_path]
+
+
+def test_publish_activate_and_list(tmp_path):
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    assert registry.list_versions() == [] and registry.active_version() is None
+
+    first = registry.publish(_model_files(tmp_path, 'a', 'zorblax'), {'metrics': {'accuracy': 0.9}})
+    second = registry.publish(_model_files(tmp_path, 'b', 'quux'), activate=True)
+
+    assert (first, second) == ('v0001', 'v0002')
+    assert registry.list_versions() == ['v0001', 'v0002']
+    assert registry.active_version() == 'v0002'
+    metadata = registry.metadata('v0001')
+    assert metadata['metrics'] == {'accuracy': 0.9}
+    assert metadata['files'] == sorted([HASHING_VECTORIZER_FILE, LINEAR_MODEL_FILE])
+    # No staging directories are left behind
+    assert sorted(os.listdir(registry.root)) == ['ACTIVE', 'versions']
+
+    registry.activate('v0001')
+    bundle = registry.load()
+    assert bundle.version == 'v0001' and bundle.model_type == 'linear'
+
+    with pytest.raises(ValueError):
+        registry.activate('v0009')
+    with pytest.raises(ValueError):
+        registry.version_dir('../escape')
+
+
+def test_detector_hot_reloads_a_new_version(tmp_path):
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    registry.publish(_model_files(tmp_path, 'a', 'zorblax'), activate=True)
+
+    detector = HateSpeechDetector(cache_size=100)
+    detector.registry = registry
+    detector.load_model()
+    assert detector.model_version == 'v0001'
+    first = detector.analyze('zorblax', translate=False)
+    assert first['model_version'] == 'v0001'
+    assert detector.predict_with_model('zorblax')[0] and not detector.predict_with_model('quux')[0]
+
+    # A request holding the old bundle keeps using it after the swap
+    old_bundle = detector.bundle
+    registry.publish(_model_files(tmp_path, 'b', 'quux'), activate=True)
+    assert detector.load_model() is detector.bundle
+    assert detector.model_version == 'v0002'
+    assert detector.predict_with_model('quux')[0] and not detector.predict_with_model('zorblax')[0]
+    assert detector.predict_with_model('zorblax', old_bundle)[0]
+    assert detector.analyze('zorblax', translate=False)['model_version'] == 'v0002'
+
+    # A broken version is not swapped in
+    broken = registry.version_dir('v0002').replace('v0002', 'v0003')
+    os.makedirs(broken)
+    with open(os.path.join(broken, LINEAR_MODEL_FILE), 'wb') as f:
+        f.write(b'not a model')
+    assert detector.load_model('v0003') is None
+    assert detector.model_version == 'v0002'
+
+
+def test_reload_model_async(tmp_path):
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    registry.publish(_model_files(tmp_path, 'a', 'zorblax'))
+
+    detector = HateSpeechDetector()
+    detector.registry = registry
+    thread = detector.reload_model_async('v0001')
+    assert isinstance(thread, threading.Thread)
+    thread.join(timeout=10)
+    assert detector.model_version == 'v0001'
@@ -0,0 +1,151 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.features import HashingTfidfVectorizer
+from backend.models.linear import LinearModel
+from backend.models.online_learning import fetch_labeled_batches, load_state, run_online_update
+from conftest import FakeDb
+
+
+class LowercasePreprocessor:
+    def preprocess_many(self, texts):
+        return [text.lower() for text in texts]
+
+
+def _db():
+    start = cleared_at = datetime(2026, 1, 1)
+    violations = [{'id': i, 'content': f'you zorblax {i}', 'timestamp': start + timedelta(minutes=i)}
+                  for i in range(1, 6)]
+    violations += [{'id': 6, 'content': 'fair criticism', 'timestamp': start, 'cleared': True, 'cleared_at': cleared_at},
+                   {'id': 7, 'content': 'fair point', 'timestamp': start, 'cleared': True, 'cleared_at': cleared_at}]
+    posts = [{'id': i, 'content': f'lovely weather {i}', 'is_hate_speech': False, 'confidence_score': 0.0,
+              'author_suspended': False, 'created_at': start + timedelta(minutes=i)} for i in range(1, 6)]
+    return FakeDb(violations=violations, posts=posts)
+
+
+def test_fetch_mixes_sources_and_advances_watermark():
+    state = {'violation_id': 0, 'post_id': 0, 'cleared_at': None, 'cleared_id': 0}
+    batches = list(fetch_labeled_batches(_db(), state, batch_size=3))
+
+    labels = np.concatenate([batch_labels for _, batch_labels, _ in batches])
+    assert int(labels.sum()) == 5 and len(labels) == 12
+    # First batch has both classes
+    assert set(batches[0][1]) == {0, 1}
+
+    watermark = batches[-1][2]
+    assert watermark['violation_id'] == 5 and watermark['post_id'] == 5 and watermark['cleared_id'] == 7
+    assert list(fetch_labeled_batches(_db(), watermark, batch_size=3)) == []
+
+
+def test_cleared_violations_sharing_a_timestamp_are_not_skipped():
+    state = {'violation_id': 99, 'post_id': 99, 'cleared_at': None, 'cleared_id': 0}
+    batches = list(fetch_labeled_batches(_db(), state, batch_size=1))
+    assert [texts for texts, _, _ in batches] == [['fair criticism'], ['fair point']]
+
+
+def test_block_allocated_ids_inserted_late_are_not_skipped():
+    db = _db()
+    # Another worker's id block is ahead of this one's
+    db.violations.docs.append({'id': 3001, 'content': 'you zorblax early', 'timestamp': datetime(2026, 1, 2)})
+    watermark = list(fetch_labeled_batches(db, load_state('/nonexistent'), batch_size=10))[-1][2]
+    assert watermark['violation_id'] == 3001
+
+    db.violations.docs.append({'id': 8, 'content': 'you zorblax late', 'timestamp': datetime(2026, 1, 3)})
+    batches = list(fetch_labeled_batches(db, watermark, batch_size=10))
+    assert [texts for texts, _, _ in batches] == [['you zorblax late']]
+
+
+def test_posts_with_a_detection_signal_are_not_negatives():
+    db = _db()
+    later = datetime(2026, 1, 2)
+    # Published with a warning-level detection, and by an author suspended later
+    db.posts.docs.append({'id': 6, 'content': 'borderline zorblax', 'is_hate_speech': False,
+                          'confidence_score': 0.6, 'author_suspended': False, 'created_at': later})
+    db.posts.docs.append({'id': 7, 'content': 'suspended author', 'is_hate_speech': False,
+                          'confidence_score': 0.0, 'author_suspended': True, 'created_at': later})
+
+    negatives = [text for texts, labels, _ in fetch_labeled_batches(db, load_state('/nonexistent'))
+                 for text, label in zip(texts, labels) if label == 0]
+    assert 'borderline zorblax' not in negatives and 'suspended author' not in negatives
+    assert 'lovely weather 5' in negatives
+
+
+def test_partial_fit_learns_new_term():
+    vectorizer = HashingTfidfVectorizer(n_features=2 ** 10).fit(['you zorblax', 'lovely weather'])
+    X = vectorizer.transform(['you zorblax'] * 20 + ['lovely weather'] * 20)
+    y = np.array([1] * 20 + [0] * 20)
+    model = LinearModel(np.zeros(2 ** 10), 0.0, [0, 1])
+    model.partial_fit(X, y, epochs=20)
+    assert list(model.predict(vectorizer.transform(['zorblax', 'weather']))) == [1, 0]
+
+
+def test_run_online_update_versions_and_promotes(tmp_path):
+    vectorizer = HashingTfidfVectorizer(n_features=2 ** 10).fit(['you zorblax', 'lovely weather'])
+    model_path = str(tmp_path / 'linear_model.npz')
+    online_dir = str(tmp_path / 'online')
+    LinearModel(np.zeros(2 ** 10), 0.0, [0, 1]).save(model_path)
+
+    summary = run_online_update(_db(), vectorizer, LowercasePreprocessor(), model_path=model_path,
+                                online_dir=online_dir, epochs=20)
+    assert summary['examples'] == 12 and summary['positives'] == 5 and summary['promoted']
+    assert os.path.exists(summary['path'])
+
+    served = LinearModel.load(model_path)
+    assert served.predict(vectorizer.transform(['you zorblax']))[0] == 1
+    assert load_state(online_dir)['versions'][0]['version'] == summary['version']
+
+    # Everything has been learned once
+    again = run_online_update(_db(), vectorizer, LowercasePreprocessor(), model_path=model_path, online_dir=online_dir)
+    assert again['examples'] == 0 and again['version'] is None
+
+
+def test_unpromoted_update_keeps_its_examples_pending(tmp_path):
+    vectorizer = HashingTfidfVectorizer(n_features=2 ** 10).fit(['you zorblax', 'lovely weather'])
+    model_path = str(tmp_path / 'linear_model.npz')
+    online_dir = str(tmp_path / 'online')
+    LinearModel(np.zeros(2 ** 10), 0.0, [0, 1]).save(model_path)
+
+    trial = run_online_update(_db(), vectorizer, LowercasePreprocessor(), model_path=model_path,
+                              online_dir=online_dir, promote=False)
+    assert trial['examples'] == 12 and not trial['promoted']
+    assert not LinearModel.load(model_path).coef_.any()
+    state = load_state(online_dir)
+    assert state['violation_id'] == 0 and state['versions'][0]['promoted'] is False
+
+    # The next (promoted) run still learns every example
+    summary = run_online_update(_db(), vectorizer, LowercasePreprocessor(), model_path=model_path,
+                                online_dir=online_dir)
+    assert summary['examples'] == 12 and summary['promoted']
+    assert load_state(online_dir)['violation_id'] == 5
+    assert len(load_state(online_dir)['versions']) == 2
+
+
+def test_run_online_update_publishes_registry_version(tmp_path):
+    from backend.models.registry import ModelRegistry
+
+    vectorizer = HashingTfidfVectorizer(n_features=2 ** 10).fit(['you zorblax', 'lovely weather'])
+    model_path = str(tmp_path / 'linear_model.npz')
+    vectorizer_path = str(tmp_path / 'hashing_vectorizer.npz')
+    LinearModel(np.zeros(2 ** 10), 0.0, [0, 1]).save(model_path)
+    vectorizer.save(vectorizer_path)
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    registry.publish([model_path, vectorizer_path], {'feature_mode': 'hashing'}, activate=True)
+
+    summary = run_online_update(_db(), vectorizer, LowercasePreprocessor(), online_dir=str(tmp_path / 'online'),
+                                registry=registry, epochs=20)
+    assert summary['registry_version'] == 'v0002' and registry.active_version() == 'v0002'
+    assert registry.metadata('v0002')['parent'] == 'v0001'
+    assert registry.metadata('v0002')['feature_mode'] == 'hashing'
+
+    bundle = registry.load()
+    assert bundle.model.predict(bundle.vectorizer.transform(['you zorblax']))[0] == 1
+    # The parent version is untouched
+    assert not LinearModel.load(os.path.join(registry.version_dir('v0001'), 'linear_model.npz')).coef_.any()
@@ -0,0 +1,59 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import backend.database as database
+
+
+@pytest.fixture
+def db(fake_db):
+    start = datetime(2026, 1, 1)
+    # Pairs of violations share a timestamp, so id must break ties
+    fake_db.violations.docs = [
+        {'id': i, 'user_id': 1, 'category': 'racism' if i % 3 else 'sexism',
+         'timestamp': start + timedelta(minutes=i // 2)}
+        for i in range(1, 24)
+    ]
+    return fake_db
+
+
+def test_cursor_pages_cover_everything_once_without_skip(db):
+    seen, cursor = [], None
+    while True:
+        docs, cursor = database.list_violations(per_page=5, cursor=cursor)
+        seen.extend(doc['id'] for doc in docs)
+        if cursor is None:
+            break
+    assert seen == sorted(range(1, 24), key=lambda i: (i // 2, i), reverse=True)
+    assert db.violations.skipped == 0
+
+
+def test_cursor_pages_match_offset_pages_with_filter(db):
+    first, cursor = database.list_violations(page=1, per_page=4, category='racism')
+    second, _ = database.list_violations(per_page=4, category='racism', cursor=cursor)
+    offset, _ = database.list_violations(page=2, per_page=4, category='racism')
+    assert [doc['id'] for doc in second] == [doc['id'] for doc in offset]
+    assert all(doc['category'] == 'racism' for doc in first + second)
+
+
+def test_last_page_has_no_cursor_and_totals(db):
+    docs, cursor = database.list_violations(per_page=23)
+    assert len(docs) == 23 and cursor is None
+    assert database.count_total('violations', {'category': 'sexism'}, 'exact') == 7
+    assert database.count_total('violations', {'category': 'sexism'}, 'estimated') == 23
+    assert database.count_total('violations', {}, 'none') is None
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    when = datetime(2026, 3, 4, 5, 6, 7, 8000)
+    assert database.decode_cursor(database.encode_cursor(when, 42)) == (when, 42)
+    for token in ('not-a-cursor', '', 'WzEsMl0'):
+        with pytest.raises(ValueError):
+            database.decode_cursor(token)
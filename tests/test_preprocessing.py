@@ -0,0 +1,36 @@
+import os
+import sys
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.utils.preprocessing import TextPreprocessor
+
+TEXTS = [
+    "Check https://example.com NOW!!! @someone #angry 123 people are running",
+    "#www.example.com/path x@mention 12abc tabs\tand\nnewlines",
+    "",
+]
+
+def stepwise(preprocessor, text, remove_stop, lemmatize):
+    text = preprocessor.clean_text(text)
+    if remove_stop:
+        text = preprocessor.remove_stopwords(text)
+    if lemmatize:
+        text = preprocessor.lemmatize_text(text)
+    return text
+
+def test_fused_pipeline_matches_stepwise_pipeline():
+    preprocessor = TextPreprocessor()
+    for remove_stop in (True, False):
+        for lemmatize in (True, False):
+            for text in TEXTS:
+                assert preprocessor.preprocess(text, remove_stop, lemmatize) == \
+                    stepwise(preprocessor, text, remove_stop, lemmatize)
+
+def test_preprocess_many_matches_preprocess():
+    preprocessor = TextPreprocessor()
+    expected = [preprocessor.preprocess(text, remove_stop=False) for text in TEXTS]
+    assert preprocessor.preprocess_many(iter(TEXTS), remove_stop=False) == expected
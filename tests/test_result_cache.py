@@ -0,0 +1,44 @@
+import os
+import sys
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import backend.models.cache as cache_module
+from backend.models.cache import ResultCache
+
+def test_key_normalizes_text_and_includes_versions():
+    key = ResultCache.make_key("You  are\tAwful", 'model-1', 'lex-1')
+    assert key == ResultCache.make_key("you are awful", 'model-1', 'lex-1')
+    assert key != ResultCache.make_key("you are awful", 'model-2', 'lex-1')
+    assert key != ResultCache.make_key("you are awful", 'model-1', 'lex-2')
+
+def test_lru_eviction_and_counters():
+    cache = ResultCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    stats = cache.stats()
+    assert (stats['size'], stats['hits'], stats['misses']) == (2, 2, 1)
+
+def test_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    cache = ResultCache(max_size=10, ttl=5)
+    cache.put('a', 1)
+    now[0] += 4
+    assert cache.get('a') == 1
+    now[0] += 2
+    assert cache.get('a') is None
+    assert cache.stats()['size'] == 0
+
+def test_disabled_cache_stores_nothing():
+    cache = ResultCache(max_size=0)
+    cache.put('a', 1)
+    assert cache.get('a') is None
+    assert not cache.enabled
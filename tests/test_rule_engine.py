@@ -0,0 +1,24 @@
+import os
+import sys
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.rules import RuleEngine
+
+engine = RuleEngine()
+
+def test_safe_context_clears_text():
+    assert engine.detect("I love how terrorists get caught") == (False, 0.0)
+
+def test_highest_weight_rule_wins():
+    # "criminals" alone is 0.7; "old people should die" is 0.9
+    assert engine.detect("Criminals! Old people should just die") == (True, 0.9)
+
+def test_single_rule_hit():
+    assert engine.detect("Go back to where you came from") == (True, 0.8)
+
+def test_clean_text_not_flagged():
+    assert engine.detect("See you at the meeting tomorrow") == (False, 0.0)
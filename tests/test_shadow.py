@@ -0,0 +1,164 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.detector import HateSpeechDetector
+from backend.models.features import HashingTfidfVectorizer, HASHING_VECTORIZER_FILE
+from backend.models.linear import LinearModel
+from backend.models.registry import ModelRegistry, ModelBundle, LINEAR_MODEL_FILE
+from backend.models.shadow import ShadowEvaluator, merge_snapshots
+
+N_FEATURES = 2 ** 10
+
+
+def _publish(registry, tmp_path, hate_word, activate=False):
+    directory = tmp_path / hate_word
+    directory.mkdir()
+    vectorizer = HashingTfidfVectorizer(n_features=N_FEATURES).fit(['zorblax', 'quux', 'weather'])
+    weights = np.zeros(N_FEATURES)
+    weights[vectorizer.transform([hate_word]).indices] = 20.0
+    vectorizer.save(str(directory / HASHING_VECTORIZER_FILE))
+    LinearModel(weights, -5.0, [0, 1]).save(str(directory / LINEAR_MODEL_FILE))
+    return registry.publish([str(directory / HASHING_VECTORIZER_FILE), str(directory / LINEAR_MODEL_FILE)],
+                            activate=activate)
+
+
+def _wait_for(predicate, timeout=10):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    assert predicate()
+
+
+def test_shadow_scores_live_traffic_without_changing_responses(tmp_path):
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    _publish(registry, tmp_path, 'zorblax', activate=True)
+    _publish(registry, tmp_path, 'quux')
+
+    detector = HateSpeechDetector()
+    detector.registry = registry
+    detector.load_model()
+    # A weak rule hit ('criminals') leaves the verdict's confidence to the ML stage
+    texts = ['zorblax criminals', 'quux criminals', 'weather criminals', 'have a nice day']
+    expected = detector.analyze_batch(texts, translate=False)
+    assert [result['decided_by'] for result in expected] == ['ml', 'ml', 'ml', 'no_match']
+
+    shadow = detector.start_shadow('v0002')
+    assert detector.analyze(texts[0], translate=False) == expected[0]
+    assert detector.analyze_batch(texts[1:], translate=False) == expected[1:]
+    _wait_for(lambda: shadow.scored == 3)
+
+    stats = shadow.stats()
+    assert stats['candidate_version'] == 'v0002' and stats['primary_versions'] == ['v0001']
+    assert stats['ml_agreement_rate'] == 1 / 3
+    assert stats['score_delta']['max_abs'] > 0.9
+    assert sum(bucket['count'] for bucket in stats['latency_ms']['candidate']['histogram']) == 3
+    assert stats['agreement_rate'] == 1.0 and stats['disagreements'] == []
+
+    assert detector.stop_shadow() is shadow and detector.shadow is None
+    detector.analyze('weather criminals again', translate=False)
+    assert shadow.submitted == 3
+
+
+def test_full_queue_drops_instead_of_blocking():
+    release = threading.Event()
+
+    class SlowDetector:
+        def predict_batch_with_model(self, texts, bundle):
+            release.wait(10)
+            return [(False, 0.0)] * len(texts)
+
+        def _combine_results(self, text, language, analysis_text, was_translated, rule_result, ml_result, version):
+            return {'is_hate_speech': False, 'confidence': 0.0}
+
+    item = ('text', 'en', 'text', False, (False, 0.0), (False, 0.0), {'is_hate_speech': False, 'confidence': 0.0})
+    shadow = ShadowEvaluator(SlowDetector(), ModelBundle(None, None, 'v0002', 'linear'), queue_size=1)
+    start = time.perf_counter()
+    for _ in range(5):
+        shadow.submit([item], 'v0001', 0.1)
+    assert time.perf_counter() - start < 1
+    assert shadow.dropped >= 3
+
+    release.set()
+    _wait_for(lambda: shadow.scored == shadow.submitted)
+    assert shadow.stats()['agreement_rate'] == 1.0
+    shadow.stop()
+
+
+def _worker(registry, name):
+    detector = HateSpeechDetector()
+    detector.registry = registry
+    detector.load_model()
+    original = detector.start_shadow
+
+    def start_shadow(*args, **kwargs):
+        shadow = original(*args, **kwargs)
+        shadow.worker = name
+        return shadow
+
+    detector.start_shadow = start_shadow
+    return detector
+
+
+def test_shadow_run_is_shared_by_workers_through_the_registry(tmp_path):
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    _publish(registry, tmp_path, 'zorblax', activate=True)
+    _publish(registry, tmp_path, 'quux')
+    first, second = _worker(registry, 'a'), _worker(registry, 'b')
+
+    config = registry.set_shadow('v0002', sample_rate=1.0)
+    assert first.sync_shadow().version == 'v0002' and second.sync_shadow().version == 'v0002'
+    first.analyze('zorblax criminals', translate=False)
+    second.analyze_batch(['quux criminals', 'weather criminals'], translate=False)
+    _wait_for(lambda: first.shadow.scored == 1 and second.shadow.scored == 2)
+    first.sync_shadow()
+    second.sync_shadow()
+
+    stats = merge_snapshots(registry.shadow_snapshots(config['started_at']))
+    assert stats['scored'] == 3 and stats['ml_agreement_rate'] == 1 / 3
+    assert sorted(worker['scored'] for worker in stats['workers']) == [1, 2]
+
+    # Ending the run stops every worker's shadow on its next sync
+    registry.clear_shadow()
+    assert second.sync_shadow() is None and second.shadow is None
+    assert registry.shadow_snapshots(config['started_at']) == []
+    first.stop_shadow()
+
+
+def test_admin_endpoint_reports_stats_of_all_workers(tmp_path, api_client, monkeypatch):
+    import backend.routes.api as api
+
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    _publish(registry, tmp_path, 'zorblax', activate=True)
+    _publish(registry, tmp_path, 'quux')
+    serving, other = _worker(registry, 'serving'), _worker(registry, 'other')
+    monkeypatch.setattr(api, 'detector', serving)
+
+    response = api_client.post('/api/admin/model/shadow', json={'version': 'v0002'})
+    assert response.status_code == 200
+    # Another worker picks the run up from the registry and scores its own traffic
+    other.sync_shadow()
+    other.analyze('quux criminals', translate=False)
+    _wait_for(lambda: other.shadow.scored == 1)
+    other.sync_shadow()
+
+    body = api_client.get('/api/admin/model/shadow').get_json()
+    assert body['shadow']['scored'] == 1 and len(body['shadow']['workers']) == 2
+    assert body['pid'] == os.getpid()
+
+    body = api_client.delete('/api/admin/model/shadow').get_json()
+    assert body['shadow']['candidate_version'] == 'v0002'
+    assert registry.shadow_config() is None and serving.shadow is None
+    assert api_client.get('/api/admin/model/shadow').get_json()['shadow'] is None
+    other.stop_shadow()
+
+    assert api_client.post('/api/admin/model/shadow', json={'version': 'v0009'}).status_code == 404
+    assert registry.shadow_config() is None
@@ -0,0 +1,34 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from ml_model.stage_report import StageReport
+
+
+def test_stage_report_records_stages_and_saves_json(tmp_path):
+    report = StageReport(config={'n_jobs': 2})
+    with report.stage('load'):
+        sum(range(1000))
+    with pytest.raises(ValueError):
+        with report.stage('fit'):
+            raise ValueError('boom')
+    report.results['accuracy'] = 0.9
+
+    path = str(tmp_path / 'training_report.json')
+    report.save(path)
+    with open(path) as f:
+        saved = json.load(f)
+
+    # A failing stage is still recorded
+    assert [entry['stage'] for entry in saved['stages']] == ['load', 'fit']
+    assert saved['config']['n_jobs'] == 2 and saved['config']['cpu_count']
+    assert saved['results'] == {'accuracy': 0.9}
+    assert all(entry['seconds'] >= 0 for entry in saved['stages'])
+    assert 'peak RSS MB' in report.summary()
@@ -0,0 +1,95 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import ml_model.train_model as train_model
+from ml_model.train_model import HateSpeechModelTrainer, iter_csv_chunks, is_holdout
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    # Keep the test independent of NLTK corpora: preprocessing is lowercasing
+    monkeypatch.setattr(train_model, 'preprocess_texts',
+                        lambda texts, n_jobs=None: [text.lower() for text in texts])
+    rng = np.random.RandomState(0)
+    hate = ['you are worthless trash', 'go back where you came from', 'you stupid idiot']
+    normal = ['have a great day', 'thanks for sharing this', 'nice work on the project']
+    rows = []
+    for i in range(600):
+        label = i % 2
+        base = (hate if label else normal)[rng.randint(3)]
+        rows.append({'text': f'{base} {i}', 'label': label})
+    path = tmp_path / 'corpus.csv'
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def test_iter_csv_chunks_streams_whole_corpus(corpus):
+    chunks = list(iter_csv_chunks(corpus, chunk_size=250))
+    assert [len(texts) for texts, _ in chunks] == [250, 250, 100]
+    assert all(len(texts) == len(labels) for texts, labels in chunks)
+
+
+@pytest.mark.parametrize('learner', ['sgd', 'nb'])
+def test_streaming_training_learns_and_exports_linear_model(corpus, tmp_path, learner):
+    trainer = HateSpeechModelTrainer(feature_mode='hashing', n_features=2 ** 12,
+                                     preprocess_cache_dir=str(tmp_path / 'cache'))
+    accuracy = trainer.train_streaming(corpus, chunk_size=100, learner=learner)
+    assert accuracy >= 0.95
+    assert trainer.report.results['train_samples'] + trainer.report.results['test_samples'] == 600
+
+    texts = ['you stupid idiot 7', 'have a great day 8']
+    X = trainer.vectorizer.transform(texts)
+    linear = trainer.linear_model()
+    assert list(linear.predict(X)) == list(trainer.model.predict(X)) == [1, 0]
+    assert np.allclose(linear.predict_proba(X), trainer.model.predict_proba(X))
+
+
+def test_streaming_requires_hashing_features(corpus):
+    with pytest.raises(ValueError):
+        HateSpeechModelTrainer(feature_mode='tfidf').train_streaming(corpus)
+
+
+def test_holdout_split_is_deterministic():
+    assert is_holdout('some text') == is_holdout('some text')
+    share = np.mean([is_holdout(f'text {i}') for i in range(5000)])
+    assert 0.15 < share < 0.25
+
+
+def test_save_model_replaces_files_instead_of_rewriting_them(corpus, tmp_path):
+    trainer = HateSpeechModelTrainer(feature_mode='hashing', n_features=2 ** 12,
+                                     preprocess_cache_dir=str(tmp_path / 'cache'))
+    trainer.train_streaming(corpus, chunk_size=300)
+    model_dir = tmp_path / 'model'
+    paths = trainer.save_model(str(model_dir))
+    # Stand-in for a worker that memory-maps the served files
+    mapped = [np.memmap(path, mode='r') for path in paths]
+    before = [bytes(array) for array in mapped]
+    inodes = [os.stat(path).st_ino for path in paths]
+
+    assert trainer.save_model(str(model_dir)) == paths
+    # New files were renamed into place; the mapped ones were never truncated
+    assert all(os.stat(path).st_ino != inode for path, inode in zip(paths, inodes))
+    assert [bytes(array) for array in mapped] == before
+    assert sorted(os.listdir(model_dir)) == sorted(os.path.basename(path) for path in paths)
+
+
+def test_write_atomic_keeps_the_old_file_on_failure(tmp_path):
+    path = tmp_path / 'linear_model.npz'
+    path.write_bytes(b'served')
+
+    def fail(tmp_path):
+        open(tmp_path, 'wb').write(b'partial')
+        raise OSError('disk full')
+
+    with pytest.raises(OSError):
+        train_model.write_atomic(str(path), fail)
+    assert path.read_bytes() == b'served' and os.listdir(tmp_path) == ['linear_model.npz']
@@ -0,0 +1,51 @@
+import os
+import sys
+
+import pandas as pd
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import ml_model.train_model as train_model
+from ml_model.train_model import HateSpeechModelTrainer, preprocess_cache_key, preprocess_texts
+
+
+class UpperPreprocessor:
+    def preprocess_many(self, texts, **options):
+        return [text.upper() for text in texts]
+
+
+def test_cache_key_tracks_dataset_content():
+    key = preprocess_cache_key(['a', 'b'])
+    assert key == preprocess_cache_key(['a', 'b'])
+    assert key != preprocess_cache_key(['a', 'c'])
+    assert key != preprocess_cache_key(['ab'])
+
+
+def test_parallel_preprocessing_keeps_order(monkeypatch):
+    # Worker processes are forked, so they inherit the stand-in preprocessor
+    monkeypatch.setattr(train_model, '_worker_preprocessor', UpperPreprocessor())
+    texts = [f'text {i}' for i in range(25)]
+    assert preprocess_texts(texts, n_jobs=2, chunk_size=4) == [text.upper() for text in texts]
+    assert preprocess_texts(texts, n_jobs=1, chunk_size=4) == [text.upper() for text in texts]
+
+
+def test_preprocess_data_reuses_cache(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_preprocess_texts(texts, n_jobs=None):
+        calls.append(len(texts))
+        return [text.upper() for text in texts]
+
+    monkeypatch.setattr(train_model, 'preprocess_texts', fake_preprocess_texts)
+    trainer = HateSpeechModelTrainer(preprocess_cache_dir=str(tmp_path))
+
+    first = trainer.preprocess_data(pd.DataFrame({'text': ['you idiot', 'nice day'], 'label': [1, 0]}))
+    second = trainer.preprocess_data(pd.DataFrame({'text': ['you idiot', 'nice day'], 'label': [1, 0]}))
+    assert calls == [2]
+    assert second['processed_text'].tolist() == first['processed_text'].tolist() == ['YOU IDIOT', 'NICE DAY']
+
+    trainer.preprocess_data(pd.DataFrame({'text': ['something else'], 'label': [0]}))
+    assert calls == [2, 1]
@@ -0,0 +1,38 @@
+import os
+import sys
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.models.translation import PhraseTableBackend, TranslationCache, NullBackend
+
+PHRASE_TABLE = os.path.join(ROOT, 'data', 'phrase_table.tsv')
+
+def test_phrase_table_prefers_longest_phrase():
+    backend = PhraseTableBackend(PHRASE_TABLE)
+    text, translated = backend.translate("¡Vuelve a tu país!", 'es')
+    assert translated is True
+    assert text == 'go back to your country'
+
+def test_phrase_table_keeps_unknown_words():
+    backend = PhraseTableBackend(PHRASE_TABLE)
+    assert backend.translate("Todos los vecinos son raros", 'es') == ('all vecinos are raros', True)
+
+def test_phrase_table_without_matches_returns_original():
+    backend = PhraseTableBackend(PHRASE_TABLE)
+    assert backend.translate("zzz qqq", 'es') == ("zzz qqq", False)
+    assert backend.translate("hola", 'xx') == ("hola", False)
+
+def test_null_backend_never_translates():
+    assert NullBackend().translate("hola", 'es') == ("hola", False)
+
+def test_translation_cache_roundtrip(tmp_path):
+    cache = TranslationCache(str(tmp_path / 'cache' / 'translations.db'))
+    assert cache.get('google', 'es', 'hola') is None
+    cache.put('google', 'es', 'hola', 'hello')
+    assert cache.get('google', 'es', 'hola') == 'hello'
+    assert cache.get('google', 'fr', 'hola') is None
+    # A second instance sees the persisted entry
+    assert TranslationCache(cache.path).get('google', 'es', 'hola') == 'hello'
@@ -0,0 +1,177 @@
+import os
+import sys
+import threading
+from datetime import datetime
+
+import pytest
+from pymongo import InsertOne, UpdateMany, UpdateOne
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+# Ensure project root is on path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import backend.database as database
+from backend.write_buffer import WriteBuffer
+from conftest import FakeCollection, FakeDb
+
+
+class GatedCollection(FakeCollection):
+    """Holds the writer thread until gate is set; fails the operation at fail_at once"""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = None
+        self.fail_at = None
+
+    def bulk_write(self, operations, ordered=True):
+        if self.gate is not None and threading.current_thread().name == 'write-buffer':
+            self.gate.wait()
+        if self.fail_at is not None:
+            index, self.fail_at = self.fail_at, None
+            super().bulk_write(operations[:index])
+            raise BulkWriteError({'writeErrors': [{'index': index, 'errmsg': 'duplicate key'}]})
+        super().bulk_write(operations)
+
+
+class FlakyCollection(FakeCollection):
+    """Loses the connection on the next `failures` bulk writes (after applying
+    them when `land` is set) and enforces a unique id like the real index"""
+
+    def __init__(self, failures=0, land=False):
+        super().__init__()
+        self.failures = failures
+        self.land = land
+
+    def bulk_write(self, operations, ordered=True):
+        ids = {doc['id'] for doc in self.docs}
+        for index, operation in enumerate(operations):
+            if isinstance(operation, InsertOne) and operation._doc['id'] in ids:
+                super().bulk_write(operations[:index])
+                raise BulkWriteError({'writeErrors': [{'index': index, 'code': 11000, 'errmsg': 'duplicate key'}]})
+        if self.failures:
+            self.failures -= 1
+            if self.land:
+                super().bulk_write(operations)
+            raise AutoReconnect('connection reset')
+        super().bulk_write(operations)
+
+
+def _insert(i):
+    return InsertOne({'id': i, 'likes_count': 0})
+
+
+def test_operations_are_batched_in_order_per_collection():
+    db = FakeDb()
+    buffer = WriteBuffer(lambda: db, batch_size=100, flush_interval=5)
+    for i in range(1, 4):
+        buffer.submit('posts', _insert(i))
+    buffer.submit('posts', UpdateOne({'id': 2}, {'$inc': {'likes_count': 1}}))
+    buffer.submit('violations', _insert(1))
+    assert db.posts.docs == []
+
+    assert buffer.flush(timeout=5)
+    assert db.calls == ['bulk_write', 'bulk_write']
+    assert [doc['likes_count'] for doc in db.posts.docs] == [0, 1, 0]
+    assert buffer.stats()['written'] == 5
+
+
+def test_batch_size_triggers_a_write_without_flush():
+    db = FakeDb()
+    buffer = WriteBuffer(lambda: db, batch_size=2, flush_interval=5)
+    buffer.submit('posts', _insert(1))
+    buffer.submit('posts', _insert(2))
+    buffer.flush(timeout=5)
+    assert db.calls == ['bulk_write'] and len(db.posts.docs) == 2
+
+
+def test_full_queue_blocks_the_caller_and_keeps_the_order():
+    db = FakeDb()
+    db.posts = GatedCollection()
+    db.posts.gate = threading.Event()
+    buffer = WriteBuffer(lambda: db, batch_size=1, flush_interval=0, max_queue=1)
+    operations = [_insert(1), _insert(2), UpdateMany({}, {'$set': {'author_suspended': True}})]
+    submitter = threading.Thread(target=lambda: [buffer.submit('posts', op) for op in operations])
+    submitter.start()
+    submitter.join(timeout=0.2)
+    assert submitter.is_alive() and buffer.overflows >= 1
+    assert db.posts.docs == []
+
+    db.posts.gate.set()
+    submitter.join(timeout=5)
+    assert buffer.flush(timeout=5)
+    # The update ran after both inserts, not ahead of the queued one
+    assert [doc.get('author_suspended') for doc in db.posts.docs] == [True, True]
+
+
+def test_connection_errors_are_retried_until_written():
+    db = FakeDb()
+    db.posts = FlakyCollection(failures=3)
+    buffer = WriteBuffer(lambda: db, flush_interval=0, retry_backoff=0)
+    for i in range(1, 4):
+        buffer.submit('posts', _insert(i))
+    assert buffer.flush(timeout=5)
+    assert [doc['id'] for doc in db.posts.docs] == [1, 2, 3]
+    assert buffer.retries == 3 and buffer.errors == 0 and buffer.written == 3
+
+
+def test_insert_that_landed_before_the_error_is_not_an_error():
+    db = FakeDb()
+    db.posts = FlakyCollection(failures=1, land=True)
+    buffer = WriteBuffer(lambda: db, flush_interval=0, retry_backoff=0)
+    buffer.submit('posts', _insert(1))
+    assert buffer.flush(timeout=5)
+    assert [doc['id'] for doc in db.posts.docs] == [1]
+    assert buffer.errors == 0 and buffer.written == 1
+
+
+def test_synchronous_write_errors_reach_the_caller():
+    db = FakeDb()
+    db.posts = FlakyCollection(failures=1)
+    buffer = WriteBuffer(lambda: db, enabled=False)
+    with pytest.raises(AutoReconnect):
+        buffer.submit('posts', _insert(1))
+    assert buffer.errors == 1 and db.posts.docs == []
+
+
+def test_counters_are_exported_for_prometheus():
+    db = FakeDb()
+    buffer = WriteBuffer(lambda: db, enabled=False)
+    buffer.submit('posts', _insert(1))
+    text = buffer.render_prometheus()
+    assert 'hate_speech_write_buffer_written_total 1' in text
+    assert 'hate_speech_write_buffer_errors_total 0' in text
+    assert '# TYPE hate_speech_write_buffer_pending gauge' in text
+
+
+def test_failed_write_is_skipped_and_the_rest_written():
+    db = FakeDb()
+    db.posts = GatedCollection()
+    db.posts.fail_at = 1
+    buffer = WriteBuffer(lambda: db, enabled=False)
+    buffer._write([('posts', _insert(i)) for i in range(1, 4)])
+    assert [doc['id'] for doc in db.posts.docs] == [1, 3]
+    assert buffer.errors == 1 and buffer.written == 2
+
+
+def test_record_warning_suspends_once_in_one_update(fake_db):
+    fake_db.users.docs = [{'id': 1, 'username': 'alice', 'warning_count': 1, 'is_suspended': False}]
+    fake_db.posts.docs = [{'id': 1, 'user_id': 1, 'author_suspended': False}]
+    users = fake_db.users
+
+    user, suspended_now = database.record_warning(1, max_warnings=3)
+    assert user['warning_count'] == 2 and not suspended_now and not user['is_suspended']
+
+    user, suspended_now = database.record_warning(1, max_warnings=3)
+    database.flush_writes()
+    assert suspended_now and user['is_suspended']
+    assert isinstance(user['suspended_at'], datetime)
+    assert user == users.docs[0]
+    assert fake_db.posts.docs[0]['author_suspended'] is True
+    assert fake_db.calls.count('find_one_and_update') == 2
+
+    user, suspended_now = database.record_warning(1, max_warnings=3)
+    assert user['warning_count'] == 4 and not suspended_now
+    assert user['suspended_at'] == users.docs[0]['suspended_at']
+    assert database.record_warning(99, max_warnings=3) == (None, False)